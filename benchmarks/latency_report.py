@@ -0,0 +1,56 @@
+"""
+Pen-to-paint latency report.
+
+Reads recordings made with the "Record Latency" toolbar action
+(latency_logs/ink_latency_*.jsonl, one line per tablet sample) and prints
+p50/p95/p99 of every recording over all its samples. With two or more
+recordings, each is compared with the first one, e.g. the same scribble on
+two builds.
+
+    python -m benchmarks.latency_report latency_logs/before.jsonl latency_logs/after.jsonl
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.frontend.ink_latency import LatencyHistogram
+
+STAGES = ("to_flush", "to_paint")
+
+def load_recording(path: str) -> dict:
+    """Histograms of one recording, holding all of its samples: {stage: LatencyHistogram}."""
+    histograms = {}
+    with open(path, "r", encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f if line.strip()]
+    samples = [line for line in lines if "to_paint_ms" in line]
+    for stage in STAGES:
+        histogram = histograms[stage] = LatencyHistogram(window=max(1, len(samples)))
+        for sample in samples:
+            histogram.add(sample[f"{stage}_ms"])
+    return histograms
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Summarize and compare pen latency recordings.")
+    parser.add_argument("recordings", nargs="+", help="JSONL files written by the latency module")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    for path in args.recordings:
+        summaries = {stage: histogram.summary() for stage, histogram in load_recording(path).items()}
+        print(f"[Latency] {path}: {summaries['to_paint']['count']} samples")
+        for stage in STAGES:
+            s = summaries[stage]
+            line = f"[Latency]   {stage:<9} p50 {s['p50']:7.2f}  p95 {s['p95']:7.2f}  p99 {s['p99']:7.2f} ms"
+            if baseline is not None:
+                b = baseline[stage]
+                line += f"   (p95 {s['p95'] - b['p95']:+.2f} ms vs {os.path.basename(args.recordings[0])})"
+            print(line)
+        if baseline is None:
+            baseline = summaries
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
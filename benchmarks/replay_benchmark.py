@@ -0,0 +1,120 @@
+"""
+Pen-session replay benchmark and ink regression check.
+
+Replays recorded input sessions (benchmarks/pen_sessions/*.inkrec, recorded
+with the "Record Input" toolbar action) headless through a PDFViewer on a
+blank page of the recorded size, at recorded or maximum speed. Per session it
+reports:
+
+- event_cost_ms: time to handle one event, per event type (p50/p95/p99/max)
+- frame_ms: time to flush the pending pen samples and repaint, per frame
+- checksum: hash of the ink left on the page
+
+Checksums are compared with benchmarks/pen_sessions/checksums.json (written
+with --update-checksums). The exit code is 1 if the ink of a session
+changed, a session has no expected checksum or there is no session at all.
+
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.replay_benchmark --speed max
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import fitz
+from PyQt6.QtWidgets import QApplication
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SESSIONS_DIR = os.path.join(BENCH_DIR, "pen_sessions")
+CHECKSUMS_PATH = os.path.join(SESSIONS_DIR, "checksums.json")
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, "results", "replay_benchmark.json")
+
+def replay_session(path: str, speed: str) -> dict:
+    from src.frontend.pdf_viewer import PDFViewer
+    from src.frontend.input_recording import load_recording, prepare_viewer, replay_recording
+
+    recording = load_recording(path)
+    header = recording["header"]
+    width, height = header["page_size"] or (595, 842)
+    doc = fitz.open()
+    doc.new_page(width=width, height=height)
+    viewer = PDFViewer()
+    try:
+        viewer.set_document(doc, is_new_file=True)
+        viewer.show()
+        prepare_viewer(viewer, header)
+        return replay_recording(viewer, recording, speed=speed)
+    finally:
+        viewer.close_journal()
+        doc.close()
+        viewer.close()
+        viewer.deleteLater()
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Replay recorded pen sessions as a benchmark.")
+    parser.add_argument("sessions", nargs="*", help="Recordings (default: benchmarks/pen_sessions/*.inkrec)")
+    parser.add_argument("--speed", choices=["max", "recorded"], default="max")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--update-checksums", action="store_true",
+                        help="Accept the current ink of every session as the expected one")
+    args = parser.parse_args(argv)
+
+    sessions = args.sessions or sorted(glob.glob(os.path.join(SESSIONS_DIR, "*.inkrec")))
+    if not sessions:
+        print(f"[Bench] No recordings in {SESSIONS_DIR}; record one with the 'Record Input' toolbar action")
+        return 1
+
+    app = QApplication.instance() or QApplication([])
+    expected = {}
+    if os.path.exists(CHECKSUMS_PATH):
+        with open(CHECKSUMS_PATH, "r") as f:
+            expected = json.load(f)
+
+    results = {}
+    failures = []
+    for path in sessions:
+        name = os.path.basename(path)
+        result = results[name] = replay_session(path, args.speed)
+        moves = result["event_cost_ms"].get("TabletMove", {})
+        print(f"[Bench] {name}: {result['events']} events in {result['replay_ms']:.0f} ms "
+              f"(recorded {result['recorded_ms']:.0f} ms), {result['strokes']} strokes")
+        if moves:
+            print(f"[Bench]   TabletMove p50 {moves['p50']:.3f} ms  p95 {moves['p95']:.3f} ms  max {moves['max']:.3f} ms")
+        frames = result["frame_ms"]
+        print(f"[Bench]   frame      p50 {frames['p50']:.3f} ms  p95 {frames['p95']:.3f} ms  max {frames['max']:.3f} ms")
+        if args.update_checksums:
+            continue
+        if name not in expected:
+            failures.append(name)
+            print("[Bench]   NO EXPECTED CHECKSUM: accept this session's ink with --update-checksums")
+        elif expected[name] != result["checksum"]:
+            failures.append(name)
+            print(f"[Bench]   INK CHANGED: checksum {result['checksum']} != expected {expected[name]}")
+
+    if args.update_checksums:
+        expected.update({name: result["checksum"] for name, result in results.items()})
+        os.makedirs(SESSIONS_DIR, exist_ok=True)
+        with open(CHECKSUMS_PATH, "w") as f:
+            json.dump(expected, f, indent=4, sort_keys=True)
+        print(f"[Bench] Checksums written to {CHECKSUMS_PATH}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump({
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "environment": {"python": platform.python_version(), "platform": platform.platform()},
+            "config": {"speed": args.speed},
+            "sessions": results,
+            "failed": failures # Ink changed or no expected checksum
+        }, f, indent=4)
+    print(f"[Bench] Results written to {args.output}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,265 @@
+"""
+Save-path benchmark and file-growth regression check.
+
+Builds documents of several sizes, draws synthetic strokes (and optionally
+images) through InkCanvas exactly like the pen does, and runs repeated save
+cycles through PDFViewer. Per cycle it records:
+
+- gui_block_ms: time the save holds the GUI thread, i.e. save_annotations()
+  plus gui_apply_ms
+- gui_apply_ms: time the save's completion handler (swap-in or reopen of the
+  written file) holds the GUI thread
+- wall_ms: time until the save is on disk
+- peak_python_kib: tracemalloc peak during the cycle (Python heap only)
+- file_bytes / growth_bytes: file size after the save and its growth
+
+After the cycles the document is re-opened in a fresh viewer (reopen_ms).
+Results are written as JSON and compared against thresholds; the exit code
+is 1 if any threshold is exceeded.
+
+    python -m benchmarks.save_benchmark --pages 10 100 1000 --cycles 5
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import fitz  # PyMuPDF
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QPointF
+from PyQt6.QtGui import QImage, QColor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.frontend import ink_journal
+from src.frontend.library import DocumentLibrary
+from src.frontend.pdf_viewer import PDFViewer
+from src.frontend.text_index import TextIndex, index_pool
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_THRESHOLDS = os.path.join(BENCH_DIR, "save_thresholds.json")
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, "results", "save_benchmark.json")
+
+try:
+    import resource
+except ImportError: # Windows
+    resource = None
+
+def peak_rss_kib():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak # bytes on macOS, KiB on Linux
+
+def make_document(path: str, page_count: int) -> None:
+    doc = fitz.open()
+    for i in range(page_count):
+        page = doc.new_page(width=595, height=842)
+        page.insert_text((72, 72), f"Benchmark page {i + 1}", fontsize=18)
+    doc.save(path)
+    doc.close()
+
+def draw_stroke(scene, rng: random.Random, width: float, height: float, points: int) -> None:
+    """Feeds one stroke through the pen path of InkCanvas (start/move/end)."""
+    x, y = rng.uniform(0, width), rng.uniform(0, height)
+    scene.tool = "pencil"
+    scene.start_stroke(QPointF(x, y), 1.0)
+    for _ in range(points - 1):
+        x = min(max(x + rng.uniform(-6, 6), 0), width)
+        y = min(max(y + rng.uniform(-6, 6), 0), height)
+        scene.move_stroke(QPointF(x, y), 1.0)
+    scene.end_stroke(QPointF(x, y), 1.0)
+
+def erase_strokes(scene, count: int) -> None:
+    """Erases the first strokes on the page through the eraser path."""
+    erased = 0
+    for stroke in scene.get_strokes():
+        if erased >= count:
+            break
+        scene.tool = "eraser"
+        x, y = stroke["points"][0]
+        scene.start_stroke(QPointF(x, y), 1.0)
+        scene.end_stroke(QPointF(x, y), 1.0)
+        erased += 1
+    scene.tool = "pencil"
+
+def make_image(rng: random.Random, size: int) -> QImage:
+    image = QImage(size, size, QImage.Format.Format_RGB32)
+    image.fill(QColor(rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+    return image
+
+def run_document(page_count: int, args, rng: random.Random) -> dict:
+    """
+    Benchmarks a fresh document of page_count pages in a directory removed
+    afterwards. Journals, the text index and the library live there too, so
+    a run leaves nothing in the working directory.
+    """
+    with tempfile.TemporaryDirectory(prefix="studylens_bench_") as work_dir:
+        path = os.path.join(work_dir, f"bench_{page_count}.pdf")
+        make_document(path, page_count)
+        db_path = os.path.join(work_dir, "study_data.db")
+        index, library = TextIndex(db_path), DocumentLibrary(db_path)
+        shared = (ink_journal.JOURNALS_DIR, TextIndex._shared, DocumentLibrary._shared)
+        ink_journal.JOURNALS_DIR = os.path.join(work_dir, "journals")
+        TextIndex._shared, DocumentLibrary._shared = index, library
+        try:
+            return measure_document(path, page_count, args, rng)
+        finally:
+            index_pool().waitForDone()
+            ink_journal.JOURNALS_DIR, TextIndex._shared, DocumentLibrary._shared = shared
+            index.close()
+            library.close()
+
+def measure_document(path: str, page_count: int, args, rng: random.Random) -> dict:
+    viewer = PDFViewer()
+    viewer.set_document(fitz.open(path))
+    # The completion handler runs on the GUI thread too: time it on its own
+    apply_times = []
+    on_save_finished = viewer.on_save_finished
+    def timed_on_save_finished(job, report):
+        start = time.perf_counter()
+        on_save_finished(job, report)
+        apply_times.append((time.perf_counter() - start) * 1000)
+    viewer.on_save_finished = timed_on_save_finished
+    scene_width, scene_height = viewer.sceneRect().width(), viewer.sceneRect().height()
+
+    cycles = []
+    previous_size = os.path.getsize(path)
+    for cycle in range(args.cycles):
+        pages = rng.sample(range(page_count), min(args.pages_per_cycle, page_count))
+        strokes = 0
+        for page_num in pages:
+            viewer.set_page(page_num)
+            if args.erase_per_page and cycle > 0:
+                erase_strokes(viewer.scene, args.erase_per_page)
+            for _ in range(args.strokes_per_page):
+                draw_stroke(viewer.scene, rng, scene_width, scene_height, args.points_per_stroke)
+                strokes += 1
+            for _ in range(args.images_per_page):
+                viewer.scene.add_image(make_image(rng, 64), QPointF(rng.uniform(64, scene_width - 64), rng.uniform(64, scene_height - 64)))
+
+        tracemalloc.start()
+        apply_times.clear()
+        start = time.perf_counter()
+        viewer.save_annotations()
+        save_call_ms = (time.perf_counter() - start) * 1000
+        viewer.flush_saves()
+        wall_ms = (time.perf_counter() - start) * 1000
+        gui_apply_ms = sum(apply_times)
+        gui_block_ms = save_call_ms + gui_apply_ms
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        size = os.path.getsize(path)
+        cycles.append({
+            "cycle": cycle,
+            "pages_touched": len(pages),
+            "strokes_added": strokes,
+            "gui_block_ms": round(gui_block_ms, 2),
+            "gui_apply_ms": round(gui_apply_ms, 2),
+            "wall_ms": round(wall_ms, 2),
+            "peak_python_kib": peak // 1024,
+            "file_bytes": size,
+            "growth_bytes": size - previous_size
+        })
+        previous_size = size
+        print(f"[Bench] {page_count} pages, cycle {cycle}: wall {wall_ms:.1f} ms, "
+              f"GUI {gui_block_ms:.1f} ms (apply {gui_apply_ms:.1f} ms), +{cycles[-1]['growth_bytes']} bytes")
+
+    viewer.cancel_indexing()
+    viewer.close_journal()
+    viewer.doc.close()
+
+    # Re-open cost with everything written so far (parse + first page + ink layer)
+    start = time.perf_counter()
+    reopened = PDFViewer()
+    reopened.set_document(fitz.open(path))
+    reopen_ms = (time.perf_counter() - start) * 1000
+    reopened.cancel_indexing()
+    reopened.close_journal()
+    reopened.doc.close()
+
+    strokes_total = sum(c["strokes_added"] for c in cycles)
+    growth_total = sum(c["growth_bytes"] for c in cycles)
+    return {
+        "pages": page_count,
+        "cycles": cycles,
+        "summary": {
+            "wall_ms_median": round(statistics.median(c["wall_ms"] for c in cycles), 2),
+            "wall_ms_max": max(c["wall_ms"] for c in cycles),
+            "gui_block_ms_max": max(c["gui_block_ms"] for c in cycles),
+            "gui_apply_ms_max": max(c["gui_apply_ms"] for c in cycles),
+            "peak_python_kib": max(c["peak_python_kib"] for c in cycles),
+            "growth_bytes_per_stroke": round(growth_total / strokes_total, 1) if strokes_total else 0,
+            "final_file_bytes": previous_size,
+            "reopen_ms": round(reopen_ms, 2)
+        }
+    }
+
+def check_thresholds(runs: list, thresholds: dict) -> list:
+    """Returns one message per summary value above its threshold."""
+    violations = []
+    for run in runs:
+        limits = dict(thresholds.get("default", {}))
+        limits.update(thresholds.get(str(run["pages"]), {}))
+        for metric, limit in limits.items():
+            value = run["summary"].get(metric)
+            if value is not None and value > limit:
+                violations.append(f"{run['pages']} pages: {metric} = {value} > {limit}")
+    return violations
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the annotation save path.")
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 1000], help="Document sizes to test")
+    parser.add_argument("--cycles", type=int, default=5, help="Save cycles per document")
+    parser.add_argument("--pages-per-cycle", type=int, default=5, help="Pages inked before each save")
+    parser.add_argument("--strokes-per-page", type=int, default=20)
+    parser.add_argument("--points-per-stroke", type=int, default=60)
+    parser.add_argument("--images-per-page", type=int, default=0)
+    parser.add_argument("--erase-per-page", type=int, default=2, help="Saved strokes erased per page after the first cycle")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--thresholds", default=DEFAULT_THRESHOLDS)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    rng = random.Random(args.seed)
+
+    with open(args.thresholds, "r") as f:
+        thresholds = json.load(f)
+
+    runs = [run_document(page_count, args, rng) for page_count in args.pages]
+    violations = check_thresholds(runs, thresholds)
+
+    results = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": {
+            "python": platform.python_version(),
+            "pymupdf": fitz.VersionBind,
+            "platform": platform.platform(),
+            "peak_rss_kib": peak_rss_kib()
+        },
+        "config": {k: v for k, v in vars(args).items() if k not in ("thresholds", "output")},
+        "thresholds": thresholds,
+        "runs": runs,
+        "violations": violations
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=4)
+    print(f"[Bench] Results written to {args.output}")
+
+    for violation in violations:
+        print(f"[Bench] THRESHOLD EXCEEDED: {violation}")
+    return 1 if violations else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+Cold-start benchmark with a budget check.
+
+Launches the app several times as a fresh process with --exit-after-startup
+and --profile-json, so every run pays the full import and setup cost, and
+takes the median of each milestone and phase over the runs. The median
+profile is written as JSON and compared against the startup budget; the exit
+code is 1 if the budget is exceeded.
+
+    python -m benchmarks.startup_benchmark --runs 5
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.frontend.startup_profiler import check_budget
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(BENCH_DIR)
+DEFAULT_BUDGET = os.path.join(BENCH_DIR, "startup_budget.json")
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, "results", "startup_benchmark.json")
+
+def run_once(extra_args: list) -> dict:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        profile_path = os.path.join(tmp_dir, "profile.json")
+        env = dict(os.environ)
+        env.setdefault("QT_QPA_PLATFORM", "offscreen")
+        subprocess.run(
+            [sys.executable, "-m", "src.frontend.main_window",
+             "--exit-after-startup", "--profile-json", profile_path] + extra_args,
+            cwd=PROJECT_DIR, env=env, check=True,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=120
+        )
+        with open(profile_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+def median_profile(profiles: list) -> dict:
+    """Median of every milestone and phase over the runs (phases keep their category)."""
+    milestones = {}
+    for name in {name for p in profiles for name in p["milestones"]}:
+        values = [p["milestones"][name] for p in profiles if name in p["milestones"]]
+        milestones[name] = round(statistics.median(values), 2)
+    phases = {}
+    for p in profiles:
+        for phase in p["phases"]:
+            phases.setdefault(phase["name"], {"category": phase["category"], "durations": []})["durations"].append(phase["duration_ms"])
+    return {
+        "milestones": milestones,
+        "phases": sorted(
+            ({"name": name, "category": data["category"], "duration_ms": round(statistics.median(data["durations"]), 2)}
+             for name, data in phases.items()),
+            key=lambda p: p["duration_ms"], reverse=True
+        )
+    }
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the cold start of the app.")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh processes to launch")
+    parser.add_argument("--budget", default=DEFAULT_BUDGET)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("app_args", nargs="*", help="Extra arguments for the app (e.g. a PDF to open)")
+    args = parser.parse_args(argv)
+
+    with open(args.budget, "r") as f:
+        budget = json.load(f)
+
+    profiles = [run_once(args.app_args) for _ in range(args.runs)]
+    profile = median_profile(profiles)
+    violations = check_budget(profile, budget)
+
+    results = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform()
+        },
+        "config": {"runs": args.runs, "app_args": args.app_args},
+        "budget": budget,
+        "median": profile,
+        "runs": profiles,
+        "violations": violations
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=4)
+    print(f"[Bench] Results written to {args.output}")
+
+    for name, at in sorted(profile["milestones"].items(), key=lambda item: item[1]):
+        print(f"[Bench] {name}: {at:.1f} ms (median of {args.runs})")
+    for phase in profile["phases"][:5]:
+        print(f"[Bench]   {phase['duration_ms']:8.1f} ms  {phase['name']}")
+    for violation in violations:
+        print(f"[Bench] BUDGET EXCEEDED: {violation}")
+    return 1 if violations else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
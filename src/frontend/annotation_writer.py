@@ -0,0 +1,334 @@
+import os
+import re
+import time
+import uuid
+from dataclasses import dataclass
+
+import fitz  # PyMuPDF
+from PyQt6.QtCore import QBuffer, QIODevice
+from PyQt6.QtGui import QColor
+
+from src.frontend.file_utils import file_signature
+from src.frontend.page_transform import PageTransform
+from src.frontend.tracing import traced
+from src.frontend.background_jobs import fitz_lock
+
+# Private key on our ink annotations listing the ids of the strokes (one per
+# ink path, in order) so saved strokes can be matched up again on load
+STROKE_IDS_KEY = "StudyLensStrokeIds"
+
+@dataclass(frozen=True)
+class StrokeRecord:
+    id: str
+    points: tuple # ((x, y), ...) in scene coordinates
+    color: str
+    width: float
+
+@dataclass(frozen=True)
+class ImageRecord:
+    id: str
+    image: object # QImage (implicitly shared, read-only on the worker)
+    x: float
+    y: float
+    width: float
+    height: float
+
+@dataclass(frozen=True)
+class PageRecord:
+    page_num: int
+    strokes: tuple = ()
+    images: tuple = ()
+    replace_ink: bool = False # Strokes are the page's complete ink: drop its ink annotations first
+
+@dataclass(frozen=True)
+class AnnotationSnapshot:
+    """
+    Immutable copy of everything a save has to write. It is built on the GUI
+    thread in one pass over page_data_cache and handed to a worker, so the
+    user can keep editing while the save runs.
+    """
+    path: str # Target file
+    zoom_level: float
+    pages: tuple = () # PageRecords with at least one unsaved item
+    new_page_sizes: tuple = () # (width, height) of pages that exist only in memory
+    source_bytes: bytes = None # Full document for in-memory notes (no file yet)
+    incremental: bool = True
+    batch_ink: bool = True # One multi-path annotation per pen style instead of one per stroke
+
+    def saved_ids(self) -> set:
+        ids = set()
+        for page in self.pages:
+            ids.update(s.id for s in page.strokes if s.id)
+            ids.update(i.id for i in page.images if i.id)
+        return ids
+
+def take_snapshot(page_data_cache: dict, path: str, zoom_level: float, **kwargs) -> AnnotationSnapshot:
+    """
+    Collects what has to be written for every cached page. New strokes are
+    appended; if saved strokes were erased or moved since the file was
+    written ("pdf_ids" no longer matches), the page's ink is rewritten whole.
+    """
+    pages = []
+    for page_num in sorted(page_data_cache):
+        data = page_data_cache[page_num]
+        strokes = [s for s in data.get("strokes", []) if len(s["points"]) >= 2]
+        saved_ids = {s.get("id") for s in strokes if s.get("saved", False)}
+        replace_ink = saved_ids != set(data.get("pdf_ids", ()))
+        if not replace_ink:
+            strokes = [s for s in strokes if not s.get("saved", False)]
+        strokes = tuple(StrokeRecord(s.get("id"), tuple(s["points"]), s["color"], s["width"]) for s in strokes)
+        images = tuple(
+            ImageRecord(i.get("id"), i["image"], i["x"], i["y"], i["width"], i["height"])
+            for i in data.get("images", [])
+            if not i.get("saved", False)
+        )
+        if strokes or images or replace_ink:
+            pages.append(PageRecord(page_num, strokes, images, replace_ink))
+    return AnnotationSnapshot(path=path, zoom_level=zoom_level, pages=tuple(pages), **kwargs)
+
+def apply_snapshot(doc, snapshot: AnnotationSnapshot, job=None) -> None:
+    """
+    Writes the snapshot's strokes and images into an open document, holding
+    fitz_lock one page at a time.
+    """
+    zoom = snapshot.zoom_level
+
+    # Pages added in the viewer after the file was last written
+    with fitz_lock:
+        for width, height in snapshot.new_page_sizes:
+            doc.new_page(width=width, height=height)
+
+    total = len(snapshot.pages)
+    for index, page_record in enumerate(snapshot.pages):
+        # Encode the images first: Qt work that needs no lock
+        images = []
+        for img in page_record.images:
+            try:
+                # Convert QImage to bytes (PNG format)
+                ba = QBuffer()
+                ba.open(QIODevice.OpenModeFlag.ReadWrite)
+                img.image.save(ba, "PNG")
+                images.append((img, ba.data().data()))
+            except Exception as e:
+                print(f"[ERROR] Error saving image: {e}")
+
+        with fitz_lock:
+            try:
+                page = doc.load_page(page_record.page_num)
+            except Exception as e:
+                print(f"[ERROR] Failed to load page {page_record.page_num} for saving: {e}")
+                continue
+            transform = PageTransform.for_page(page, zoom)
+
+            if page_record.replace_ink:
+                _delete_ink_annots(page)
+
+            # Process Strokes
+            if snapshot.batch_ink:
+                # Group by pen style, keeping the drawing order inside each group
+                groups = {}
+                for stroke in page_record.strokes:
+                    groups.setdefault(_stroke_style(stroke, zoom), []).append(stroke)
+                for style, strokes in groups.items():
+                    _add_ink_annot(doc, page, style, strokes, transform)
+            else:
+                for stroke in page_record.strokes:
+                    _add_ink_annot(doc, page, _stroke_style(stroke, zoom), [stroke], transform)
+
+            # Process Images
+            for img, image_bytes in images:
+                try:
+                    rect = transform.image_rect(page, img.x, img.y, img.width, img.height)
+                    page.insert_image(rect, stream=image_bytes)
+                except Exception as e:
+                    print(f"[ERROR] Error saving image: {e}")
+
+        if job is not None:
+            job.report_progress(index + 1, total)
+
+def _stroke_style(stroke: StrokeRecord, zoom: float) -> tuple:
+    """(rgb, opacity, width in PDF units) of a stroke."""
+    qcolor = QColor(stroke.color)
+    if not qcolor.isValid():
+        print(f"[ERROR] Invalid color: {stroke.color}")
+        qcolor = QColor("black") # Default to black
+    rgb = (qcolor.redF(), qcolor.greenF(), qcolor.blueF())
+    return rgb, round(qcolor.alphaF(), 3), stroke.width / zoom
+
+def _add_ink_annot(doc, page, style: tuple, strokes: list, transform: PageTransform):
+    """Adds one ink annotation holding every stroke in the list as its own path."""
+    rgb, opacity, width = style
+    # Convert scene points to page space, one array operation per stroke
+    paths = [transform.scene_to_pdf(stroke.points).tolist() for stroke in strokes]
+    annot = page.add_ink_annot(paths)
+    annot.set_colors(stroke=rgb)
+    annot.set_border(width=width)
+    if opacity < 1:
+        annot.set_opacity(opacity)
+    annot.update()
+
+    ids = " ".join(f"({stroke.id or ''})" for stroke in strokes)
+    doc.xref_set_key(annot.xref, STROKE_IDS_KEY, f"[{ids}]")
+    return annot
+
+def _delete_ink_annots(page) -> None:
+    annot = page.first_annot
+    while annot:
+        if annot.type[0] == fitz.PDF_ANNOT_INK:
+            annot = page.delete_annot(annot)
+        else:
+            annot = annot.next
+
+def load_ink_strokes(doc, page_num: int, zoom_level: float) -> list:
+    """
+    Reads a page's ink annotations back as saved stroke dicts in scene
+    coordinates, so they stay editable. Our own annotations keep their stroke
+    ids; ink from other applications gets fresh ones.
+    """
+    if page_num >= doc.page_count:
+        return []
+    page = doc.load_page(page_num)
+    transform = PageTransform.for_page(page, zoom_level)
+    strokes = []
+    for annot in page.annots(types=[fitz.PDF_ANNOT_INK]):
+        ids = read_stroke_ids(doc, annot)
+        rgb = annot.colors.get("stroke") or (0, 0, 0)
+        opacity = annot.opacity if 0 <= annot.opacity < 1 else 1.0
+        color = QColor.fromRgbF(*rgb, opacity).name(QColor.NameFormat.HexArgb)
+        border_width = annot.border.get("width") or -1
+        width = (border_width if border_width > 0 else 1) * zoom_level
+        for index, path in enumerate(annot.vertices or []):
+            if len(path) < 2:
+                continue # Nothing to draw (and nothing a save would write back)
+            uid = ids[index] if index < len(ids) and ids[index] else str(uuid.uuid4())
+            strokes.append({
+                "points": [tuple(p) for p in transform.pdf_to_scene(path).tolist()],
+                "color": color,
+                "width": width,
+                "id": uid,
+                "saved": True
+            })
+    return strokes
+
+def read_stroke_ids(doc, annot) -> list:
+    """Returns the stroke ids stored on one of our ink annotations ([] for foreign ones)."""
+    kind, value = doc.xref_get_key(annot.xref, STROKE_IDS_KEY)
+    if kind != "array":
+        return []
+    return re.findall(r"\(([^)]*)\)", value)
+
+@traced("write_snapshot", "save")
+def write_snapshot(snapshot: AnnotationSnapshot, job=None) -> dict:
+    """
+    Worker-side save: opens its own handle on the document, applies the
+    snapshot and writes it to disk.
+
+    Incremental saves append to the file in place. Full saves go to a
+    temporary file that the viewer swaps in on the GUI thread, because the
+    viewer's own handle keeps the file open and Windows cannot replace it
+    from here.
+    """
+    start_time = time.perf_counter()
+    temp_path = None
+
+    with fitz_lock:
+        if snapshot.source_bytes is not None:
+            doc = fitz.open("pdf", snapshot.source_bytes)
+        else:
+            doc = fitz.open(snapshot.path)
+
+    try:
+        apply_snapshot(doc, snapshot, job)
+
+        # Writing touches only this handle, so it runs without fitz_lock
+        # and the GUI keeps rendering meanwhile (see background_jobs)
+        if snapshot.source_bytes is not None:
+            os.makedirs(os.path.dirname(snapshot.path), exist_ok=True)
+            doc.save(snapshot.path)
+            strategy = "new_file"
+        elif snapshot.incremental and doc.can_save_incrementally():
+            # Append only the changed objects to the end of the file.
+            # Cost scales with the edit, not with the document size.
+            doc.saveIncr()
+            strategy = "incremental"
+        else:
+            # Full save with garbage collection and deflation
+            # garbage=4: Remove unused objects
+            # deflate=True: Compress streams
+            temp_path = snapshot.path + ".tmp"
+            doc.save(temp_path, garbage=4, deflate=True)
+            strategy = "full"
+    finally:
+        with fitz_lock:
+            doc.close()
+
+    return {
+        "strategy": strategy,
+        "duration_ms": (time.perf_counter() - start_time) * 1000,
+        "path": snapshot.path,
+        "temp_path": temp_path
+    }
+
+def compact_pdf(path: str):
+    """
+    Worker-side compaction: rewrites the file with garbage collection into a
+    temporary file using its own document handle. Returns
+    (temp_path, path, signature of the source when it was read, duration_ms).
+    """
+    start_time = time.perf_counter()
+    signature = file_signature(path)
+    temp_path = path + ".compact.tmp"
+    with fitz_lock:
+        doc = fitz.open(path)
+    try:
+        doc.save(temp_path, garbage=4, deflate=True) # Own handle: no lock (see write_snapshot)
+    finally:
+        with fitz_lock:
+            doc.close()
+    return temp_path, path, signature, (time.perf_counter() - start_time) * 1000
+
+def repair_pdf(path: str, job=None):
+    """
+    Worker-side repair: rewrites a document that cannot be saved
+    incrementally (damaged or "repaired" on open) into a normalized copy next
+    to it. The original is not touched; the viewer swaps the copy in at the
+    next save. Returns (temp_path, path, signature of the source when it was
+    read, duration_ms), or None if cancelled.
+    """
+    start_time = time.perf_counter()
+    steps = 3
+    signature = file_signature(path)
+    temp_path = path + ".repair.tmp"
+
+    if job is not None:
+        job.report_progress(0, steps)
+    with fitz_lock:
+        doc = fitz.open(path)
+        page_count = doc.page_count
+    try:
+        if job is not None:
+            if job.cancelled:
+                return None
+            job.report_progress(1, steps)
+        doc.save(temp_path, garbage=4, deflate=True) # Own handle: no lock (see write_snapshot)
+    finally:
+        with fitz_lock:
+            doc.close()
+    if job is not None:
+        job.report_progress(2, steps)
+
+    # The copy must open cleanly, keep every page and accept incremental saves
+    with fitz_lock:
+        check = fitz.open(temp_path)
+        try:
+            ok = check.page_count == page_count and check.can_save_incrementally()
+        finally:
+            check.close()
+    if not ok or (job is not None and job.cancelled):
+        os.remove(temp_path)
+        if not ok:
+            raise RuntimeError(f"Repaired copy of {path} failed verification")
+        return None
+    if job is not None:
+        job.report_progress(steps, steps)
+    return temp_path, path, signature, (time.perf_counter() - start_time) * 1000
@@ -0,0 +1,127 @@
+import functools
+import threading
+import traceback
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+class JobSignals(QObject):
+    finished = pyqtSignal(object) # Return value of the job function
+    failed = pyqtSignal(str)
+    progress = pyqtSignal(int, int) # done, total
+    partial = pyqtSignal(object) # A piece of the result, delivered while the job runs
+    cancelled = pyqtSignal()
+
+class BackgroundJob(QRunnable):
+    """
+    Runs a function on a worker thread and reports back through Qt signals,
+    which are delivered on the GUI thread.
+
+    With pass_job=True the function receives the job as its 'job' keyword
+    argument, so it can call report_progress() / report_partial() and poll
+    cancelled.
+    """
+    def __init__(self, fn, *args, pass_job: bool = False, **kwargs):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        if pass_job:
+            self.kwargs["job"] = self
+        self.signals = JobSignals()
+        self.result = None
+        self._cancelled = threading.Event()
+        self._done = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def report_progress(self, done: int, total: int) -> None:
+        self.signals.progress.emit(done, total)
+
+    def report_partial(self, value) -> None:
+        self.signals.partial.emit(value)
+
+    def wait(self, timeout: float = None) -> bool:
+        """Blocks until the job has run. Returns False on timeout."""
+        return self._done.wait(timeout)
+
+    def is_done(self) -> bool:
+        return self._done.is_set()
+
+    def run(self) -> None:
+        if self.cancelled:
+            self._done.set()
+            self.signals.cancelled.emit()
+            return
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            traceback.print_exc()
+            self._done.set()
+            self.signals.failed.emit(str(e))
+            return
+        self.result = result
+        self._done.set()
+        self.signals.finished.emit(result)
+
+# Jobs must outlive their Python references until the result is delivered
+_active_jobs = set()
+_io_pool = None
+
+# PyMuPDF does not support multithreaded use and it releases the GIL while
+# it works. Fitz calls, on the GUI thread and in the jobs of every pool
+# (io_pool(), index_pool(), the global pool), are made under this lock.
+# Jobs take it per small unit of work (a page written, extracted or
+# searched, a thumbnail), so the GUI only waits for the unit in progress.
+# The one exception is writing a document a job opened for itself
+# (doc.save(), doc.saveIncr()): it reads and writes only that handle, takes
+# as long as the file is big, and runs without the lock. The GUI thread
+# keeps its page count and page sizes in PDFViewer and reuses cached
+# rasters, so flipping to a visited page needs no lock at all. Never wait
+# for a job while holding it.
+fitz_lock = threading.RLock()
+
+def fitz_locked(fn):
+    """Decorator: the whole call holds fitz_lock."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with fitz_lock:
+            return fn(*args, **kwargs)
+    return wrapper
+
+def io_pool() -> QThreadPool:
+    """
+    Single-threaded pool for file writes, so disk jobs never overlap. Jobs
+    that use fitz still take fitz_lock (see above).
+    """
+    global _io_pool
+    if _io_pool is None:
+        _io_pool = QThreadPool()
+        _io_pool.setMaxThreadCount(1)
+    return _io_pool
+
+def run_in_background(fn, *args, on_finished=None, on_failed=None, on_progress=None, on_partial=None,
+                      pool: QThreadPool = None, priority: int = 0, pass_job: bool = False, **kwargs) -> BackgroundJob:
+    """Creates a BackgroundJob, connects the callbacks and starts it."""
+    job = BackgroundJob(fn, *args, pass_job=pass_job, **kwargs)
+    if on_finished:
+        job.signals.finished.connect(on_finished)
+    if on_failed:
+        job.signals.failed.connect(on_failed)
+    if on_progress:
+        job.signals.progress.connect(on_progress)
+    if on_partial:
+        job.signals.partial.connect(on_partial)
+
+    _active_jobs.add(job)
+    job.signals.finished.connect(lambda _: _active_jobs.discard(job))
+    job.signals.failed.connect(lambda _: _active_jobs.discard(job))
+    job.signals.cancelled.connect(lambda: _active_jobs.discard(job))
+
+    (pool or QThreadPool.globalInstance()).start(job, priority)
+    return job
@@ -0,0 +1,76 @@
+from collections import OrderedDict
+
+from src.frontend.config_manager import ConfigManager
+
+DEFAULT_BUDGET_MB = 256
+
+class CachePool:
+    """
+    One memory budget shared by every open document for data that can be
+    rebuilt on demand (page rasters, ink read from the file).
+
+    Entries are kept in least-recently-used order across all owners. When
+    the pool is over budget, entries of background owners are evicted
+    first, so inactive tabs shrink before the tab on screen loses anything.
+    An entry may carry an evict() callback: it is called before the entry is
+    dropped and may return False to keep it (e.g. ink with unsaved changes).
+    """
+    _shared = None
+
+    def __init__(self, budget_bytes: int):
+        self.budget_bytes = budget_bytes
+        self.used_bytes = 0
+        self._entries = OrderedDict() # (owner, key) -> [value, cost, evict]
+        self._active_owner = None
+
+    @classmethod
+    def shared(cls) -> "CachePool":
+        if cls._shared is None:
+            budget_mb = ConfigManager().get_setting("cache_budget_mb", DEFAULT_BUDGET_MB)
+            cls._shared = cls(int(budget_mb) << 20)
+        return cls._shared
+
+    def get(self, owner, key, default=None):
+        entry = self._entries.get((owner, key))
+        if entry is None:
+            return default
+        self._entries.move_to_end((owner, key))
+        return entry[0]
+
+    def put(self, owner, key, value, cost: int, evict=None) -> None:
+        self.discard(owner, key)
+        self._entries[(owner, key)] = [value, cost, evict]
+        self.used_bytes += cost
+        self.shrink()
+
+    def discard(self, owner, key) -> None:
+        entry = self._entries.pop((owner, key), None)
+        if entry is not None:
+            self.used_bytes -= entry[1]
+
+    def discard_owner(self, owner) -> None:
+        for entry_key in [k for k in self._entries if k[0] is owner]:
+            self.used_bytes -= self._entries.pop(entry_key)[1]
+
+    def owner_bytes(self, owner) -> int:
+        return sum(entry[1] for (entry_owner, _), entry in self._entries.items() if entry_owner is owner)
+
+    def set_active_owner(self, owner) -> None:
+        """The owner on screen: its entries are evicted last."""
+        self._active_owner = owner
+        self.shrink()
+
+    def shrink(self) -> None:
+        if self.used_bytes <= self.budget_bytes:
+            return
+        # Background owners first, then the active one, oldest first in each
+        candidates = [k for k in self._entries if k[0] is not self._active_owner]
+        candidates += [k for k in self._entries if k[0] is self._active_owner]
+        for entry_key in candidates:
+            if self.used_bytes <= self.budget_bytes:
+                break
+            value, cost, evict = self._entries[entry_key]
+            if evict is not None and evict() is False:
+                continue # Pinned for now
+            del self._entries[entry_key]
+            self.used_bytes -= cost
@@ -29,3 +29,6 @@ class ConfigManager:
 
     def get_gestures(self) -> dict:
         return self._config.get('gestures', {})
+
+    def get_setting(self, name: str, default=None):
+        return self._config.get('settings', {}).get(name, default)
@@ -0,0 +1,29 @@
+import os
+import time
+
+def file_signature(path: str):
+    """Returns [mtime_ns, size] of a file, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+        return [st.st_mtime_ns, st.st_size]
+    except OSError:
+        return None
+
+def replace_file(temp_path: str, target_path: str, max_retries: int = 3) -> None:
+    """
+    Atomically replaces target_path with temp_path, retrying briefly because
+    Windows refuses to replace files that another process has open.
+    """
+    for attempt in range(max_retries):
+        try:
+            if os.path.exists(target_path):
+                os.replace(temp_path, target_path)
+            else:
+                os.rename(temp_path, target_path)
+            return
+        except OSError as e_os:
+            if attempt < max_retries - 1:
+                print(f"[WARNING] File replace failed (attempt {attempt+1}/{max_retries}): {e_os}. Retrying...")
+                time.sleep(0.5)
+            else:
+                raise e_os
@@ -34,3 +34,11 @@ class BaseGesture(ABC):
             bool: True if the event was handled, False otherwise.
         """
         pass
+
+    def claims(self) -> bool:
+        """
+        True while an interaction this gesture has started is in progress
+        (e.g. between pen press and release). The manager then sends events
+        of its types straight to it, skipping the other handlers.
+        """
+        return False
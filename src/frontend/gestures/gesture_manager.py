@@ -1,4 +1,4 @@
-from typing import List, Dict
+from typing import Dict, Tuple
 from PyQt6.QtCore import QEvent, Qt
 from PyQt6.QtWidgets import QGraphicsView
 from .base_gesture import BaseGesture
@@ -6,49 +6,86 @@ from .base_gesture import BaseGesture
 class GestureManager:
     """
     Manages registration and dispatching of gestures for a QGraphicsView.
+
+    Registration compiles one handler chain per event type (and per gesture
+    type), in registration order; freeze() ends registration, after which
+    dispatching an event is one dict lookup and a walk over its chain.
+    A handler whose claims() is true after handling an event owns the
+    interaction: further events of its types go straight to it until it
+    lets go (e.g. the moves and the release of a pen stroke).
     """
     def __init__(self, view: QGraphicsView):
         self.view = view
-        self.gesture_handlers: Dict[Qt.GestureType, List[BaseGesture]] = {}
-        self.event_handlers: Dict[QEvent.Type, List[BaseGesture]] = {}
+        self.frozen = False
+        self._event_chains: Dict[QEvent.Type, Tuple[BaseGesture, ...]] = {}
+        self._gesture_chains: Dict[Qt.GestureType, Tuple[BaseGesture, ...]] = {}
+        self._owner = None # Gesture holding a claim
+        self._owner_types = frozenset()
+        self.recorder = None # InputRecorder capturing the events, if a session is being recorded
 
     def register_gesture(self, gesture: BaseGesture):
         """
         Registers a gesture handler.
         """
+        if self.frozen:
+            raise RuntimeError("Gestures cannot be registered after the dispatch table is frozen")
+
         # Register for Gesture Types
         for g_type in gesture.gesture_types():
-            if g_type not in self.gesture_handlers:
-                self.gesture_handlers[g_type] = []
+            if g_type not in self._gesture_chains:
+                self._gesture_chains[g_type] = ()
                 self.view.grabGesture(g_type)
-            self.gesture_handlers[g_type].append(gesture)
+            self._gesture_chains[g_type] += (gesture,)
 
         # Register for Event Types
         for e_type in gesture.event_types():
-            if e_type not in self.event_handlers:
-                self.event_handlers[e_type] = []
-            self.event_handlers[e_type].append(gesture)
+            self._event_chains[e_type] = self._event_chains.get(e_type, ()) + (gesture,)
+
+    def freeze(self) -> None:
+        """Ends registration; the chains are final from now on."""
+        self.frozen = True
 
     def dispatch_event(self, event: QEvent) -> bool:
         """
         Dispatches an event to the appropriate registered gesture handlers.
         """
-        handled = False
-        
-        # Handle QGestureEvents
-        if event.type() == QEvent.Type.Gesture:
-            for gesture_obj in event.gestures():
-                g_type = gesture_obj.gestureType()
-                if g_type in self.gesture_handlers:
-                    for handler in self.gesture_handlers[g_type]:
-                        if handler.handle_event(event, self.view):
-                            handled = True
+        event_type = event.type()
+        if self.recorder is not None:
+            self.recorder.record(event)
+
+        # Handle QGestureEvents: every handler of a gesture in the event, once
+        if event_type == QEvent.Type.Gesture:
+            return self._dispatch_gestures(event)
+
+        # An interaction in progress goes to its owner only
+        owner = self._owner
+        if owner is not None and event_type in self._owner_types:
+            handled = owner.handle_event(event, self.view)
+            if not owner.claims():
+                self._owner = None
             return handled
 
-        # Handle Standard Events
-        if event.type() in self.event_handlers:
-            for handler in self.event_handlers[event.type()]:
-                if handler.handle_event(event, self.view):
-                    return True
-                    
+        # Handle Standard Events: the first handler to accept it wins
+        for handler in self._event_chains.get(event_type, ()):
+            if handler.handle_event(event, self.view):
+                if handler.claims():
+                    self._owner = handler
+                    self._owner_types = frozenset(handler.event_types())
+                return True
         return False
+
+    def _dispatch_gestures(self, event: QEvent) -> bool:
+        gestures = event.gestures()
+        if len(gestures) == 1:
+            chain = self._gesture_chains.get(gestures[0].gestureType(), ())
+        else:
+            chain = []
+            for gesture_obj in gestures:
+                for handler in self._gesture_chains.get(gesture_obj.gestureType(), ()):
+                    if handler not in chain:
+                        chain.append(handler)
+        handled = False
+        for handler in chain:
+            if handler.handle_event(event, self.view):
+                handled = True
+        return handled
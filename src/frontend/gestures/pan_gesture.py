@@ -22,6 +22,9 @@ class PanGesture(BaseGesture):
             QEvent.Type.MouseButtonRelease
         ]
 
+    def claims(self) -> bool:
+        return self._is_panning
+
     def handle_event(self, event: QEvent, view: QGraphicsView) -> bool:
         # Ignore Stylus input (let it pass to PenGesture)
         if hasattr(event, 'device') and event.device().type() == QInputDevice.DeviceType.Stylus:
@@ -1,6 +1,7 @@
 from PyQt6.QtCore import QEvent, Qt
 from PyQt6.QtGui import QPointingDevice
 from PyQt6.QtWidgets import QGraphicsView
+from src.frontend.ink_input import TabletSampleBuffer
 from .base_gesture import BaseGesture
 
 class PenGesture(BaseGesture):
@@ -8,6 +9,10 @@ class PenGesture(BaseGesture):
     Handles pen input for drawing on the InkCanvas.
     """
     
+    def __init__(self):
+        self._in_stroke = False # Between press and release
+        self._buffer = None # TabletSampleBuffer of the view, created by the first press
+
     def gesture_types(self) -> list[Qt.GestureType]:
         return []
 
@@ -18,22 +23,37 @@ class PenGesture(BaseGesture):
             QEvent.Type.TabletRelease
         ]
 
+    def claims(self) -> bool:
+        return self._in_stroke
+
     def handle_event(self, event: QEvent, view: QGraphicsView) -> bool:
+        event_type = event.type()
+
+        # Hot path: moves are only buffered; the buffer feeds the stroke once per frame
+        if event_type == QEvent.Type.TabletMove:
+            if self._in_stroke:
+                self._buffer.add_sample(event.position(), event.pressure(), event.timestamp())
+                event.accept()
+                return True
+            return False
+
         # Ensure we have access to the scene and it's an InkCanvas (or has compatible interface)
         if not hasattr(view, 'scene') or not hasattr(view.scene, 'is_drawing'):
             return False
             
         scene = view.scene
-        pos = view.mapToScene(event.position().toPoint())
         pressure = event.pressure()
-        pointer_type = event.pointerType()
         
         # Dispatch to Scene
-        if event.type() == QEvent.Type.TabletPress:
-            print(pointer_type)
+        if event_type == QEvent.Type.TabletPress:
+            if self._buffer is None or self._buffer.view is not view:
+                self._buffer = TabletSampleBuffer(view, scene.extend_stroke, getattr(view, 'ink_latency', None))
+            self._buffer.begin()
+            pos = self._buffer.map_to_scene(event.position())
             
             # Determine Tool (Only update on press to prevent switching mid-stroke)
             if not scene.is_drawing:
+                pointer_type = event.pointerType()
                 if pointer_type == QPointingDevice.PointerType.Eraser:
                     scene.tool = "eraser"
                 elif pointer_type == QPointingDevice.PointerType.Pen:
@@ -41,24 +61,22 @@ class PenGesture(BaseGesture):
                         scene.tool = "lasso"
                     else:
                         scene.tool = "pencil"
-
             scene.is_drawing = True
+            self._in_stroke = True
             scene.start_stroke(pos, pressure)
             event.accept()
             return True
-            
-        elif event.type() == QEvent.Type.TabletMove:
-            if scene.is_drawing:
-                scene.move_stroke(pos, pressure)
-                event.accept()
-                return True
                 
-        elif event.type() == QEvent.Type.TabletRelease:
-            if pointer_type == QPointingDevice.PointerType.Eraser:
-                print(f"TabletRelease (Eraser): Button={event.button()}, Buttons={event.buttons()}, Modifiers={event.modifiers()}")
+        elif event_type == QEvent.Type.TabletRelease:
+            if self._buffer is not None:
+                self._buffer.flush() # The last frame's samples belong to the stroke
+                pos = self._buffer.map_to_scene(event.position())
+            else:
+                pos = view.mapToScene(event.position().toPoint())
             if scene.is_drawing:
                 scene.end_stroke(pos, pressure)
                 scene.is_drawing = False
+            self._in_stroke = False
             event.accept()
             return True
             
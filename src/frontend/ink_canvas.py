@@ -2,11 +2,15 @@ from PyQt6.QtWidgets import QGraphicsScene, QGraphicsPathItem
 from PyQt6.QtGui import QPainterPath, QPen, QColor, QImage, QTransform
 from PyQt6.QtCore import Qt, QPointF, QRectF, QTimer, pyqtSignal
 
+from contextlib import contextmanager
 import uuid
 
+from src.frontend.ink_input import InkPredictor
+from src.frontend.tracing import tracer, traced
+
 class InkCanvas(QGraphicsScene):
     strokeCreated = pyqtSignal(dict)
-    strokeErased = pyqtSignal(dict) # Emits the stroke DATE of the erased item
+    strokesErased = pyqtSignal(list) # All strokes erased by one eraser sweep
     itemsMoved = pyqtSignal(list) # List of {id, offset}
     imageAdded = pyqtSignal(dict)
     imageMoved = pyqtSignal(dict)
@@ -34,8 +38,21 @@ class InkCanvas(QGraphicsScene):
         self.erased_items_in_stroke = [] # Track erased items specifically for undo
         self.start_move_offsets = {} # Track initial positions for move undo
 
+        # Batch Update State (see suspend_updates)
+        self._suspend_depth = 0
+        self._saved_index_method = None
+        self._id_index = None # Lazily built {uuid: item} lookup
+
+        # Predicted pen path drawn ahead of the live stroke (off while horizon_ms is 0).
+        # Only painted in drawForeground: never an item, so never saved or undone.
+        self.predictor = InkPredictor()
+        self._prediction_path = None
+        self._prediction_pen = None
+        self._prediction_rect = None
 
     def start_stroke(self, pos: QPointF, pressure: float) -> None:
+        self.predictor.reset()
+        self.show_prediction([])
         # Eraser Logic (Deselect or Erase)
         if self.tool == "eraser":
             self.deselected_items_in_stroke.clear()
@@ -103,7 +120,63 @@ class InkCanvas(QGraphicsScene):
         elif self.tool == "eraser":
             self.process_eraser_at(pos)
 
+    def extend_stroke(self, points: list, pressures: list, timestamps: list = None) -> None:
+        """
+        move_stroke() for all samples of one frame; the path item is updated
+        once. With their timestamps, pen strokes also get a prediction.
+        """
+        if not points:
+            return
+        if self.is_moving_selection:
+            self.move_stroke(points[-1], pressures[-1])
+            return
+
+        if not self.is_drawing:
+            return
+
+        if (self.tool == "pencil" or self.tool == "lasso") and self.current_path:
+            for pos in points:
+                self.current_path.lineTo(pos)
+            self.current_item.setPath(self.current_path)
+            if self.tool == "pencil" and timestamps and self.predictor.horizon_ms > 0:
+                self.predictor.add_samples(points, timestamps)
+                self.show_prediction(self.predictor.predict())
+
+        elif self.tool == "eraser":
+            for pos in points:
+                self.process_eraser_at(pos)
+
+    def show_prediction(self, points: list) -> None:
+        """Draws points as a provisional segment from the end of the live stroke ([] removes it)."""
+        old_rect = self._prediction_rect
+        if points and self.current_path is not None and self.current_item is not None:
+            path = QPainterPath(self.current_path.currentPosition())
+            for pos in points:
+                path.lineTo(pos)
+            pen = QPen(self.current_item.pen())
+            color = pen.color()
+            color.setAlphaF(color.alphaF() * 0.5)
+            pen.setColor(color)
+            margin = pen.widthF() + 1
+            self._prediction_path = path
+            self._prediction_pen = pen
+            self._prediction_rect = path.boundingRect().adjusted(-margin, -margin, margin, margin)
+        else:
+            self._prediction_path = None
+            self._prediction_rect = None
+        if old_rect is not None:
+            self.update(old_rect)
+        if self._prediction_rect is not None:
+            self.update(self._prediction_rect)
+
+    def drawForeground(self, painter, rect: QRectF) -> None:
+        super().drawForeground(painter, rect)
+        if self._prediction_path is not None and rect.intersects(self._prediction_rect):
+            painter.setPen(self._prediction_pen)
+            painter.drawPath(self._prediction_path)
+
     def end_stroke(self, pos: QPointF, pressure: float) -> None:
+        self.show_prediction([]) # Real samples only from here on
         if self.is_moving_selection:
             self.is_moving_selection = False
             
@@ -142,12 +215,13 @@ class InkCanvas(QGraphicsScene):
                  # If replacing/fresh, ensure we clear any stale state (though clear_selection usually handles this)
                  self.clear_selection()
 
-            # Select items intersecting the path
-            self.setSelectionArea(self.current_path, op, Qt.ItemSelectionMode.IntersectsItemShape, QTransform())
-            
-            # Create selection group from ALL selected items (Old + New)
-            items = self.selectedItems()
-            self.create_selection_group(items)
+            with tracer.span("lasso select", "ink", points=self.current_path.elementCount()):
+                # Select items intersecting the path
+                self.setSelectionArea(self.current_path, op, Qt.ItemSelectionMode.IntersectsItemShape, QTransform())
+                
+                # Create selection group from ALL selected items (Old + New)
+                items = self.selectedItems()
+                self.create_selection_group(items)
             
             # Remove the visual lasso path after a short delay to show closure
             item_to_remove = self.current_item
@@ -175,11 +249,58 @@ class InkCanvas(QGraphicsScene):
             self.current_item = None
             
         elif self.tool == "eraser":
-            # Emit Erase Signal for all items erased in this stroke
-             for item_data in self.erased_items_in_stroke:
-                 self.strokeErased.emit(item_data)
+            # Emit one signal for the whole sweep so it becomes a single undo step
+             if self.erased_items_in_stroke:
+                 self.strokesErased.emit(self.erased_items_in_stroke)
              self.erased_items_in_stroke = []
 
+    @contextmanager
+    def suspend_updates(self):
+        """
+        Suspends BSP index maintenance and view repaints while many items are
+        added or removed (e.g. multi-step undo). The index is rebuilt and the
+        views repainted once when the outermost block exits.
+        """
+        self._suspend_depth += 1
+        if self._suspend_depth == 1:
+            self._saved_index_method = self.itemIndexMethod()
+            self.setItemIndexMethod(QGraphicsScene.ItemIndexMethod.NoIndex)
+            for view in self.views():
+                view.viewport().setUpdatesEnabled(False)
+        try:
+            yield
+        finally:
+            self._suspend_depth -= 1
+            if self._suspend_depth == 0:
+                self.setItemIndexMethod(self._saved_index_method)
+                for view in self.views():
+                    view.viewport().setUpdatesEnabled(True)
+                    view.viewport().update()
+
+    def clear(self) -> None:
+        # clear() deletes the items, so the id index must not outlive them
+        self._id_index = None
+        super().clear()
+
+    def find_item_by_id(self, uid):
+        """Returns the item with the given UUID, or None."""
+        if uid is None:
+            return None
+
+        if self._id_index is not None:
+            item = self._id_index.get(uid)
+            if item is not None and item.scene() is self and item.data(Qt.ItemDataRole.UserRole + 1) == uid:
+                return item
+
+        # Index missing or stale: rebuild it in one pass over the scene
+        index = {}
+        for item in self.items():
+            item_id = item.data(Qt.ItemDataRole.UserRole + 1)
+            if item_id is not None and item_id not in index:
+                index[item_id] = item
+        self._id_index = index
+        return index.get(uid)
+
 
     def erase_at(self, pos: QPointF) -> None:
         eraser_rect = QRectF(pos.x() - 2, pos.y() - 2, 4, 4)
@@ -188,6 +309,7 @@ class InkCanvas(QGraphicsScene):
             if isinstance(item, QGraphicsPathItem):
                 self.removeItem(item)
 
+    @traced("get_strokes", "ink")
     def get_strokes(self) -> list:
         strokes = []
         # items() returns items in descending stacking order (top-most first).
@@ -215,7 +337,6 @@ class InkCanvas(QGraphicsScene):
                         "id": item.data(Qt.ItemDataRole.UserRole + 1),
                         "saved": is_saved
                     })
-        print(f"[DEBUG] get_strokes found {len(strokes)} strokes")
         return strokes
 
     def mark_strokes_as_saved(self, stroke_ids: list) -> None:
@@ -229,6 +350,15 @@ class InkCanvas(QGraphicsScene):
                 if uid in id_set:
                     item.setData(Qt.ItemDataRole.UserRole + 2, True)
 
+    def mark_strokes_as_unsaved(self, stroke_ids: list) -> None:
+        """Marks strokes whose saved copy in the file is out of date (e.g. after a move)."""
+        if not stroke_ids: return
+
+        for uid in stroke_ids:
+            item = self.find_item_by_id(uid)
+            if isinstance(item, QGraphicsPathItem):
+                item.setData(Qt.ItemDataRole.UserRole + 2, False)
+
     def add_image(self, image: QImage, pos: QPointF = None) -> None:
         from PyQt6.QtWidgets import QGraphicsPixmapItem
         from PyQt6.QtGui import QPixmap
@@ -299,18 +429,16 @@ class InkCanvas(QGraphicsScene):
         """Marks the specified images as saved in the scene items."""
         if not image_ids: return
         
-        print(f"[DEBUG] mark_images_as_saved called for IDs: {image_ids}")
         id_set = set(image_ids)
         mapped_count = 0
         for item in self.items():
             from PyQt6.QtWidgets import QGraphicsPixmapItem
             if isinstance(item, QGraphicsPixmapItem):
                 uid = item.data(Qt.ItemDataRole.UserRole + 1)
-                # print(f"[DEBUG] Checking item {uid}") 
                 if uid in id_set:
                     item.setData(Qt.ItemDataRole.UserRole + 2, True)
                     mapped_count += 1
-        print(f"[DEBUG] Marked {mapped_count} images as saved.")
+        tracer.instant("images saved", "save", requested=len(id_set), marked=mapped_count)
 
     def create_selection_group(self, items: list) -> None:
         if not items:
@@ -382,6 +510,7 @@ class InkCanvas(QGraphicsScene):
         item.setOpacity(opacity - 0.1)
         QTimer.singleShot(30, lambda: self.fade_out_and_remove(item))
 
+    @traced("erase hit test", "ink")
     def process_eraser_at(self, pos: QPointF) -> None:
         # Create a small hit rect
         hit_rect = QRectF(pos.x() - 2, pos.y() - 2, 4, 4)
@@ -435,7 +564,8 @@ class InkCanvas(QGraphicsScene):
                                    "points": points,
                                    "color": item.pen().color().name(QColor.NameFormat.HexArgb),
                                    "width": item.pen().width(),
-                                   "id": uid
+                                   "id": uid,
+                                   "saved": item.data(Qt.ItemDataRole.UserRole + 2) == True
                                }
                                self.erased_items_in_stroke.append(stroke_data)
 
@@ -0,0 +1,133 @@
+from PyQt6.QtCore import QObject, QPointF, QTimer, Qt
+from PyQt6.QtGui import QPolygonF
+from src.frontend.ink_latency import LatencyHistogram
+
+DEFAULT_FRAME_MS = 16 # When the screen does not report its refresh rate
+
+class TabletSampleBuffer(QObject):
+    """
+    Raw tablet samples of the stroke in progress. A pen reports far more
+    moves than the display shows, so samples are only appended here
+    (viewport position, pressure, timestamp) and flushed into the stroke
+    once per display frame: mapped to scene coordinates in one call and
+    handed to the canvas as one batch. No sample is dropped.
+    """
+    def __init__(self, view, on_flush, latency=None):
+        super().__init__(view)
+        self.view = view
+        self.on_flush = on_flush # Called with (scene points, pressures, timestamps)
+        self.latency = latency # InkLatencyTracker of the view, if any
+        self.samples = [] # (viewport QPointF, pressure, timestamp ms) not yet flushed
+        self.last_timestamp = 0
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.timeout.connect(self.flush)
+        self._frame_ms = DEFAULT_FRAME_MS
+
+    def begin(self) -> None:
+        """Starts a stroke; the flush interval follows the refresh rate of the view's screen."""
+        self.samples = []
+        screen = self.view.screen()
+        rate = screen.refreshRate() if screen is not None else 0
+        self._frame_ms = max(1, int(1000 / rate)) if rate > 0 else DEFAULT_FRAME_MS
+
+    def add_sample(self, position: QPointF, pressure: float, timestamp: int) -> None:
+        self.samples.append((position, pressure, timestamp))
+        if self.latency is not None and self.latency.enabled:
+            self.latency.on_sample(timestamp)
+        if not self._timer.isActive():
+            self._timer.start(self._frame_ms)
+
+    def map_to_scene(self, position: QPointF) -> QPointF:
+        # mapToScene() only takes integer points; the inverse transform keeps subpixel positions
+        return self.view.viewportTransform().inverted()[0].map(position)
+
+    def flush(self) -> None:
+        self._timer.stop()
+        if not self.samples:
+            return
+        samples, self.samples = self.samples, []
+        self.last_timestamp = samples[-1][2]
+        inverse = self.view.viewportTransform().inverted()[0]
+        scene_points = inverse.map(QPolygonF([sample[0] for sample in samples]))
+        self.on_flush(list(scene_points), [sample[1] for sample in samples], [sample[2] for sample in samples])
+        if self.latency is not None and self.latency.enabled:
+            self.latency.on_flush()
+
+class InkPredictor:
+    """
+    Extrapolates the pen a few milliseconds ahead of the last real sample
+    from its recent velocity and acceleration, so the live stroke can show
+    where the tip is rather than where it was. Predictions are only drawn;
+    they never become stroke points.
+
+    Accuracy: each real sample that arrives within the horizon of the last
+    prediction is compared with where that prediction put the pen at the
+    sample's time; the distances (scene units) are kept in a rolling
+    histogram (error.summary()).
+    """
+    VELOCITY_WINDOW_MS = 24 # History used for the velocity and acceleration estimates
+    STEPS = 3 # Points of the drawn prediction
+
+    def __init__(self, horizon_ms: float = 0):
+        self.horizon_ms = horizon_ms
+        self.error = LatencyHistogram()
+        self._history = [] # (x, y, t ms) of the recent real samples
+        self._model = None # (x, y, t, vx, vy, ax, ay) of the last prediction
+
+    def reset(self) -> None:
+        self._history = []
+        self._model = None
+
+    def add_samples(self, points: list, timestamps: list) -> None:
+        for point, t in zip(points, timestamps):
+            x, y = point.x(), point.y()
+            if self._model is not None:
+                predicted = self._position_at(t)
+                if predicted is not None:
+                    self.error.add(((predicted[0] - x) ** 2 + (predicted[1] - y) ** 2) ** 0.5)
+            if self._history and t <= self._history[-1][2]:
+                # Same millisecond: keep the newest position
+                self._history[-1] = (x, y, self._history[-1][2])
+            else:
+                self._history.append((x, y, t))
+        # Keep only what the estimates use
+        latest = self._history[-1][2] if self._history else 0
+        while len(self._history) > 3 and self._history[1][2] < latest - 2 * self.VELOCITY_WINDOW_MS:
+            self._history.pop(0)
+        self._model = self._fit()
+
+    def _fit(self):
+        if len(self._history) < 2:
+            return None
+        x, y, t = self._history[-1]
+        # Velocity over the last window, and the one before it for the acceleration
+        older = [s for s in self._history if s[2] <= t - self.VELOCITY_WINDOW_MS / 2] or self._history[:1]
+        x0, y0, t0 = older[-1]
+        if t <= t0:
+            return None
+        vx, vy = (x - x0) / (t - t0), (y - y0) / (t - t0)
+        ax = ay = 0.0
+        oldest = [s for s in self._history if s[2] <= t0 - self.VELOCITY_WINDOW_MS / 2]
+        if oldest:
+            x1, y1, t1 = oldest[-1]
+            if t0 > t1:
+                pvx, pvy = (x0 - x1) / (t0 - t1), (y0 - y1) / (t0 - t1)
+                dt = (t - t1) / 2
+                ax, ay = (vx - pvx) / dt, (vy - pvy) / dt
+        return (x, y, t, vx, vy, ax, ay)
+
+    def _position_at(self, t: float):
+        x, y, t_last, vx, vy, ax, ay = self._model
+        h = t - t_last
+        if h <= 0 or h > self.horizon_ms:
+            return None
+        return (x + vx * h + 0.5 * ax * h * h, y + vy * h + 0.5 * ay * h * h)
+
+    def predict(self) -> list:
+        """Predicted points after the last real sample, up to the horizon ([] if there is no estimate)."""
+        if self._model is None or self.horizon_ms <= 0:
+            return []
+        t_last = self._model[2]
+        return [QPointF(*self._position_at(t_last + self.horizon_ms * step / self.STEPS)) for step in range(1, self.STEPS + 1)]
@@ -0,0 +1,339 @@
+import base64
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+
+from PyQt6.QtCore import QBuffer, QIODevice
+from PyQt6.QtGui import QImage
+from src.frontend.file_utils import file_signature
+from src.frontend.undo_manager import (
+    AddStrokeCommand, RemoveStrokeCommand, AddImageCommand, MoveItemsCommand, CompoundCommand
+)
+
+JOURNAL_VERSION = 1
+JOURNALS_DIR = None # None: journals/ in the working directory, next to study_data.db
+
+def journal_path_for(document_path: str, journals_dir: str = None) -> str:
+    """Returns the journal file used for a document (<journals dir>/<hash of path>.jsonl)."""
+    journals_dir = journals_dir or JOURNALS_DIR or os.path.join(os.getcwd(), "journals")
+    key = hashlib.sha1(os.path.abspath(document_path).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(journals_dir, f"{key}.jsonl")
+
+class InkJournal:
+    """
+    Append-only write-ahead log of the ink operations made on one document
+    since its last save.
+
+    append() only enqueues the operation; a background thread serializes the
+    records, writes them as JSON lines and fsyncs once per batch, so the pen
+    path never waits on the disk. The first line is a header holding the
+    PDF's mtime and size when the journal was (re)started: if the PDF no
+    longer matches (it was saved after the journal was written), replay()
+    treats the journal as stale.
+
+    The file only exists while it holds records: it is created with the
+    first one and deleted once a save covers all of them (or on close when
+    it is empty), so clean documents leave no journal behind.
+    """
+    FLUSH_INTERVAL = 0.25 # Seconds to collect records before each fsync
+
+    def __init__(self, document_path: str, journal_path: str = None):
+        self.document_path = os.path.abspath(document_path)
+        self.journal_path = journal_path or journal_path_for(document_path)
+
+        self._queue = queue.SimpleQueue()
+        self._checkpoint_counter = 0
+        self._checkpoints = {} # token -> file offset (writer thread only)
+        self._file = None
+        if os.path.exists(self.journal_path):
+            # Records of an earlier session (already replayed): keep appending after them
+            self._open()
+
+        self._thread = threading.Thread(target=self._run, name="InkJournal", daemon=True)
+        self._thread.start()
+
+    # Recording (GUI thread)
+    def append(self, op: str, page: int, data) -> None:
+        """Queues one operation. Serialization happens on the writer thread."""
+        self._queue.put(("record", op, page, data))
+
+    def record_stroke(self, page: int, stroke_data: dict) -> None:
+        self.append("stroke", page, dict(stroke_data))
+
+    def record_erase(self, page: int, ids: list) -> None:
+        self.append("erase", page, list(ids))
+
+    def record_move(self, page: int, move_data: list) -> None:
+        self.append("move", page, [(d["id"], d["offset"].x(), d["offset"].y()) for d in move_data])
+
+    def record_image(self, page: int, image_data: dict) -> None:
+        self.append("image", page, dict(image_data))
+
+    def record_command(self, page: int, command, undone: bool) -> None:
+        """Journals the effect of an undo/redo so replay matches the scene."""
+        if isinstance(command, CompoundCommand):
+            commands = reversed(command.commands) if undone else command.commands
+            for sub_command in commands:
+                self.record_command(page, sub_command, undone)
+        elif isinstance(command, AddStrokeCommand):
+            if undone:
+                self.record_erase(page, [command.stroke_id])
+            else:
+                self.record_stroke(page, command.stroke_data)
+        elif isinstance(command, RemoveStrokeCommand):
+            if undone:
+                self.record_stroke(page, command.stroke_data)
+            else:
+                self.record_erase(page, [command.stroke_id])
+        elif isinstance(command, AddImageCommand):
+            if undone:
+                self.record_erase(page, [command.image_id])
+            else:
+                self.record_image(page, command.image_data)
+        elif isinstance(command, MoveItemsCommand):
+            sign = -1 if undone else 1
+            self.append("move", page, [
+                (d["id"], sign * d["offset"].x(), sign * d["offset"].y()) for d in command.move_data_list
+            ])
+
+    def checkpoint(self) -> int:
+        """
+        Marks the current end of the journal. Pass the token to truncate()
+        once a save that captured everything up to here has completed.
+        """
+        self._checkpoint_counter += 1
+        self._queue.put(("checkpoint", self._checkpoint_counter))
+        return self._checkpoint_counter
+
+    def truncate(self, checkpoint: int = None) -> None:
+        """
+        Discards the records that are now in the PDF: all of them, or only
+        those before the given checkpoint. Call after a successful save.
+        """
+        self._queue.put(("truncate", checkpoint))
+
+    def restamp(self) -> None:
+        """
+        Keeps the records but re-stamps the header with the current file state.
+        Call after the PDF was rewritten without absorbing the journal
+        (e.g. background compaction).
+        """
+        self._queue.put(("restamp",))
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Blocks until everything queued so far is on disk."""
+        done = threading.Event()
+        self._queue.put(("sync", done))
+        done.wait(timeout)
+
+    def close(self) -> None:
+        if not self._thread.is_alive():
+            return
+        self._queue.put(("close",))
+        self._thread.join(5.0)
+
+    # Writer thread
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            # Collect whatever else arrives within the flush window
+            deadline = time.monotonic() + self.FLUSH_INTERVAL
+            while batch[-1][0] == "record":
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            for message in batch:
+                kind = message[0]
+                if kind == "record":
+                    try:
+                        line = json.dumps(self._encode(message[1], message[2], message[3]))
+                        if self._file is None:
+                            self._open()
+                        self._file.write(line + "\n")
+                    except Exception as e:
+                        print(f"[ERROR] Failed to journal {message[1]} operation: {e}")
+                elif kind == "checkpoint":
+                    # 0: no file yet, so everything recorded later comes after the checkpoint
+                    self._checkpoints[message[1]] = self._end_offset()
+                elif kind == "truncate":
+                    offset = self._checkpoints.pop(message[1], None) if message[1] is not None else None
+                    if offset == 0 and self._file is not None:
+                        offset = self._header_end()
+                    self._rewrite(keep_from=offset)
+                elif kind == "restamp":
+                    if self._file is not None:
+                        self._rewrite(keep_from=self._header_end())
+                elif kind == "sync":
+                    self._sync()
+                    message[1].set()
+                elif kind == "close":
+                    if self._file is not None and self._end_offset() <= self._header_end():
+                        self._delete()
+                    elif self._file is not None:
+                        self._sync()
+                        self._file.close()
+                    return
+            self._sync()
+
+    def _open(self) -> None:
+        os.makedirs(os.path.dirname(self.journal_path), exist_ok=True)
+        self._file = open(self.journal_path, "a", encoding="utf-8")
+        if self._file.tell() == 0:
+            self._write_header()
+
+    def _delete(self) -> None:
+        self._file.close()
+        self._file = None
+        try:
+            os.remove(self.journal_path)
+        except OSError as e:
+            print(f"[ERROR] Failed to delete ink journal: {e}")
+
+    def _sync(self) -> None:
+        if self._file is None:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _end_offset(self) -> int:
+        if self._file is None:
+            return 0
+        self._file.flush()
+        return self._file.tell()
+
+    def _header_end(self) -> int:
+        self._file.flush()
+        with open(self.journal_path, "rb") as f:
+            return len(f.readline())
+
+    def _rewrite(self, keep_from: int = None) -> None:
+        """
+        Restarts the journal with a fresh header, keeping records from an
+        offset. With nothing to keep, the file is deleted.
+        """
+        if self._file is None:
+            return
+        self._file.flush()
+        kept = ""
+        if keep_from is not None:
+            with open(self.journal_path, "rb") as f:
+                f.seek(keep_from)
+                kept = f.read().decode("utf-8")
+        if not kept:
+            self._delete()
+            # Pending checkpoints now come before every future record
+            self._checkpoints = {token: 0 for token in self._checkpoints}
+            return
+        self._file.seek(0)
+        self._file.truncate()
+        self._write_header()
+        self._file.write(kept)
+        # Offsets of pending checkpoints moved with the kept records; earlier
+        # ones point at the start (0, as if taken before the file existed)
+        self._file.flush()
+        shift = self._file.tell() - len(kept.encode("utf-8")) - (keep_from or 0)
+        self._checkpoints = {
+            token: offset + shift if keep_from is not None and offset >= keep_from else 0
+            for token, offset in self._checkpoints.items()
+        }
+
+    def _write_header(self) -> None:
+        header = {
+            "version": JOURNAL_VERSION,
+            "document": self.document_path,
+            "signature": file_signature(self.document_path)
+        }
+        self._file.write(json.dumps(header) + "\n")
+
+    def _encode(self, op: str, page: int, data) -> dict:
+        if op == "image":
+            image_data = dict(data)
+            qimage = image_data.pop("image")
+            ba = QBuffer()
+            ba.open(QIODevice.OpenModeFlag.ReadWrite)
+            qimage.save(ba, "PNG")
+            image_data["png"] = base64.b64encode(ba.data().data()).decode("ascii")
+            data = image_data
+        elif op == "stroke":
+            data = dict(data)
+            data.pop("saved", None)
+        return {"op": op, "page": page, "data": data}
+
+    # Replay
+    @staticmethod
+    def replay(document_path: str, journal_path: str = None, load_page=None) -> dict:
+        """
+        Rebuilds the unsaved ink of a document as a page_data_cache dict
+        ({page_num: {"strokes": [], "images": []}}). Returns {} if there is no
+        journal, or if it is stale because the PDF was saved after it.
+
+        load_page(page_num) supplies the ink already in the file for each page
+        the journal touches, so erases and moves of saved strokes replay too.
+        """
+        journal_path = journal_path or journal_path_for(document_path)
+        if not os.path.exists(journal_path):
+            return {}
+
+        cache = {}
+        with open(journal_path, "r", encoding="utf-8") as f:
+            try:
+                header = json.loads(f.readline())
+            except ValueError:
+                return {}
+            if header.get("signature") != file_signature(os.path.abspath(document_path)):
+                print("[Journal] Journal is older than the document, ignoring it.")
+                return {}
+
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break # Torn write from a crash: everything before it is valid
+                page = cache.get(record["page"])
+                if page is None:
+                    page = load_page(record["page"]) if load_page else {"strokes": [], "images": []}
+                    cache[record["page"]] = page
+                InkJournal._apply(page, record["op"], record["data"])
+
+        if load_page:
+            return cache
+        return {num: data for num, data in cache.items() if data["strokes"] or data["images"]}
+
+    @staticmethod
+    def _apply(page: dict, op: str, data) -> None:
+        if op == "stroke":
+            stroke = dict(data)
+            stroke["points"] = [tuple(p) for p in stroke["points"]]
+            stroke["saved"] = False
+            page["strokes"].append(stroke)
+        elif op == "image":
+            image = QImage()
+            image.loadFromData(base64.b64decode(data["png"]), "PNG")
+            image_data = {k: v for k, v in data.items() if k != "png"}
+            image_data["image"] = image
+            image_data["saved"] = False
+            page["images"].append(image_data)
+        elif op == "erase":
+            ids = set(data)
+            page["strokes"] = [s for s in page["strokes"] if s.get("id") not in ids]
+            page["images"] = [i for i in page["images"] if i.get("id") not in ids]
+        elif op == "move":
+            offsets = {uid: (dx, dy) for uid, dx, dy in data}
+            for stroke in page["strokes"]:
+                if stroke.get("id") in offsets:
+                    dx, dy = offsets[stroke["id"]]
+                    stroke["points"] = [(x + dx, y + dy) for x, y in stroke["points"]]
+                    stroke["saved"] = False # The file still has it at the old position
+            for image in page["images"]:
+                if image.get("id") in offsets:
+                    dx, dy = offsets[image["id"]]
+                    image["x"] += dx
+                    image["y"] += dy
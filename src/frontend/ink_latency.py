@@ -0,0 +1,142 @@
+import json
+import os
+import platform
+import time
+from array import array
+from collections import deque
+
+class LatencyHistogram:
+    """Rolling window of the last WINDOW latencies (ms) with percentiles."""
+    WINDOW = 2000
+
+    def __init__(self, window: int = WINDOW):
+        self.values = deque(maxlen=window)
+        self.count = 0 # All values ever added
+
+    def add(self, value_ms: float) -> None:
+        self.values.append(value_ms)
+        self.count += 1
+
+    def clear(self) -> None:
+        self.values.clear()
+        self.count = 0
+
+    def percentile(self, p: float, ordered: list = None) -> float:
+        ordered = ordered if ordered is not None else sorted(self.values)
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+    def summary(self) -> dict:
+        """{"count", "p50", "p95", "p99", "max"} in ms over the window."""
+        ordered = sorted(self.values)
+        return {
+            "count": len(ordered),
+            "p50": round(self.percentile(50, ordered), 2),
+            "p95": round(self.percentile(95, ordered), 2),
+            "p99": round(self.percentile(99, ordered), 2),
+            "max": round(ordered[-1], 2) if ordered else 0.0
+        }
+
+class InkLatencyTracker:
+    """
+    Input-to-paint latency of the ink, shared by all viewers (only the tab
+    on screen gets pen input and paints). Each tablet sample is
+    stamped when PenGesture receives it; the TabletSampleBuffer reports when
+    it flushes samples into the stroke and the viewer when the paint that
+    first shows them has run. Two rolling histograms are kept: receive to
+    flush (time spent waiting for the frame) and receive to paint.
+
+    Off by default: a disabled tracker costs a flag check per event. The
+    latency starts at the receipt of the event; the time the OS took to
+    deliver it is not visible to the app.
+    """
+    _shared = None
+
+    def __init__(self):
+        self.enabled = False
+        self.to_flush = LatencyHistogram()
+        self.to_paint = LatencyHistogram()
+        self._received = [] # (receive time, event timestamp) of samples not yet flushed
+        self._flushed = [] # (receive time, event timestamp, flush time) waiting for a paint
+        self._recording = None # Open file of a recording
+        self._recorded = array("d") # event_ts, to_flush_ms, to_paint_ms per recorded sample, written on stop
+
+    @classmethod
+    def shared(cls) -> "InkLatencyTracker":
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def set_enabled(self, enabled: bool) -> None:
+        self.enabled = enabled
+        self._received = []
+        self._flushed = []
+
+    def reset(self) -> None:
+        self.to_flush.clear()
+        self.to_paint.clear()
+
+    # Pipeline stages
+    def on_sample(self, timestamp: int) -> None:
+        self._received.append((time.perf_counter(), timestamp))
+
+    def on_flush(self) -> None:
+        now = time.perf_counter()
+        for received, timestamp in self._received:
+            self.to_flush.add((now - received) * 1000)
+            self._flushed.append((received, timestamp, now))
+        self._received = []
+
+    def on_painted(self) -> None:
+        if not self._flushed:
+            return
+        now = time.perf_counter()
+        for received, timestamp, flushed in self._flushed:
+            self.to_paint.add((now - received) * 1000)
+            if self._recording is not None:
+                self._recorded.extend((timestamp, (flushed - received) * 1000, (now - received) * 1000))
+        self._flushed = []
+
+    def summary(self) -> dict:
+        return {"to_flush": self.to_flush.summary(), "to_paint": self.to_paint.summary()}
+
+    # Recording
+    @property
+    def recording_path(self) -> str:
+        return self._recording.name if self._recording is not None else None
+
+    def start_recording(self, path: str) -> None:
+        """
+        Records to path: a header line now, then on stop one JSON line per
+        sample and a summary line. Samples are kept in memory until then, so
+        painting never waits on the disk.
+        """
+        self.stop_recording()
+        self.reset() # The summary line covers the recording
+        self._recorded = array("d")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._recording = open(path, "w", encoding="utf-8")
+        self._recording.write(json.dumps({"header": {
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform()
+        }}) + "\n")
+
+    def stop_recording(self) -> str:
+        """Closes the recording; returns its path (None if none was running)."""
+        if self._recording is None:
+            return None
+        recording, self._recording = self._recording, None
+        recorded, self._recorded = self._recorded, array("d")
+        recording.writelines(
+            json.dumps({
+                "event_ts": int(recorded[i]),
+                "to_flush_ms": round(recorded[i + 1], 3),
+                "to_paint_ms": round(recorded[i + 2], 3)
+            }) + "\n"
+            for i in range(0, len(recorded), 3)
+        )
+        recording.write(json.dumps({"summary": self.summary()}) + "\n")
+        recording.close()
+        return recording.name
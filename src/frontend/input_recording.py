@@ -0,0 +1,306 @@
+import gzip
+import hashlib
+import json
+import time
+from collections import defaultdict
+
+from PyQt6.QtCore import QEvent, QPointF, Qt
+from PyQt6.QtGui import QColor, QInputDevice, QMouseEvent, QPointingDevice, QTabletEvent
+from PyQt6.QtWidgets import QApplication, QPinchGesture, QSwipeGesture
+
+from src.frontend.ink_input import TabletSampleBuffer
+from src.frontend.ink_latency import LatencyHistogram
+
+RECORDING_VERSION = 1
+
+TABLET_TYPES = (QEvent.Type.TabletPress, QEvent.Type.TabletMove, QEvent.Type.TabletRelease)
+MOUSE_TYPES = (QEvent.Type.MouseButtonPress, QEvent.Type.MouseMove, QEvent.Type.MouseButtonRelease,
+               QEvent.Type.MouseButtonDblClick)
+
+# What is kept of each kind of QGesture: method name -> how its value is stored
+_POINT, _FLOAT = "point", "float"
+GESTURE_FIELDS = {
+    Qt.GestureType.PinchGesture: {
+        "changeFlags": QPinchGesture.ChangeFlag, "scaleFactor": _FLOAT, "totalScaleFactor": _FLOAT,
+        "rotationAngle": _FLOAT, "centerPoint": _POINT
+    },
+    Qt.GestureType.SwipeGesture: {
+        "horizontalDirection": QSwipeGesture.SwipeDirection, "verticalDirection": QSwipeGesture.SwipeDirection,
+        "swipeAngle": _FLOAT
+    },
+    Qt.GestureType.TapAndHoldGesture: {"position": _POINT},
+    Qt.GestureType.TapGesture: {"position": _POINT},
+    Qt.GestureType.PanGesture: {"delta": _POINT, "offset": _POINT},
+}
+
+def _encode(value, kind):
+    if kind == _POINT:
+        return [round(value.x(), 2), round(value.y(), 2)]
+    if kind == _FLOAT:
+        return round(value, 4)
+    return value.value
+
+def _decode(value, kind):
+    if kind == _POINT:
+        return QPointF(*value)
+    if kind == _FLOAT:
+        return value
+    return kind(value)
+
+class InputRecorder:
+    """
+    Records the tablet, mouse and gesture events that reach a viewer's
+    GestureManager, with their arrival time, so real pen sessions can be
+    replayed as a benchmark (replay_recording()). Events are stored as short
+    rows in a gzipped JSON file:
+
+    tablet  [t_ms, type, x, y, pressure, pointer type, button, buttons, modifiers]
+    mouse   [t_ms, type, x, y, button, buttons, modifiers, device type]
+    gesture [t_ms, type, [{"type", "state", "hot_spot", fields...}]]
+
+    The header keeps what the replay needs to put the pen on the same spot:
+    viewport size, view transform, scroll position, zoom, page size and pen.
+    """
+    def __init__(self, viewer):
+        self.viewer = viewer
+        self.events = []
+        self.header = None
+        self._start = None
+
+    def start(self) -> None:
+        viewer = self.viewer
+        transform = viewer.transform()
+        page_size = None
+        if viewer.doc is not None:
+            page_size = list(viewer.page_size())
+        self.header = {
+            "version": RECORDING_VERSION,
+            "recorded": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "viewport": [viewer.viewport().width(), viewer.viewport().height()],
+            "transform": [transform.m11(), transform.m12(), transform.m21(), transform.m22()],
+            "scroll": [viewer.horizontalScrollBar().value(), viewer.verticalScrollBar().value()],
+            "zoom_level": viewer.zoom_level,
+            "page_size": page_size,
+            "pen": {"color": viewer.scene.pen_color.name(), "width": viewer.scene.pen_width}
+        }
+        self.events = []
+        self._start = time.perf_counter()
+        viewer.gesture_manager.recorder = self
+
+    def stop(self) -> dict:
+        """Detaches from the viewer; returns the recording."""
+        if self.viewer.gesture_manager.recorder is self:
+            self.viewer.gesture_manager.recorder = None
+        return {"header": self.header, "events": self.events}
+
+    def record(self, event: QEvent) -> None:
+        event_type = event.type()
+        t = round((time.perf_counter() - self._start) * 1000, 2)
+        if event_type in TABLET_TYPES:
+            pos = event.position()
+            self.events.append([
+                t, event_type.value, round(pos.x(), 2), round(pos.y(), 2), round(event.pressure(), 4),
+                event.pointerType().value, event.button().value, event.buttons().value, event.modifiers().value
+            ])
+        elif event_type in MOUSE_TYPES:
+            pos = event.position()
+            self.events.append([
+                t, event_type.value, round(pos.x(), 2), round(pos.y(), 2),
+                event.button().value, event.buttons().value, event.modifiers().value, event.device().type().value
+            ])
+        elif event_type == QEvent.Type.Gesture:
+            gestures = []
+            for gesture in event.gestures():
+                data = {
+                    "type": gesture.gestureType().value,
+                    "state": gesture.state().value,
+                    "hot_spot": _encode(gesture.hotSpot(), _POINT) if gesture.hasHotSpot() else None
+                }
+                for name, kind in GESTURE_FIELDS.get(gesture.gestureType(), {}).items():
+                    data[name] = _encode(getattr(gesture, name)(), kind)
+                gestures.append(data)
+            self.events.append([t, event_type.value, gestures])
+
+def save_recording(recording: dict, path: str) -> None:
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump(recording, f, separators=(",", ":"))
+
+def load_recording(path: str) -> dict:
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        recording = json.load(f)
+    if recording.get("header", {}).get("version") != RECORDING_VERSION:
+        raise ValueError(f"{path} is not a version {RECORDING_VERSION} input recording")
+    return recording
+
+class ReplayedGesture:
+    """Stand-in for a recorded QGesture: answers the recorded getters."""
+    def __init__(self, data: dict):
+        self._type = Qt.GestureType(data["type"])
+        self._state = Qt.GestureState(data["state"])
+        self._hot_spot = QPointF(*data["hot_spot"]) if data.get("hot_spot") else None
+        self._values = {
+            name: _decode(data[name], kind)
+            for name, kind in GESTURE_FIELDS.get(self._type, {}).items() if name in data
+        }
+
+    def gestureType(self):
+        return self._type
+
+    def state(self):
+        return self._state
+
+    def hasHotSpot(self):
+        return self._hot_spot is not None
+
+    def hotSpot(self):
+        return self._hot_spot or QPointF()
+
+    def __getattr__(self, name):
+        values = self.__dict__.get("_values", {})
+        if name in values:
+            return lambda: values[name]
+        raise AttributeError(name)
+
+class ReplayedGestureEvent:
+    """Stand-in for a QGestureEvent (which cannot be built outside Qt's gesture recognizers)."""
+    def __init__(self, gestures: list):
+        self._gestures = gestures
+
+    def type(self):
+        return QEvent.Type.Gesture
+
+    def gestures(self):
+        return self._gestures
+
+    def gesture(self, gesture_type):
+        return next((g for g in self._gestures if g.gestureType() == gesture_type), None)
+
+    def accept(self, *args):
+        pass
+
+    def ignore(self, *args):
+        pass
+
+_devices = {}
+
+def _device(device_type: QInputDevice.DeviceType, pointer_type: QPointingDevice.PointerType) -> QPointingDevice:
+    """Replay devices, kept alive for the events that point to them."""
+    key = (device_type, pointer_type)
+    if key not in _devices:
+        caps = QInputDevice.Capability.Position | QInputDevice.Capability.Pressure
+        _devices[key] = QPointingDevice(f"replay {device_type.name}", 1000 + len(_devices), device_type, pointer_type, caps, 1, 3)
+    return _devices[key]
+
+def build_event(row: list):
+    """The Qt event (or gesture event stand-in) of a recorded row."""
+    event_type = QEvent.Type(row[1])
+    if event_type in TABLET_TYPES:
+        _, _, x, y, pressure, pointer_type, button, buttons, modifiers = row
+        pointer_type = QPointingDevice.PointerType(pointer_type)
+        pos = QPointF(x, y)
+        event = QTabletEvent(
+            event_type, _device(QInputDevice.DeviceType.Stylus, pointer_type), pos, pos, pressure,
+            0.0, 0.0, 0.0, 0.0, 0.0, Qt.KeyboardModifier(modifiers), Qt.MouseButton(button), Qt.MouseButton(buttons)
+        )
+    elif event_type in MOUSE_TYPES:
+        _, _, x, y, button, buttons, modifiers, device_type = row
+        device_type = QInputDevice.DeviceType(device_type)
+        pointer_type = QPointingDevice.PointerType.Pen if device_type == QInputDevice.DeviceType.Stylus else QPointingDevice.PointerType.Generic
+        pos = QPointF(x, y)
+        event = QMouseEvent(
+            event_type, pos, pos, Qt.MouseButton(button), Qt.MouseButton(buttons), Qt.KeyboardModifier(modifiers),
+            _device(device_type, pointer_type)
+        )
+    else:
+        return ReplayedGestureEvent([ReplayedGesture(data) for data in row[2]])
+    # PyQt has no setTimestamp(): replayed events carry timestamp 0, which also keeps
+    # the ink prediction (driven by timestamps) out of the replayed work
+    return event
+
+def prepare_viewer(viewer, header: dict) -> None:
+    """Puts a viewer (showing a blank page of the recorded size) in the recorded view state."""
+    viewer.zoom_level = header["zoom_level"]
+    viewer.render_page()
+    width, height = header["viewport"]
+    frame = 2 * viewer.frameWidth()
+    viewer.resize(width + frame, height + frame)
+    m11, m12, m21, m22 = header["transform"]
+    transform = viewer.transform()
+    transform.setMatrix(m11, m12, 0.0, m21, m22, 0.0, 0.0, 0.0, 1.0)
+    viewer.setTransform(transform)
+    viewer.horizontalScrollBar().setValue(header["scroll"][0])
+    viewer.verticalScrollBar().setValue(header["scroll"][1])
+    pen = header.get("pen") or {}
+    if "color" in pen:
+        viewer.scene.pen_color = QColor(pen["color"])
+    if "width" in pen:
+        viewer.scene.pen_width = pen["width"]
+
+def scene_checksum(scene) -> str:
+    """Hash of the ink on a scene (geometry, colors, widths, images), independent of item ids."""
+    digest = hashlib.sha1()
+    for stroke in scene.get_strokes():
+        digest.update(f"{stroke['color']}|{stroke['width']}|".encode())
+        digest.update(",".join(f"{x:.2f}:{y:.2f}" for x, y in stroke["points"]).encode())
+        digest.update(b";")
+    for image in scene.get_images():
+        digest.update(f"image {image['x']:.2f}:{image['y']:.2f}:{image['width']:.2f}:{image['height']:.2f};".encode())
+    return digest.hexdigest()
+
+def replay_recording(viewer, recording: dict, speed: str = "max", frame_ms: float = 16.0) -> dict:
+    """
+    Feeds a recording back through the viewer's event dispatch. With
+    speed="recorded" events are paced as recorded; with "max" they are sent
+    back to back. Either way the recorded time is cut into frames of
+    frame_ms: at every frame boundary pending pen samples are flushed and
+    the viewport is repainted, as the event loop would. Returns per-event
+    cost (by event type), frame times and the checksum of the final scene.
+    """
+    costs = defaultdict(list)
+    frames = []
+
+    def run_frame():
+        frame_start = time.perf_counter()
+        for buffer in viewer.findChildren(TabletSampleBuffer):
+            buffer.flush()
+        viewer.viewport().repaint()
+        frames.append((time.perf_counter() - frame_start) * 1000)
+
+    app = QApplication.instance()
+    start = time.perf_counter()
+    next_frame = frame_ms
+    for row in recording["events"]:
+        t = row[0]
+        while t >= next_frame:
+            run_frame()
+            next_frame += frame_ms
+        if speed == "recorded":
+            delay = start + t / 1000 - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            app.processEvents()
+        event = build_event(row)
+        event_start = time.perf_counter()
+        if isinstance(event, ReplayedGestureEvent):
+            viewer.gesture_manager.dispatch_event(event)
+        else:
+            QApplication.sendEvent(viewer.viewport(), event)
+        costs[QEvent.Type(row[1]).name].append((time.perf_counter() - event_start) * 1000)
+    run_frame()
+    duration_ms = (time.perf_counter() - start) * 1000
+
+    def summary(values):
+        histogram = LatencyHistogram(window=max(1, len(values)))
+        for value in values:
+            histogram.add(value)
+        return histogram.summary()
+
+    return {
+        "events": len(recording["events"]),
+        "recorded_ms": recording["events"][-1][0] if recording["events"] else 0,
+        "replay_ms": round(duration_ms, 2),
+        "event_cost_ms": {name: summary(values) for name, values in sorted(costs.items())},
+        "frame_ms": summary(frames),
+        "strokes": len(viewer.scene.get_strokes()),
+        "checksum": scene_checksum(viewer.scene)
+    }
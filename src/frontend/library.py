@@ -0,0 +1,232 @@
+import glob
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import fitz  # PyMuPDF
+
+from src.frontend.file_utils import file_signature, replace_file
+from src.frontend.background_jobs import fitz_lock
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS Documents (
+    ID INTEGER PRIMARY KEY AUTOINCREMENT,
+    FilePath TEXT NOT NULL UNIQUE,
+    LastOpenedDate TEXT NOT NULL,
+    LastPageNum INTEGER NOT NULL DEFAULT 0,
+    TotalPages INTEGER NOT NULL DEFAULT 0,
+    FileMTime INTEGER,
+    FileSize INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_documents_last_opened ON Documents (LastOpenedDate DESC);
+"""
+
+THUMBNAIL_WIDTH = 180
+PAGE_THUMBNAIL_WIDTH = 120
+
+_REF = re.compile(r"(\d+) 0 R")
+
+class DocumentLibrary:
+    """
+    The user's collection of documents and their reading state, stored in
+    SQLite (study_data.db) in WAL mode.
+
+    The file's mtime and size are stored with each document and only
+    refreshed when the document is opened or saved, so listing the library
+    never touches the documents themselves. They also key the first-page
+    thumbnails on disk: a thumbnail is rendered once per file version.
+    """
+    _shared = None
+
+    def __init__(self, db_path: str = None, thumbnails_dir: str = None):
+        self.db_path = db_path or os.path.join(os.getcwd(), "study_data.db")
+        self.thumbnails_dir = thumbnails_dir or os.path.join(os.path.dirname(os.path.abspath(self.db_path)), "thumbnails")
+        os.makedirs(self.thumbnails_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        # WAL: readers never block the writer; NORMAL sync keeps commits off the disk flush path
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    @classmethod
+    def shared(cls) -> "DocumentLibrary":
+        """The library used by the application (study_data.db in the working directory)."""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _execute(self, sql: str, params=()) -> list:
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+            self._conn.commit()
+            return rows
+
+    # Reading state
+    def record_open(self, path: str, total_pages: int) -> None:
+        """Adds the document if needed and stamps it as opened now."""
+        path = os.path.abspath(path)
+        signature = file_signature(path) or (None, None)
+        self._execute(
+            """
+            INSERT INTO Documents (FilePath, LastOpenedDate, TotalPages, FileMTime, FileSize)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(FilePath) DO UPDATE SET
+                LastOpenedDate = excluded.LastOpenedDate,
+                TotalPages = excluded.TotalPages,
+                FileMTime = excluded.FileMTime,
+                FileSize = excluded.FileSize
+            """,
+            (path, datetime.now().isoformat(timespec="seconds"), total_pages, signature[0], signature[1])
+        )
+
+    def record_page(self, path: str, page_num: int, total_pages: int = None) -> None:
+        path = os.path.abspath(path)
+        if total_pages is None:
+            self._execute("UPDATE Documents SET LastPageNum = ? WHERE FilePath = ?", (page_num, path))
+        else:
+            self._execute(
+                "UPDATE Documents SET LastPageNum = ?, TotalPages = ? WHERE FilePath = ?",
+                (page_num, total_pages, path)
+            )
+
+    def record_saved(self, path: str) -> None:
+        """Refreshes the stored file version after a save (the old thumbnail is dropped)."""
+        path = os.path.abspath(path)
+        old = self.get_document(path)
+        signature = file_signature(path)
+        if old is None or signature is None:
+            return
+        if (old["FileMTime"], old["FileSize"]) != tuple(signature):
+            stale = self.thumbnail_path(old)
+            if stale and os.path.exists(stale):
+                os.remove(stale)
+        self._execute(
+            "UPDATE Documents SET FileMTime = ?, FileSize = ? WHERE FilePath = ?",
+            (signature[0], signature[1], path)
+        )
+
+    def last_page(self, path: str) -> int:
+        row = self.get_document(path)
+        return row["LastPageNum"] if row else 0
+
+    def get_document(self, path: str):
+        rows = self._execute("SELECT * FROM Documents WHERE FilePath = ?", (os.path.abspath(path),))
+        return rows[0] if rows else None
+
+    def list_documents(self, limit: int = -1, offset: int = 0) -> list:
+        """Documents, most recently opened first."""
+        return self._execute(
+            "SELECT * FROM Documents ORDER BY LastOpenedDate DESC, ID DESC LIMIT ? OFFSET ?",
+            (limit, offset)
+        )
+
+    def count(self) -> int:
+        return self._execute("SELECT COUNT(*) FROM Documents")[0][0]
+
+    def remove(self, path: str) -> None:
+        row = self.get_document(path)
+        if row is None:
+            return
+        thumbnail = self.thumbnail_path(row)
+        if thumbnail and os.path.exists(thumbnail):
+            os.remove(thumbnail)
+        self._execute("DELETE FROM Documents WHERE ID = ?", (row["ID"],))
+
+    # Thumbnails
+    def thumbnail_path(self, row) -> str:
+        """Thumbnail file for the stored version of a document (None if unknown)."""
+        if row["FileMTime"] is None:
+            return None
+        key = f"{row['FilePath']}|{row['FileMTime']}|{row['FileSize']}"
+        return os.path.join(self.thumbnails_dir, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".png")
+
+def render_thumbnail(path: str, thumbnail_path: str, width: int = THUMBNAIL_WIDTH) -> str:
+    """Worker-side: renders the first page of a document to a PNG. Returns the PNG path."""
+    with fitz_lock:
+        doc = fitz.open(path)
+        try:
+            page = doc.load_page(0)
+            scale = width / page.rect.width
+            pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale))
+            temp_path = thumbnail_path + ".tmp"
+            pix.save(temp_path, output="png")
+        finally:
+            doc.close()
+    replace_file(temp_path, thumbnail_path)
+    return thumbnail_path
+
+def annotations_key(doc, page_num: int) -> str:
+    """
+    Short hash of a page's annotation objects ("" without annotations). Read
+    from the page object directly, like content_hash: no page is loaded.
+    """
+    kind, value = doc.xref_get_key(doc.page_xref(page_num), "Annots")
+    if kind not in ("xref", "array"):
+        return ""
+    if kind == "xref": # Indirect array
+        value = doc.xref_object(int(_REF.findall(value)[0]))
+    sha = hashlib.sha1()
+    for xref in _REF.findall(value):
+        sha.update(doc.xref_object(int(xref), compressed=True).encode("utf-8"))
+    return sha.hexdigest()[:12]
+
+def render_page_thumbnails(path: str, pages: list, cache_dir: str, width: int = PAGE_THUMBNAIL_WIDTH, job=None) -> str:
+    """
+    Worker-side: low-DPI thumbnails of some pages of a document, ink
+    included, read from or written to cache_dir/<content hash>/<page>.png
+    (<page>-<annotations key>.png for a page with annotations). The content
+    hash ignores annotations, so an ink save only re-renders the pages whose
+    annotations changed; their older thumbnails are removed. Each page is
+    reported as soon as it is ready through
+    job.report_partial((page_num, QImage)). Stops early when the job is
+    cancelled. Returns the content hash.
+    """
+    from PyQt6.QtGui import QImage
+    from src.frontend.text_index import TextIndex
+
+    with fitz_lock:
+        doc = fitz.open(path)
+        page_count = doc.page_count
+    try:
+        digest = TextIndex.shared().hash_for(path, doc)
+        doc_dir = os.path.join(cache_dir, digest)
+        os.makedirs(doc_dir, exist_ok=True)
+        for page_num in pages:
+            if job is not None and job.cancelled:
+                break
+            if page_num >= page_count:
+                continue # Not in the file yet
+            with fitz_lock:
+                key = annotations_key(doc, page_num)
+            png_path = os.path.join(doc_dir, f"{page_num}-{key}.png" if key else f"{page_num}.png")
+            image = QImage(png_path) if os.path.exists(png_path) else QImage()
+            if image.isNull():
+                with fitz_lock:
+                    page = doc.load_page(page_num)
+                    scale = width / page.rect.width
+                    pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale))
+                    pix.save(png_path + ".tmp", output="png")
+                replace_file(png_path + ".tmp", png_path)
+                older = glob.glob(os.path.join(doc_dir, f"{page_num}-*.png")) + [os.path.join(doc_dir, f"{page_num}.png")]
+                for old_path in older:
+                    if old_path != png_path and os.path.exists(old_path):
+                        os.remove(old_path) # Earlier ink of this page
+                image = QImage(png_path)
+            if job is not None:
+                job.report_partial((page_num, image))
+            time.sleep(0) # Let the GUI thread have the interpreter (and fitz) between pages
+        return digest
+    finally:
+        with fitz_lock:
+            doc.close()
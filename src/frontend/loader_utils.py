@@ -5,16 +5,13 @@ import os
 import sys
 from typing import List, Type, Any
 
-def load_classes_from_path(file_path: str, base_class: Type) -> List[Type]:
+def import_plugin_module(file_path: str):
     """
-    Loads classes from a given file path that are subclasses of base_class.
-    
-    Args:
-        file_path: Relative or absolute path to the python file.
-        base_class: The class that loaded classes must inherit from.
-        
+    Imports a plugin file: as a proper module when it is inside the project
+    (so relative imports work), otherwise as a standalone file.
+
     Returns:
-        List of class objects found in the file.
+        The module, or None if it could not be loaded.
     """
     # Resolve absolute path
     if not os.path.isabs(file_path):
@@ -22,7 +19,7 @@ def load_classes_from_path(file_path: str, base_class: Type) -> List[Type]:
 
     if not os.path.exists(file_path):
         print(f"File not found: {file_path}")
-        return []
+        return None
 
     # Try to resolve module path relative to CWD (Project Root)
     cwd = os.getcwd()
@@ -32,16 +29,7 @@ def load_classes_from_path(file_path: str, base_class: Type) -> List[Type]:
         module_name = rel_path.replace(os.sep, '.').replace('.py', '')
         
         try:
-            module = importlib.import_module(module_name)
-            
-            found_classes = []
-            for name, obj in inspect.getmembers(module):
-                if (inspect.isclass(obj) and 
-                    issubclass(obj, base_class) and 
-                    obj is not base_class):
-                    found_classes.append(obj)
-            return found_classes
-            
+            return importlib.import_module(module_name)
         except Exception as e:
             print(f"Failed to import module {module_name}: {e}")
             # Fallback to direct file loading if import fails (e.g. for external files)
@@ -55,17 +43,47 @@ def load_classes_from_path(file_path: str, base_class: Type) -> List[Type]:
             module = importlib.util.module_from_spec(spec)
             sys.modules[module_name] = module
             spec.loader.exec_module(module)
-            
-            found_classes = []
-            for name, obj in inspect.getmembers(module):
-                if (inspect.isclass(obj) and 
-                    issubclass(obj, base_class) and 
-                    obj is not base_class):
-                    found_classes.append(obj)
-            
-            return found_classes
+            return module
     except Exception as e:
         print(f"Failed to load module from {file_path}: {e}")
-        return []
     
-    return []
+    return None
+
+def load_class(file_path: str, class_name: str) -> Type:
+    """
+    Loads one named class from a plugin file (see plugin_manifest).
+
+    Returns:
+        The class, or None if the file or class could not be loaded.
+    """
+    module = import_plugin_module(file_path)
+    if module is None:
+        return None
+    cls = getattr(module, class_name, None)
+    if not inspect.isclass(cls):
+        print(f"Class {class_name} not found in {file_path}")
+        return None
+    return cls
+
+def load_classes_from_path(file_path: str, base_class: Type) -> List[Type]:
+    """
+    Loads classes from a given file path that are subclasses of base_class.
+    
+    Args:
+        file_path: Relative or absolute path to the python file.
+        base_class: The class that loaded classes must inherit from.
+        
+    Returns:
+        List of class objects found in the file.
+    """
+    module = import_plugin_module(file_path)
+    if module is None:
+        return []
+
+    found_classes = []
+    for name, obj in inspect.getmembers(module):
+        if (inspect.isclass(obj) and 
+            issubclass(obj, base_class) and 
+            obj is not base_class):
+            found_classes.append(obj)
+    return found_classes
@@ -1,17 +1,45 @@
+from src.frontend.startup_profiler import startup_profiler, check_budget # First: the profile starts here
 import sys
 import os
-import importlib
-import pkgutil
-import inspect
-from PyQt6.QtWidgets import QApplication, QMainWindow, QVBoxLayout, QWidget, QToolBar
-from src.frontend.pdf_viewer import PDFViewer
+import json
+import argparse
+with startup_profiler.phase("import PyQt6", "import"):
+    from PyQt6.QtWidgets import QApplication, QMainWindow, QVBoxLayout, QWidget, QToolBar, QTabWidget
+    from PyQt6.QtCore import QTimer
 from src.frontend.modules.base_module import BaseModule
 from src.frontend.config_manager import ConfigManager
-from src.frontend.loader_utils import load_classes_from_path
-import os
+from src.frontend.cache_pool import CachePool
+from src.frontend.loader_utils import load_classes_from_path, load_class
+from src.frontend.plugin_manifest import PluginManifest, LazyModule
+from src.frontend.background_jobs import run_in_background, fitz_lock
+from src.frontend.tracing import tracer
+# The viewer (and with it fitz and numpy) is imported by add_viewer(), or ahead of
+# time on a worker by preload_document_support(); the window can paint without it
+
+def preload_document_support(path: str = None):
+    """
+    Worker half of a fast start: imports the PDF machinery while the GUI
+    thread builds and paints the window, and opens the document given on the
+    command line. Returns (doc, path, start page), or None without a path.
+    """
+    with startup_profiler.phase("import pdf_viewer", "import"):
+        import src.frontend.pdf_viewer
+    if not path:
+        return None
+    import fitz
+    from src.frontend.library import DocumentLibrary
+    with startup_profiler.phase("open command-line document", "render"), fitz_lock:
+        doc = fitz.open(path)
+        start_page = DocumentLibrary.shared().last_page(path)
+    return doc, path, start_page
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, defer_setup: bool = False):
+        """
+        With defer_setup the window is only a skeleton (empty toolbar and tab
+        area) until finish_setup() is called, so it can be shown before the
+        viewer and the modules exist.
+        """
         super().__init__()
         self.setWindowTitle("Study Partner")
         self.setGeometry(100, 100, 1000, 800)
@@ -25,14 +53,178 @@ class MainWindow(QMainWindow):
         self.toolbar = QToolBar()
         self.addToolBar(self.toolbar)
 
-        # PDF Viewer
-        self.pdf_viewer = PDFViewer()
-        layout.addWidget(self.pdf_viewer)
+        # Document Tabs: one PDFViewer (page cache, ink, undo history) per document
+        self.tabs = QTabWidget()
+        self.tabs.setDocumentMode(True)
+        self.tabs.setTabsClosable(True)
+        self.tabs.setMovable(True)
+        self.tabs.tabCloseRequested.connect(lambda index: self.close_viewer(self.tabs.widget(index)))
+        layout.addWidget(self.tabs)
+        with startup_profiler.phase("read config"):
+            self.config_manager = ConfigManager()
+        self.cache_pool = CachePool.shared()
+        self._active_viewer = None
+        self.modules = []
+        self.setup_done = False
+        self._painted = False
+        self._preload_pending = False
+        self._preloaded = None # (doc, path, start page) opened on the command line
+
+        if not defer_setup:
+            self.finish_setup()
 
+    def finish_setup(self) -> None:
+        """Creates the first tab and loads the modules into the toolbar."""
+        if self.setup_done:
+            return
+        self.setup_done = True
         # Load Modules
-        self.config_manager = ConfigManager()
-        self.modules = []
-        self.load_modules()
+        with startup_profiler.phase("create first viewer", once=True):
+            self.add_viewer()
+        with startup_profiler.phase("load modules", once=True):
+            self.load_modules()
+
+        # Modules follow the active tab from now on
+        self.tabs.currentChanged.connect(self.on_current_tab_changed)
+        for instance in self.modules:
+            instance.on_viewer_added(self.pdf_viewer)
+        self.on_current_tab_changed(self.tabs.currentIndex())
+
+    def start_preload(self, path: str = None) -> None:
+        """
+        Fast start: imports the PDF machinery (and opens path) on a worker.
+        finish_setup() runs once that is done and the skeleton has painted.
+        """
+        self._preload_pending = True
+        self.statusBar().showMessage("Loading…")
+        run_in_background(
+            preload_document_support, path,
+            on_finished=self.on_preload_finished,
+            on_failed=self.on_preload_failed
+        )
+
+    def on_preload_finished(self, result) -> None:
+        self._preload_pending = False
+        self._preloaded = result
+        self._continue_startup()
+
+    def on_preload_failed(self, error: str) -> None:
+        print(f"[ERROR] Failed to open the document given on the command line: {error}")
+        self._preload_pending = False
+        self._continue_startup()
+
+    def _continue_startup(self) -> None:
+        if self.setup_done or not self._painted or self._preload_pending:
+            return
+        self.finish_setup()
+        self.statusBar().clearMessage()
+        if self._preloaded:
+            doc, path, start_page = self._preloaded
+            self._preloaded = None
+            viewer = self.open_document(doc, start_page=start_page)
+            if viewer.needs_repair():
+                print(f"[Startup] Document '{path}' requires repair.")
+                viewer.schedule_repair()
+        startup_profiler.mark("ready")
+
+    @property
+    def pdf_viewer(self) -> "PDFViewer":
+        """The viewer of the active tab."""
+        return self.tabs.currentWidget()
+
+    def viewers(self) -> list:
+        return [self.tabs.widget(i) for i in range(self.tabs.count())]
+
+    def add_viewer(self) -> "PDFViewer":
+        from src.frontend.pdf_viewer import PDFViewer
+        viewer = PDFViewer()
+        viewer.document_changed.connect(lambda v=viewer: self.update_tab_title(v))
+        viewer.save_completed.connect(lambda _, v=viewer: self.update_tab_title(v))
+        self.tabs.addTab(viewer, "")
+        self.update_tab_title(viewer)
+        if self.modules:
+            for instance in self.modules:
+                instance.on_viewer_added(viewer)
+        return viewer
+
+    def update_tab_title(self, viewer: "PDFViewer") -> None:
+        index = self.tabs.indexOf(viewer)
+        if index < 0:
+            return
+        doc = viewer.get_document()
+        if not doc:
+            title = "Empty"
+        elif viewer.is_new_file or not doc.name:
+            title = "New Note"
+        else:
+            title = os.path.basename(doc.name)
+        self.tabs.setTabText(index, title)
+        self.tabs.setTabToolTip(index, doc.name if doc and doc.name else "")
+
+    def open_document(self, doc, is_new_file: bool = False, start_page: int = 0) -> "PDFViewer":
+        """
+        Shows a document in a tab: switches to its tab if the file is already
+        open, reuses the active tab if it is empty, otherwise opens a new one.
+        """
+        if doc.name and not is_new_file:
+            path = os.path.abspath(doc.name)
+            for viewer in self.viewers():
+                open_doc = viewer.get_document()
+                if open_doc and not viewer.is_new_file and open_doc.name and os.path.abspath(open_doc.name) == path:
+                    with fitz_lock:
+                        doc.close() # Keep the tab's own document (and its unsaved state)
+                    self.tabs.setCurrentWidget(viewer)
+                    return viewer
+        viewer = self.pdf_viewer
+        if viewer.get_document():
+            viewer = self.add_viewer()
+        self.tabs.setCurrentWidget(viewer)
+        viewer.set_document(doc, is_new_file=is_new_file, start_page=start_page)
+        return viewer
+
+    def close_viewer(self, viewer: "PDFViewer") -> None:
+        """Saves and closes a tab's document. The last tab stays open, empty."""
+        if viewer.get_document():
+            try:
+                # Untouched documents are not rewritten
+                if viewer.has_unsaved_changes():
+                    viewer.save_annotations()
+                # The save runs in the background; make sure it lands before closing
+                viewer.flush_saves()
+            except Exception as e:
+                print(f"[ERROR] Failed to save during close: {e}")
+
+            # Re-fetch the document: a save may have replaced it
+            current_doc = viewer.get_document()
+            if current_doc:
+                try:
+                    with fitz_lock:
+                        current_doc.close()
+                except Exception as e:
+                    print(f"[WARNING] Error closing document: {e}")
+            viewer.set_document(None)
+            viewer.scene.clear()
+        viewer.close_journal()
+        viewer.discard_repair()
+        self.cache_pool.discard_owner(viewer)
+
+        if self.tabs.count() > 1:
+            for instance in self.modules:
+                instance.on_viewer_removed(viewer)
+            self.tabs.removeTab(self.tabs.indexOf(viewer))
+            viewer.deleteLater()
+
+    def on_current_tab_changed(self, index: int) -> None:
+        viewer = self.tabs.widget(index)
+        if viewer is None or viewer is self._active_viewer:
+            return
+        old_viewer, self._active_viewer = self._active_viewer, viewer
+        self.cache_pool.set_active_owner(viewer)
+        for instance in self.modules:
+            try:
+                instance.on_viewer_changed(old_viewer, viewer)
+            except Exception as e:
+                print(f"[ERROR] {type(instance).__name__} failed to switch tabs: {e}")
 
     def load_modules(self):
         # Path to modules directory
@@ -44,21 +236,38 @@ class MainWindow(QMainWindow):
         # Discover and load modules
         modules_dict = self.config_manager.get_modules()
         
+        manifest = PluginManifest.shared()
+        
         for file_path, enabled in modules_dict.items():
             if not enabled:
                 continue
                 
-            # Load classes from file
-            module_classes = load_classes_from_path(file_path, BaseModule)
-            
-            for module_class in module_classes:
-                try:
-                    # Instantiate and initialize
-                    instance = module_class(self)
-                    instance.init_ui()
-                    loaded_modules.append(instance)
-                except Exception as e:
-                    print(f"Failed to instantiate module from {file_path}: {e}")
+            with startup_profiler.phase(f"module {file_path}", "plugin"):
+                # The manifest describes the file's modules without importing it
+                entries = manifest.entries(file_path, "BaseModule")
+                if not entries:
+                    # Not readable as a plain BaseModule subclass: import and inspect it
+                    module_classes = load_classes_from_path(file_path, BaseModule)
+                else:
+                    module_classes = []
+                    for entry in entries:
+                        if entry["lazy"]:
+                            # Plain toolbar actions: imported and created on first click
+                            loaded_modules.append(LazyModule(self, file_path, entry))
+                        else:
+                            module_class = load_class(file_path, entry["class"])
+                            if module_class is not None:
+                                module_classes.append(module_class)
+                
+                for module_class in module_classes:
+                    try:
+                        # Instantiate and initialize
+                        instance = module_class(self)
+                        instance.init_ui()
+                        loaded_modules.append(instance)
+                    except Exception as e:
+                        print(f"Failed to instantiate module from {file_path}: {e}")
+        manifest.save()
         
         # Sort by priority
         loaded_modules.sort(key=lambda x: x.priority)
@@ -67,22 +276,83 @@ class MainWindow(QMainWindow):
         self.modules = loaded_modules
 
         # Add actions to toolbar
-        for instance in self.modules:
-            actions = instance.get_actions()
-            if actions:
-                for action in actions:
-                    if isinstance(action, QWidget):
-                        self.toolbar.addWidget(action)
-                    else:
-                        self.toolbar.addAction(action)
+        with startup_profiler.phase("build toolbar"):
+            for instance in self.modules:
+                actions = instance.get_actions()
+                if actions:
+                    for action in actions:
+                        if isinstance(action, QWidget):
+                            self.toolbar.addWidget(action)
+                        else:
+                            self.toolbar.addAction(action)
 
     def closeEvent(self, event):
-        if self.pdf_viewer.doc:
-            self.pdf_viewer.save_annotations(save_to_disk=True)
+        viewers = self.viewers()
+        for viewer in viewers:
+            if viewer.doc and viewer.has_unsaved_changes():
+                viewer.save_annotations()
+        # Saves run in the background; never exit before they are on disk
+        for viewer in viewers:
+            viewer.cancel_indexing()
+            viewer.flush_saves()
+            viewer.close_journal()
+            viewer.discard_repair()
         event.accept()
 
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._painted:
+            self._painted = True
+            startup_profiler.mark("first paint")
+            if not self.setup_done:
+                # Let the paint reach the screen before building the rest
+                QTimer.singleShot(0, self._continue_startup)
+
+def main():
+    parser = argparse.ArgumentParser(description="Study Partner")
+    parser.add_argument("document", nargs="?", help="PDF to open at startup")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print where the startup time went (sorted by phase) on exit")
+    parser.add_argument("--profile-json", metavar="PATH", help="also write the startup profile as JSON")
+    parser.add_argument("--startup-budget", metavar="PATH",
+                        help="JSON budget to check the profile against; exit code 1 if exceeded")
+    parser.add_argument("--exit-after-startup", action="store_true",
+                        help="quit as soon as the window is ready (benchmarks)")
+    parser.add_argument("--trace", metavar="PATH",
+                        help="trace rendering, caches, ink, undo and saves; written on exit in the Chrome trace format")
+    args, qt_args = parser.parse_known_args()
+
+    if args.trace:
+        tracer.start()
+    app = QApplication([sys.argv[0]] + qt_args)
+    if args.exit_after_startup:
+        # Leave the event loop once the toolbar and the document are up
+        startup_profiler.on_milestone = lambda name: name == "ready" and app.quit()
+    # Paint a skeleton window first; the viewer, the modules and the document follow
+    window = MainWindow(defer_setup=True)
+    window.start_preload(args.document)
+    with startup_profiler.phase("show window"):
+        window.show()
+    exit_code = app.exec()
+
+    if args.exit_after_startup:
+        window.close()
+    if args.trace:
+        tracer.stop()
+        tracer.write_chrome_trace(args.trace)
+        print(f"[Trace] {len(tracer.events)} events written to {args.trace}")
+    if args.profile_startup:
+        print(startup_profiler.format_report())
+    if args.profile_json:
+        startup_profiler.write_json(args.profile_json)
+    if args.startup_budget:
+        with open(args.startup_budget, "r", encoding="utf-8") as f:
+            violations = check_budget(startup_profiler.report(), json.load(f))
+        for violation in violations:
+            print(f"[BUDGET] {violation}")
+        if violations:
+            exit_code = exit_code or 1
+    return exit_code
+
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    window = MainWindow()
-    window.show()
-    sys.exit(app.exec())
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
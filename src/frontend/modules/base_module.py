@@ -26,3 +26,23 @@ class BaseModule(ABC):
         Optional method to perform additional UI initialization.
         """
         pass
+
+    def on_viewer_added(self, viewer):
+        """
+        Optional hook: a document tab was created (called for the first tab
+        once the toolbar is built). Connect signals that every tab must report.
+        """
+        pass
+
+    def on_viewer_removed(self, viewer):
+        """
+        Optional hook: a document tab is being closed.
+        """
+        pass
+
+    def on_viewer_changed(self, old_viewer, new_viewer):
+        """
+        Optional hook: the active tab changed (old_viewer is None for the first
+        tab). Move connections that follow the document on screen.
+        """
+        pass
@@ -0,0 +1,55 @@
+import os
+import time
+from PyQt6.QtGui import QAction
+from src.frontend.input_recording import InputRecorder, save_recording
+from .base_module import BaseModule
+
+class InputRecorderModule(BaseModule):
+    """
+    Records the pen, mouse and gesture input of the active tab into
+    benchmarks/pen_sessions/, the corpus replayed by
+    benchmarks/replay_benchmark.py.
+    """
+    SESSIONS_DIR = os.path.join("benchmarks", "pen_sessions")
+
+    def __init__(self, main_window):
+        super().__init__(main_window)
+        self.recorder = None
+
+    @property
+    def priority(self):
+        return 91 # Diagnostics, next to the latency overlay
+
+    def get_actions(self):
+        self.record_action = QAction("Record Input", self.main_window)
+        self.record_action.setToolTip("Record pen input as a replayable benchmark session")
+        self.record_action.setCheckable(True)
+        self.record_action.toggled.connect(self.set_recording)
+        return [self.record_action]
+
+    def on_viewer_changed(self, old_viewer, new_viewer):
+        # A session belongs to one view state; switching tabs ends it
+        if self.recorder is not None:
+            self.record_action.setChecked(False)
+
+    def set_recording(self, recording):
+        if recording:
+            self.recorder = InputRecorder(self.main_window.pdf_viewer)
+            self.recorder.start()
+            self.main_window.statusBar().showMessage("Recording input...")
+            return
+        if self.recorder is None:
+            return
+        session, self.recorder = self.recorder.stop(), None
+        if not session["events"]:
+            self.main_window.statusBar().showMessage("No input recorded", 3000)
+            return
+        path = os.path.join(self.SESSIONS_DIR, f"session_{time.strftime('%Y%m%d_%H%M%S')}.inkrec")
+        try:
+            os.makedirs(self.SESSIONS_DIR, exist_ok=True)
+            save_recording(session, path)
+        except OSError as e:
+            print(f"[ERROR] Could not save the input recording: {e}")
+            return
+        print(f"[Recorder] Saved {len(session['events'])} events to {path}")
+        self.main_window.statusBar().showMessage(f"Input recording saved to {path}", 5000)
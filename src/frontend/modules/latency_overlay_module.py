@@ -0,0 +1,113 @@
+import os
+import time
+from PyQt6.QtGui import QAction
+from PyQt6.QtWidgets import QLabel, QApplication
+from PyQt6.QtCore import Qt, QTimer
+from src.frontend.ink_latency import InkLatencyTracker
+from .base_module import BaseModule
+
+class LatencyOverlayModule(BaseModule):
+    """
+    Pen-to-paint latency: a live p50/p95/p99 overlay in the corner of the
+    active tab, and recording every sample to latency_logs/*.jsonl so builds
+    can be compared (see benchmarks/latency_report.py).
+    """
+    REFRESH_MS = 250
+    LOG_DIR = "latency_logs"
+
+    def __init__(self, main_window):
+        super().__init__(main_window)
+        self.tracker = InkLatencyTracker.shared()
+        self.overlay = None
+        self.viewer = None
+        self.refresh_timer = QTimer(main_window)
+        self.refresh_timer.setInterval(self.REFRESH_MS)
+        self.refresh_timer.timeout.connect(self.refresh_overlay)
+        # A recording left running still gets its summary line
+        QApplication.instance().aboutToQuit.connect(self.tracker.stop_recording)
+
+    @property
+    def priority(self):
+        return 90 # Diagnostics, right end of the toolbar
+
+    def get_actions(self):
+        self.overlay_action = QAction("Latency", self.main_window)
+        self.overlay_action.setToolTip("Show pen-to-paint latency")
+        self.overlay_action.setCheckable(True)
+        self.overlay_action.toggled.connect(self.set_overlay_visible)
+
+        self.record_action = QAction("Record Latency", self.main_window)
+        self.record_action.setToolTip("Record pen-to-paint latency to a file")
+        self.record_action.setCheckable(True)
+        self.record_action.toggled.connect(self.set_recording)
+        return [self.overlay_action, self.record_action]
+
+    def on_viewer_changed(self, old_viewer, new_viewer):
+        self.viewer = new_viewer
+        if self.overlay is not None:
+            # The overlay follows the tab on screen
+            self.overlay.setParent(new_viewer)
+            self.place_overlay()
+            self.overlay.setVisible(self.overlay_action.isChecked())
+
+    def update_tracking(self):
+        self.tracker.set_enabled(self.overlay_action.isChecked() or self.record_action.isChecked())
+
+    def set_overlay_visible(self, visible):
+        if visible and self.overlay is None:
+            self.overlay = QLabel(self.viewer)
+            # Opaque, so refreshing it never repaints the page underneath
+            self.overlay.setAutoFillBackground(True)
+            self.overlay.setStyleSheet("background-color: #202020; color: #f0f0f0; padding: 4px; font-family: monospace;")
+            self.overlay.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        if self.overlay is not None:
+            self.overlay.setVisible(visible)
+        if visible:
+            self.refresh_overlay()
+            self.refresh_timer.start()
+        else:
+            self.refresh_timer.stop()
+        self.update_tracking()
+
+    def set_recording(self, recording):
+        if recording:
+            path = os.path.join(self.LOG_DIR, f"ink_latency_{time.strftime('%Y%m%d_%H%M%S')}.jsonl")
+            try:
+                self.tracker.start_recording(path)
+            except OSError as e:
+                print(f"[ERROR] Could not start the latency recording: {e}")
+                self.record_action.setChecked(False)
+                return
+            self.main_window.statusBar().showMessage(f"Recording latency to {path}", 3000)
+        else:
+            path = self.tracker.stop_recording()
+            if path:
+                p95 = self.tracker.to_paint.summary()["p95"]
+                self.main_window.statusBar().showMessage(f"Latency recording saved to {path} (p95 {p95} ms)", 5000)
+        self.update_tracking()
+
+    def refresh_overlay(self):
+        if self.overlay is None or not self.overlay.isVisible():
+            return
+        to_paint = self.tracker.to_paint.summary()
+        to_flush = self.tracker.to_flush.summary()
+        self.overlay.setText(
+            f"pen→paint  p50 {to_paint['p50']:5.1f}  p95 {to_paint['p95']:5.1f}  p99 {to_paint['p99']:5.1f} ms\n"
+            f"pen→flush  p50 {to_flush['p50']:5.1f}  p95 {to_flush['p95']:5.1f}  p99 {to_flush['p99']:5.1f} ms\n"
+            f"samples {to_paint['count']}" + ("  ● REC" if self.tracker.recording_path else "")
+            + self.prediction_text()
+        )
+        self.overlay.adjustSize()
+        self.place_overlay()
+
+    def prediction_text(self):
+        predictor = self.viewer.scene.predictor if self.viewer is not None else None
+        if predictor is None or predictor.horizon_ms <= 0:
+            return ""
+        error = predictor.error.summary()
+        return f"\nprediction {predictor.horizon_ms:g} ms  error p50 {error['p50']:.1f}  p95 {error['p95']:.1f} px"
+
+    def place_overlay(self):
+        if self.overlay is not None and self.viewer is not None:
+            self.overlay.move(self.viewer.width() - self.overlay.width() - 10, 10)
+            self.overlay.raise_()
@@ -0,0 +1,195 @@
+import os
+from collections import OrderedDict
+from PyQt6.QtGui import QAction, QIcon, QPixmap, QColor
+from PyQt6.QtWidgets import QDialog, QVBoxLayout, QListView, QAbstractItemView
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QSize
+from src.frontend.library import DocumentLibrary, render_thumbnail, THUMBNAIL_WIDTH
+from src.frontend.background_jobs import run_in_background, fitz_lock
+from .base_module import BaseModule
+
+class LibraryModel(QAbstractListModel):
+    """
+    Documents of the library for a grid view. Rows are fetched from SQLite in
+    batches as the view scrolls, and thumbnails are only loaded (or rendered
+    in the background) for rows the view actually paints.
+    """
+    BATCH_SIZE = 200
+    ICON_CACHE_SIZE = 300
+
+    def __init__(self, library: DocumentLibrary, parent=None):
+        super().__init__(parent)
+        self.library = library
+        self.rows = []
+        self.total = library.count()
+        self._icons = OrderedDict() # thumbnail path -> QIcon
+        self._rendering = set() # thumbnail paths being rendered
+        placeholder = QPixmap(THUMBNAIL_WIDTH, int(THUMBNAIL_WIDTH * 1.41))
+        placeholder.fill(QColor("#e0e0e0"))
+        self._placeholder = QIcon(placeholder)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and len(self.rows) < self.total
+
+    def fetchMore(self, parent=QModelIndex()):
+        batch = self.library.list_documents(self.BATCH_SIZE, len(self.rows))
+        if not batch:
+            self.total = len(self.rows)
+            return
+        self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(batch) - 1)
+        self.rows.extend(batch)
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.rows[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            name = os.path.basename(row["FilePath"])
+            return f"{name}\nPage {row['LastPageNum'] + 1} of {row['TotalPages']}"
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return row["FilePath"]
+        if role == Qt.ItemDataRole.UserRole:
+            return row["FilePath"]
+        if role == Qt.ItemDataRole.DecorationRole:
+            return self._icon_for(index.row(), row)
+        return None
+
+    def _icon_for(self, row_num: int, row):
+        thumbnail = self.library.thumbnail_path(row)
+        if thumbnail is None:
+            return self._placeholder
+        icon = self._icons.get(thumbnail)
+        if icon is not None:
+            self._icons.move_to_end(thumbnail)
+            return icon
+        if os.path.exists(thumbnail):
+            icon = QIcon(QPixmap(thumbnail))
+            self._icons[thumbnail] = icon
+            while len(self._icons) > self.ICON_CACHE_SIZE:
+                self._icons.popitem(last=False)
+            return icon
+        if thumbnail not in self._rendering and os.path.exists(row["FilePath"]):
+            self._rendering.add(thumbnail)
+            run_in_background(
+                render_thumbnail, row["FilePath"], thumbnail,
+                on_finished=lambda _, r=row_num, t=thumbnail: self._on_thumbnail_ready(r, t),
+                on_failed=lambda error, t=thumbnail: self._on_thumbnail_failed(t, error),
+                priority=-1 # Behind user-facing work
+            )
+        return self._placeholder
+
+    def _on_thumbnail_ready(self, row_num: int, thumbnail: str):
+        self._rendering.discard(thumbnail)
+        if row_num < len(self.rows):
+            index = self.index(row_num)
+            self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole])
+
+    def _on_thumbnail_failed(self, thumbnail: str, error: str):
+        print(f"[Library] Thumbnail failed for {thumbnail}: {error}")
+
+class LibraryDialog(QDialog):
+    def __init__(self, library: DocumentLibrary, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Library")
+        self.resize(900, 650)
+        self.selected_path = None
+
+        self.view = QListView()
+        self.view.setViewMode(QListView.ViewMode.IconMode)
+        self.view.setResizeMode(QListView.ResizeMode.Adjust)
+        self.view.setMovement(QListView.Movement.Static)
+        self.view.setUniformItemSizes(True) # No per-item size queries with thousands of rows
+        self.view.setLayoutMode(QListView.LayoutMode.Batched)
+        self.view.setIconSize(QSize(THUMBNAIL_WIDTH, int(THUMBNAIL_WIDTH * 1.41)))
+        self.view.setGridSize(QSize(THUMBNAIL_WIDTH + 30, int(THUMBNAIL_WIDTH * 1.41) + 50))
+        self.view.setWordWrap(True)
+        self.view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.view.setModel(LibraryModel(library, self.view))
+        self.view.activated.connect(self.on_activated)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.view)
+
+    def on_activated(self, index):
+        self.selected_path = index.data(Qt.ItemDataRole.UserRole)
+        self.accept()
+
+class LibraryModule(BaseModule):
+    """
+    Keeps the library's reading state in sync with every open tab and opens
+    documents from a thumbnail grid at the page they were left on.
+    """
+    def __init__(self, main_window):
+        super().__init__(main_window)
+        self.library = DocumentLibrary.shared()
+        self._paths = {} # viewer -> library entry of its document
+
+    @property
+    def priority(self):
+        return 4
+
+    def get_actions(self):
+        library_action = QAction("Library", self.main_window)
+        library_action.setToolTip("Open a document from the library")
+        library_action.triggered.connect(self.show_library)
+        return [library_action]
+
+    def on_viewer_added(self, viewer):
+        # Background tabs keep reporting (e.g. a save finishing after a tab switch)
+        viewer.document_changed.connect(lambda: self.on_document_changed(viewer))
+        viewer.page_changed.connect(lambda page_num: self.on_page_changed(viewer, page_num))
+        viewer.save_completed.connect(lambda report: self.on_save_completed(viewer, report))
+        self.on_document_changed(viewer)
+
+    def on_viewer_removed(self, viewer):
+        self._paths.pop(viewer, None)
+
+    def show_library(self):
+        dialog = LibraryDialog(self.library, self.main_window)
+        if dialog.exec() and dialog.selected_path:
+            self.open_document(dialog.selected_path)
+
+    def open_document(self, path: str):
+        import fitz
+        if not os.path.exists(path):
+            print(f"[Library] {path} no longer exists, removing it from the library.")
+            self.library.remove(path)
+            return
+        try:
+            with fitz_lock:
+                doc = fitz.open(path)
+            viewer = self.main_window.open_document(doc, start_page=self.library.last_page(path))
+            if viewer.needs_repair():
+                viewer.schedule_repair()
+        except Exception as e:
+            print(f"Error loading document: {e}")
+
+    def on_document_changed(self, viewer):
+        doc = viewer.get_document()
+        if not doc or viewer.is_new_file or not doc.name:
+            self._paths.pop(viewer, None)
+            return
+        path = os.path.abspath(doc.name)
+        if path != self._paths.get(viewer):
+            self._paths[viewer] = path
+            self.library.record_open(path, viewer.page_count())
+        else:
+            # Same document, page count changed
+            self.library.record_page(path, viewer.get_page(), viewer.page_count())
+
+    def on_page_changed(self, viewer, page_num):
+        path = self._paths.get(viewer)
+        if path:
+            self.library.record_page(path, page_num, viewer.page_count())
+
+    def on_save_completed(self, viewer, report):
+        if report.get("strategy") == "new_file":
+            # A new note became a file: it belongs in the library from now on
+            path = self._paths[viewer] = os.path.abspath(report["path"])
+            self.library.record_open(path, viewer.page_count())
+            self.library.record_page(path, viewer.get_page())
+        elif self._paths.get(viewer):
+            self.library.record_saved(self._paths[viewer])
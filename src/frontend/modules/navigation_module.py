@@ -57,16 +57,21 @@ class NavigationModule(BaseModule):
         btn_prev.clicked.connect(lambda: self.change_page(-1))
         btn_next.clicked.connect(lambda: self.change_page(1))
         btn_next_5.clicked.connect(lambda: self.change_page(5))
-        
-        # Connect to PDFViewer Signals
-        self.main_window.pdf_viewer.document_changed.connect(self.update_ui)
-        self.main_window.pdf_viewer.page_changed.connect(lambda _: self.update_ui())
-        
-        # Initial Update
-        self.update_ui()
 
         return [container]
 
+    def on_viewer_changed(self, old_viewer, new_viewer):
+        # Follow the PDFViewer of the active tab
+        if old_viewer is not None:
+            old_viewer.document_changed.disconnect(self.update_ui)
+            old_viewer.page_changed.disconnect(self.on_page_changed)
+        new_viewer.document_changed.connect(self.update_ui)
+        new_viewer.page_changed.connect(self.on_page_changed)
+        self.update_ui()
+
+    def on_page_changed(self, page_num):
+        self.update_ui()
+
     def change_page(self, delta: int):
         if not self.main_window.pdf_viewer.doc:
             return
@@ -89,7 +94,7 @@ class NavigationModule(BaseModule):
         if not self.main_window.pdf_viewer.doc:
             return
             
-        total_pages = self.main_window.pdf_viewer.doc.page_count
+        total_pages = self.main_window.pdf_viewer.page_count()
         
         # Auto-add page if navigating past end
         if page_index >= total_pages:
@@ -112,7 +117,7 @@ class NavigationModule(BaseModule):
             return
             
         current = self.main_window.pdf_viewer.get_page()
-        total = self.main_window.pdf_viewer.doc.page_count
+        total = self.main_window.pdf_viewer.page_count()
         
         self.input_field.setEnabled(True)
         # Display as 1-based
@@ -1,4 +1,5 @@
 from PyQt6.QtGui import QAction
+from src.frontend.background_jobs import fitz_lock
 from .base_module import BaseModule
 
 class NewNoteModule(BaseModule):
@@ -13,7 +14,8 @@ class NewNoteModule(BaseModule):
 
     def new_note(self):
         import fitz
-        doc = fitz.open()
-        # A4 size: 595 x 842 points
-        doc.new_page(width=595, height=842)
-        self.main_window.pdf_viewer.set_document(doc, is_new_file=True)
+        with fitz_lock:
+            doc = fitz.open()
+            # A4 size: 595 x 842 points
+            doc.new_page(width=595, height=842)
+        self.main_window.open_document(doc, is_new_file=True)
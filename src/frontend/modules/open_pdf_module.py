@@ -1,5 +1,7 @@
 from PyQt6.QtGui import QAction
-from PyQt6.QtWidgets import QFileDialog
+from PyQt6.QtWidgets import QFileDialog, QProgressBar
+from src.frontend.library import DocumentLibrary
+from src.frontend.background_jobs import fitz_lock
 from .base_module import BaseModule
 
 class OpenPDFModule(BaseModule):
@@ -12,57 +14,56 @@ class OpenPDFModule(BaseModule):
         open_action.triggered.connect(self.open_pdf)
         return [open_action]
 
+    def init_ui(self):
+        # Progress of the background repair of damaged documents
+        self.repair_bar = QProgressBar()
+        self.repair_bar.setMaximumWidth(160)
+        self.repair_bar.setFormat("Repairing %p%")
+        self.repair_bar.hide()
+        self.main_window.statusBar().addPermanentWidget(self.repair_bar)
+
+    def on_viewer_changed(self, old_viewer, new_viewer):
+        # The bar shows the repair of the tab on screen
+        if old_viewer is not None:
+            old_viewer.repair_started.disconnect(self.on_repair_started)
+            old_viewer.repair_progress.disconnect(self.on_repair_progress)
+            old_viewer.repair_finished.disconnect(self.on_repair_finished)
+        new_viewer.repair_started.connect(self.on_repair_started)
+        new_viewer.repair_progress.connect(self.on_repair_progress)
+        new_viewer.repair_finished.connect(self.on_repair_finished)
+        if new_viewer.is_repairing():
+            self.on_repair_started()
+        else:
+            self.repair_bar.hide()
+
     def open_pdf(self):
         file_name, _ = QFileDialog.getOpenFileName(self.main_window, "Open PDF", "", "PDF Files (*.pdf)")
         if file_name:
             import fitz
-            import os
-            import shutil
-            import time
-            
-            try:
-                # Attempt to open the document
-                doc = fitz.open(file_name)
-                
-                # Check if the document is "repaired" or otherwise broken for incremental updates
-                if not doc.can_save_incrementally():
-                    print(f"[OpenPDF] Document '{file_name}' requires repair. repairing...")
-                    
-                    try:
-                        temp_path = file_name + ".tmp"
-                        
-                        # Full save with garbage collection and deflation to "scrub" the file
-                        doc.save(temp_path, garbage=4, deflate=True)
-                        doc.close()
-                        
-                        # Replace original with temp (robustly)
-                        max_retries = 3
-                        for attempt in range(max_retries):
-                            try:
-                                if os.path.exists(file_name):
-                                    os.replace(temp_path, file_name)
-                                else:
-                                    os.rename(temp_path, file_name)
-                                break
-                            except OSError as e_os:
-                                if attempt < max_retries - 1:
-                                    print(f"[WARNING] File replace failed (attempt {attempt+1}/{max_retries}): {e_os}. Retrying...")
-                                    time.sleep(0.5)
-                                else:
-                                    raise e_os
 
-                        print(f"[OpenPDF] Document repaired and saved to '{file_name}'")
-                        
-                        # Re-open the now-clean document
-                        doc = fitz.open(file_name)
-                        
-                    except Exception as e_repair:
-                        print(f"[ERROR] Failed to repair document: {e_repair}")
-                        # If repair fails, we might still be able to open it read-only or as-is, 
-                        # but user should be warned (console log for now)
-                        if os.path.exists(file_name):
-                             doc = fitz.open(file_name)
+            try:
+                # Show the document as-is right away, in its own tab, at the page it was left on
+                with fitz_lock:
+                    doc = fitz.open(file_name)
+                viewer = self.main_window.open_document(doc, start_page=DocumentLibrary.shared().last_page(file_name))
 
-                self.main_window.pdf_viewer.set_document(doc)
+                # A "repaired" or damaged file cannot take incremental saves.
+                # Normalize a copy in the background; it replaces the file at the next save.
+                if viewer.needs_repair():
+                    print(f"[OpenPDF] Document '{file_name}' requires repair.")
+                    viewer.schedule_repair()
             except Exception as e:
                 print(f"Error loading document: {e}")
+
+    def on_repair_started(self):
+        self.repair_bar.setRange(0, 0) # Busy until the first progress report
+        self.repair_bar.show()
+
+    def on_repair_progress(self, done, total):
+        self.repair_bar.setRange(0, total)
+        self.repair_bar.setValue(done)
+
+    def on_repair_finished(self, ready):
+        self.repair_bar.hide()
+        if ready:
+            self.main_window.statusBar().showMessage("Document repaired; the fix is written with the next save", 5000)
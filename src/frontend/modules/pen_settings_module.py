@@ -303,3 +303,8 @@ class PenSettingsModule(BaseModule):
     def update_pen_settings(self, color, size):
         self.main_window.pdf_viewer.scene.pen_color = color
         self.main_window.pdf_viewer.scene.pen_width = size
+
+    def on_viewer_changed(self, old_viewer, new_viewer):
+        # The pen is a tool, not part of a document: it carries over to the new tab
+        if old_viewer is not None:
+            self.update_pen_settings(old_viewer.scene.pen_color, old_viewer.scene.pen_width)
@@ -0,0 +1,64 @@
+import os
+import time
+from PyQt6.QtGui import QAction
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QTimer
+from src.frontend.config_manager import ConfigManager
+from src.frontend.sampling_profiler import SamplingProfiler
+from .base_module import BaseModule
+
+class SamplingProfilerModule(BaseModule):
+    """
+    Captures where the GUI thread spends the next "profile_seconds" (config
+    setting) of interaction, for stutters that only happen in the field.
+    The result is written to profiles/*.folded for a flame graph
+    (flamegraph.pl, speedscope) and the hottest of our own functions are
+    printed. Clicking again stops early. Idle, it costs nothing.
+    """
+    LOG_DIR = "profiles"
+    DEFAULT_SECONDS = 10
+
+    def __init__(self, main_window):
+        super().__init__(main_window)
+        self.profiler = SamplingProfiler()
+        self.seconds = ConfigManager().get_setting("profile_seconds", self.DEFAULT_SECONDS)
+        self.stop_timer = QTimer(main_window)
+        self.stop_timer.setSingleShot(True)
+        self.stop_timer.timeout.connect(lambda: self.profile_action.setChecked(False))
+        # A capture still running at exit is saved
+        QApplication.instance().aboutToQuit.connect(lambda: self.set_profiling(False))
+
+    @property
+    def priority(self):
+        return 92 # Diagnostics, next to the input recorder
+
+    def get_actions(self):
+        self.profile_action = QAction("Profile", self.main_window)
+        self.profile_action.setToolTip(f"Profile the next {self.seconds:g} s of interaction")
+        self.profile_action.setCheckable(True)
+        self.profile_action.toggled.connect(self.set_profiling)
+        return [self.profile_action]
+
+    def set_profiling(self, profiling):
+        if profiling:
+            self.profiler.start()
+            self.stop_timer.start(int(self.seconds * 1000))
+            self.main_window.statusBar().showMessage(f"Profiling for {self.seconds:g} s...")
+            return
+        if not self.profiler.running:
+            return
+        self.stop_timer.stop()
+        self.profiler.stop()
+        if not self.profiler.stacks:
+            self.main_window.statusBar().showMessage("No samples captured", 3000)
+            return
+        path = os.path.join(self.LOG_DIR, f"profile_{time.strftime('%Y%m%d_%H%M%S')}.folded")
+        try:
+            self.profiler.write_folded(path)
+        except OSError as e:
+            print(f"[ERROR] Could not save the profile: {e}")
+            return
+        print(f"[Profiler] {self.profiler.samples} samples over {self.profiler.duration_ms:.0f} ms saved to {path}")
+        for label, ms, percent in self.profiler.hot_functions(5):
+            print(f"[Profiler] {percent:5.1f}% {ms:8.1f} ms  {label}")
+        self.main_window.statusBar().showMessage(f"Profile saved to {path}", 5000)
@@ -12,7 +12,34 @@ class SaveModule(BaseModule):
         save_action.triggered.connect(self.save_changes)
         return [save_action]
 
+    def on_viewer_changed(self, old_viewer, new_viewer):
+        # Report the saves of the tab on screen
+        if old_viewer is not None:
+            old_viewer.save_started.disconnect(self.on_save_started)
+            old_viewer.save_progress.disconnect(self.on_save_progress)
+            old_viewer.save_completed.disconnect(self.on_save_completed)
+        new_viewer.save_started.connect(self.on_save_started)
+        new_viewer.save_progress.connect(self.on_save_progress)
+        new_viewer.save_completed.connect(self.on_save_completed)
+
     def save_changes(self):
-        if self.main_window.pdf_viewer.doc:
-            self.main_window.pdf_viewer.save_annotations(save_to_disk=True)
-            print("[SaveModule] Changes saved manually.")
+        viewer = self.main_window.pdf_viewer
+        if not viewer.doc:
+            return
+        if not viewer.has_unsaved_changes():
+            self.main_window.statusBar().showMessage("No changes to save", 3000)
+            return
+        # Returns immediately; the write happens on a background worker
+        viewer.save_annotations()
+        print("[SaveModule] Save requested manually.")
+
+    def on_save_started(self):
+        self.main_window.statusBar().showMessage("Saving...")
+
+    def on_save_progress(self, done, total):
+        self.main_window.statusBar().showMessage(f"Saving... {done}/{total} pages")
+
+    def on_save_completed(self, report):
+        self.main_window.statusBar().showMessage(
+            f"Saved ({report['strategy']}, {report['duration_ms']:.0f} ms)", 5000
+        )
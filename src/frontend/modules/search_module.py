@@ -0,0 +1,184 @@
+from PyQt6.QtWidgets import QWidget, QHBoxLayout, QPushButton, QLineEdit, QLabel, QSizePolicy, QDockWidget, QListWidget, QListWidgetItem
+from PyQt6.QtGui import QKeySequence, QShortcut
+from PyQt6.QtCore import Qt, QTimer
+from src.frontend.background_jobs import run_in_background
+from src.frontend.text_index import TextIndex
+from .base_module import BaseModule
+
+class SearchModule(BaseModule):
+    """
+    Find in document: results stream in page by page from a background
+    search of the file (pages narrowed down by the trigram index of
+    TextIndex, hits found by search_for), hits are drawn as overlay items on
+    the viewer and stepped through with Enter/Shift+Enter. Typing more
+    cancels the running search.
+    """
+    DEBOUNCE_MS = 250
+
+    def __init__(self, main_window):
+        super().__init__(main_window)
+        self.viewer = None
+        self._path = None # File searched: the active tab's document
+        self.query = ""
+        self.hits = [] # (page_num, index on page), in document order
+        self.current = -1
+        self._job = None
+        self._debounce = QTimer()
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(self.DEBOUNCE_MS)
+        self._debounce.timeout.connect(self.start_search)
+
+    @property
+    def priority(self) -> int:
+        return 15 # Right of navigation
+
+    def get_actions(self):
+        container = QWidget()
+        layout = QHBoxLayout(container)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(5)
+        container.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Preferred)
+
+        self.search_field = QLineEdit()
+        self.search_field.setPlaceholderText("Search")
+        self.search_field.setClearButtonEnabled(True)
+        self.search_field.setFixedWidth(160)
+        self.search_field.textChanged.connect(self.on_text_changed)
+        self.search_field.returnPressed.connect(lambda: self.step(1))
+
+        btn_prev = QPushButton("▲")
+        btn_next = QPushButton("▼")
+        for btn in [btn_prev, btn_next]:
+            btn.setFixedWidth(30)
+        btn_prev.clicked.connect(lambda: self.step(-1))
+        btn_next.clicked.connect(lambda: self.step(1))
+
+        self.count_label = QLabel("")
+        self.count_label.setMinimumWidth(70)
+
+        layout.addWidget(self.search_field)
+        layout.addWidget(btn_prev)
+        layout.addWidget(btn_next)
+        layout.addWidget(self.count_label)
+
+        # Result list: one row per page with hits
+        self.results_list = QListWidget()
+        self.results_list.itemActivated.connect(self.on_result_activated)
+        self.results_list.itemClicked.connect(self.on_result_activated)
+        self.dock = QDockWidget("Search Results", self.main_window)
+        self.dock.setWidget(self.results_list)
+        self.dock.hide()
+        self.main_window.addDockWidget(Qt.DockWidgetArea.LeftDockWidgetArea, self.dock)
+
+        QShortcut(QKeySequence.StandardKey.Find, self.main_window, activated=self.focus_search)
+        QShortcut(QKeySequence("Shift+Return"), self.search_field, activated=lambda: self.step(-1))
+
+        return [container]
+
+    def on_viewer_changed(self, old_viewer, new_viewer):
+        # A search belongs to one document: drop it when the tab or document changes
+        if old_viewer is not None:
+            old_viewer.document_changed.disconnect(self.on_document_changed)
+            self.cancel_search()
+            old_viewer.clear_search_hits()
+        self.viewer = new_viewer
+        new_viewer.document_changed.connect(self.on_document_changed)
+        self.on_document_changed()
+
+    def on_document_changed(self):
+        # Page count changes re-emit this too; results of the file stay valid then
+        doc = self.viewer.get_document()
+        path = doc.name if doc and not self.viewer.is_new_file else None
+        if path != self._path:
+            self._path = path
+            self.on_text_changed(self.search_field.text())
+
+    def focus_search(self):
+        self.search_field.setFocus()
+        self.search_field.selectAll()
+
+    def on_text_changed(self, text):
+        self.cancel_search()
+        self._debounce.start()
+
+    def cancel_search(self):
+        self._debounce.stop()
+        if self._job is not None:
+            self._job.cancel()
+            self._job = None
+        self.hits = []
+        self.current = -1
+        self.results_list.clear()
+        if self.viewer is not None:
+            self.viewer.clear_search_hits()
+        self.count_label.setText("")
+
+    def start_search(self):
+        self.query = self.search_field.text().strip()
+        if not self.query:
+            self.dock.hide()
+            return
+        if not self._path:
+            self.count_label.setText("Save to search")
+            return
+        self.count_label.setText("Searching...")
+        self.dock.show()
+        # Callbacks check the job, so results of a cancelled search are ignored
+        job = self._job = run_in_background(
+            TextIndex.shared().search_file, self._path, self.query,
+            on_partial=lambda result: self.on_page_found(job, result),
+            on_finished=lambda _: self.on_search_finished(job),
+            on_failed=lambda error: self.on_search_failed(job, error),
+            pass_job=True
+        )
+
+    def on_page_found(self, job, result):
+        if job is not self._job:
+            return
+        page_num, rects = result
+        self.viewer.add_search_hits(page_num, rects)
+        self.hits.extend((page_num, i) for i in range(len(rects)))
+
+        item = QListWidgetItem(f"Page {page_num + 1}  ({len(rects)} hit{'s' if len(rects) != 1 else ''})")
+        item.setData(Qt.ItemDataRole.UserRole, page_num)
+        self.results_list.addItem(item)
+
+        if self.current < 0:
+            self.go_to_hit(0) # Jump to the first hit as soon as it arrives
+        self.update_count()
+
+    def on_search_finished(self, job):
+        if job is not self._job:
+            return
+        self._job = None
+        self.update_count()
+
+    def on_search_failed(self, job, error):
+        if job is self._job:
+            self._job = None
+            self.count_label.setText("Search failed")
+        print(f"[ERROR] Search failed: {error}")
+
+    def update_count(self):
+        if not self.hits:
+            self.count_label.setText("Searching..." if self._job else "No results")
+            return
+        suffix = "+" if self._job else ""
+        self.count_label.setText(f"{self.current + 1} / {len(self.hits)}{suffix}")
+
+    def step(self, delta: int):
+        if self.hits:
+            self.go_to_hit((self.current + delta) % len(self.hits))
+
+    def go_to_hit(self, hit_num: int):
+        self.current = hit_num
+        page_num, index = self.hits[hit_num]
+        self.viewer.set_current_hit(page_num, index)
+        self.update_count()
+
+    def on_result_activated(self, item):
+        page_num = item.data(Qt.ItemDataRole.UserRole)
+        for hit_num, (hit_page, _) in enumerate(self.hits):
+            if hit_page == page_num:
+                self.go_to_hit(hit_num)
+                return
@@ -0,0 +1,259 @@
+from PyQt6.QtGui import QPixmap, QColor, QIcon
+from PyQt6.QtWidgets import QDockWidget, QListView, QAbstractItemView
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QSize, QTimer, QPoint, QThread, QThreadPool
+from src.frontend.cache_pool import CachePool
+from src.frontend.library import DocumentLibrary, render_page_thumbnails, PAGE_THUMBNAIL_WIDTH
+from src.frontend.background_jobs import run_in_background
+from .base_module import BaseModule
+import os
+
+UNSAVED_MARK = " ●"
+
+class PageThumbnailModel(QAbstractListModel):
+    """
+    Pages of one viewer's document for a thumbnail list. Rows are just page
+    numbers; thumbnails are requested only for rows the view paints, rendered
+    at low DPI on a low-priority worker (disk cache first) and kept in the
+    shared CachePool. Scrolling cancels the render of rows no longer visible.
+    Thumbnails show the saved ink; a page's is rendered again once its
+    unsaved ink has been saved.
+    """
+    REQUEST_DELAY_MS = 40
+
+    def __init__(self, viewer, parent=None):
+        super().__init__(parent)
+        self.viewer = viewer
+        self.cache_pool = CachePool.shared()
+        self.cache_dir = os.path.join(DocumentLibrary.shared().thumbnails_dir, "pages")
+        self.visible_rows = lambda: range(0) # Set by the view's owner
+        self.doc = None
+        self.path = None
+        self.page_count = 0
+        self._unsaved = set()
+        self._job = None
+        self._generation = 0 # Bumped on document change; late results of older jobs are dropped
+        self._request_timer = QTimer(self)
+        self._request_timer.setSingleShot(True)
+        self._request_timer.setInterval(self.REQUEST_DELAY_MS)
+        self._request_timer.timeout.connect(self.render_visible)
+        self._placeholder = QIcon()
+        self.reset_document()
+
+        viewer.document_changed.connect(self.sync_document)
+        viewer.save_completed.connect(lambda _: self.sync_document())
+        viewer.page_dirtied.connect(self.on_page_dirtied)
+
+    def reset_document(self):
+        self.beginResetModel()
+        self.cancel_render()
+        self._generation += 1
+        self.cache_pool.discard_owner(self)
+        self.doc = self.viewer.get_document()
+        self.path = self.doc.name if self.doc and not self.viewer.is_new_file and self.doc.name else None
+        self.page_count = self.viewer.page_count()
+        self._unsaved = self.viewer.unsaved_pages()
+        if self.page_count:
+            width, height = self.viewer.page_size(0)
+            placeholder = QPixmap(PAGE_THUMBNAIL_WIDTH, int(PAGE_THUMBNAIL_WIDTH * height / width))
+            placeholder.fill(QColor("white"))
+            self._placeholder = QIcon(placeholder)
+        self.endResetModel()
+
+    def sync_document(self):
+        """Follows the viewer: a new document resets, added pages become new rows."""
+        doc = self.viewer.get_document()
+        path = doc.name if doc and not self.viewer.is_new_file and doc.name else None
+        if doc is None or self.doc is None or (doc is not self.doc and path != self.path):
+            self.reset_document()
+            return
+        self.doc = doc # Same file, reopened by a save
+        page_count = self.viewer.page_count()
+        if page_count > self.page_count:
+            self.beginInsertRows(QModelIndex(), self.page_count, page_count - 1)
+            self.page_count = page_count
+            self.endInsertRows()
+        self.refresh_markers()
+
+    def refresh_markers(self):
+        changed = self._unsaved ^ self.viewer.unsaved_pages()
+        saved = self._unsaved & changed
+        self._unsaved ^= changed
+        for row in changed:
+            if row < self.page_count:
+                roles = [Qt.ItemDataRole.DisplayRole]
+                if row in saved:
+                    # Its ink is in the file now: the thumbnail is rendered again
+                    self.cache_pool.discard(self, row)
+                    roles.append(Qt.ItemDataRole.DecorationRole)
+                index = self.index(row)
+                self.dataChanged.emit(index, index, roles)
+
+    def on_page_dirtied(self, page_num):
+        self.refresh_markers()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.page_count
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if role == Qt.ItemDataRole.DisplayRole:
+            return f"{row + 1}{UNSAVED_MARK if row in self._unsaved else ''}"
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return f"Page {row + 1}" + (" (unsaved ink)" if row in self._unsaved else "")
+        if role == Qt.ItemDataRole.DecorationRole:
+            icon = self.cache_pool.get(self, row)
+            if icon is None:
+                self._request_timer.start() # Collect the painted rows, then render them in one job
+                return self._placeholder
+            return icon
+        return None
+
+    def cancel_render(self):
+        if self._job is not None:
+            self._job.cancel()
+            self._job = None
+
+    def on_scrolled(self):
+        # The rows being rendered may not be visible anymore
+        self.cancel_render()
+        self._request_timer.start()
+
+    def render_visible(self):
+        if not self.path:
+            return
+        # New pages are not in the file until the next save; they keep the blank placeholder
+        file_pages = self.page_count - len(self.viewer.pending_new_pages)
+        pages = [row for row in self.visible_rows() if row < file_pages and self.cache_pool.get(self, row) is None]
+        if not pages:
+            return
+        self.cancel_render()
+        generation = self._generation
+        job = self._job = run_in_background(
+            render_page_thumbnails, self.path, pages, self.cache_dir,
+            on_partial=lambda result: self.on_thumbnail_ready(generation, result),
+            on_finished=lambda _: self.on_render_finished(job),
+            on_failed=lambda error: self.on_render_failed(job, error),
+            pool=thumbnail_pool(),
+            pass_job=True
+        )
+
+    def on_thumbnail_ready(self, generation, result):
+        if generation != self._generation:
+            return
+        page_num, image = result
+        if image.isNull() or page_num >= self.page_count:
+            return
+        self.cache_pool.put(self, page_num, QIcon(QPixmap.fromImage(image)), image.sizeInBytes())
+        index = self.index(page_num)
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole])
+
+    def on_render_finished(self, job):
+        if job is self._job:
+            self._job = None
+
+    def on_render_failed(self, job, error):
+        if job is self._job:
+            self._job = None
+        print(f"[Thumbnails] Rendering failed: {error}")
+
+    def release(self):
+        self.cancel_render()
+        self._generation += 1
+        self.cache_pool.discard_owner(self)
+
+_thumbnail_pool = None
+
+def thumbnail_pool():
+    """Single lowest-priority thread, separate from the text indexer so thumbnails never queue behind a whole book."""
+    global _thumbnail_pool
+    if _thumbnail_pool is None:
+        _thumbnail_pool = QThreadPool()
+        _thumbnail_pool.setMaxThreadCount(1)
+        _thumbnail_pool.setThreadPriority(QThread.Priority.LowestPriority)
+    return _thumbnail_pool
+
+class ThumbnailSidebarModule(BaseModule):
+    """Dockable list of page thumbnails of the active tab; click a page to go there."""
+    def __init__(self, main_window):
+        super().__init__(main_window)
+        self.models = {} # viewer -> PageThumbnailModel
+        self.viewer = None
+
+    @property
+    def priority(self):
+        return 12 # Next to navigation
+
+    def get_actions(self):
+        self.view = QListView()
+        self.view.setViewMode(QListView.ViewMode.IconMode)
+        self.view.setFlow(QListView.Flow.TopToBottom)
+        self.view.setWrapping(False)
+        self.view.setMovement(QListView.Movement.Static)
+        self.view.setUniformItemSizes(True) # Layout never asks 1000 rows for their size
+        self.view.setLayoutMode(QListView.LayoutMode.Batched)
+        self.view.setIconSize(QSize(PAGE_THUMBNAIL_WIDTH, int(PAGE_THUMBNAIL_WIDTH * 1.42)))
+        self.view.setGridSize(QSize(PAGE_THUMBNAIL_WIDTH + 20, int(PAGE_THUMBNAIL_WIDTH * 1.42) + 30))
+        self.view.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.view.clicked.connect(self.on_clicked)
+        self.view.verticalScrollBar().valueChanged.connect(self.on_scrolled)
+
+        self.dock = QDockWidget("Pages", self.main_window)
+        self.dock.setWidget(self.view)
+        self.dock.setMinimumWidth(PAGE_THUMBNAIL_WIDTH + 40)
+        self.main_window.addDockWidget(Qt.DockWidgetArea.LeftDockWidgetArea, self.dock)
+
+        toggle_action = self.dock.toggleViewAction()
+        toggle_action.setText("Pages")
+        toggle_action.setToolTip("Show page thumbnails")
+        return [toggle_action]
+
+    def on_viewer_added(self, viewer):
+        model = PageThumbnailModel(viewer, self.view)
+        model.visible_rows = self.visible_rows
+        self.models[viewer] = model
+
+    def on_viewer_removed(self, viewer):
+        model = self.models.pop(viewer, None)
+        if model is not None:
+            model.release()
+
+    def on_viewer_changed(self, old_viewer, new_viewer):
+        if old_viewer is not None:
+            old_viewer.page_changed.disconnect(self.on_page_changed)
+            if old_viewer in self.models:
+                self.models[old_viewer].cancel_render()
+        self.viewer = new_viewer
+        self.view.setModel(self.models[new_viewer])
+        new_viewer.page_changed.connect(self.on_page_changed)
+        self.on_page_changed(new_viewer.get_page())
+
+    def visible_rows(self):
+        model = self.view.model()
+        if model is None or not model.rowCount() or not self.dock.isVisible():
+            return range(0)
+        viewport = self.view.viewport().rect()
+        first = self.view.indexAt(QPoint(viewport.center().x(), viewport.top() + 1))
+        last = self.view.indexAt(QPoint(viewport.center().x(), viewport.bottom() - 1))
+        first_row = first.row() if first.isValid() else 0
+        last_row = last.row() if last.isValid() else model.rowCount() - 1
+        return range(first_row, last_row + 1)
+
+    def on_scrolled(self, value):
+        model = self.view.model()
+        if model is not None:
+            model.on_scrolled()
+
+    def on_page_changed(self, page_num):
+        model = self.view.model()
+        if model is None or page_num >= model.rowCount():
+            return
+        index = model.index(page_num)
+        self.view.setCurrentIndex(index)
+        self.view.scrollTo(index)
+
+    def on_clicked(self, index):
+        if self.viewer and self.viewer.doc and index.row() != self.viewer.get_page():
+            self.viewer.set_page(index.row())
@@ -49,10 +49,15 @@ class UndoRedoModule(BaseModule):
         btn_redo.clicked.connect(lambda: self.main_window.pdf_viewer.undo_manager.redo(1))
         btn_redo_5.clicked.connect(lambda: self.main_window.pdf_viewer.undo_manager.redo(5))
 
-        # Connect Signals for Updates
-        self.main_window.pdf_viewer.undo_manager.historyChanged.connect(self.update_ui)
-        
         return [container]
 
+    def on_viewer_changed(self, old_viewer, new_viewer):
+        # Each tab keeps its own history; show the active one
+        if old_viewer is not None:
+            old_viewer.undo_manager.historyChanged.disconnect(self.update_ui)
+        undo_manager = new_viewer.undo_manager
+        undo_manager.historyChanged.connect(self.update_ui)
+        self.update_ui(len(undo_manager.undo_stack), len(undo_manager.undo_stack) + len(undo_manager.redo_stack))
+
     def update_ui(self, current_index, total_count):
         self.label_counter.setText(f"{current_index} / {total_count}")
@@ -0,0 +1,90 @@
+import fitz  # PyMuPDF
+import numpy as np
+from PyQt6.QtCore import QRectF
+
+class PageTransform:
+    """
+    Maps between scene coordinates (pixels of the page as rendered by
+    PDFViewer) and the coordinate spaces of one PDF page.
+
+    - Scene: the rotated, CropBox-clipped page scaled by zoom_level.
+    - Page space: PyMuPDF's unrotated page coordinates (origin at the CropBox
+      top-left, y down). This is what add_ink_annot, Annot.vertices,
+      insert_image and search_for use.
+    - User space: raw PDF coordinates (y up, MediaBox origin), as stored in
+      the file.
+
+    All point conversions are a single NumPy affine operation over an (N, 2)
+    array, so a whole stroke is mapped at once.
+    """
+    def __init__(self, scene_to_page: fitz.Matrix, page_to_user: fitz.Matrix, zoom_level: float):
+        self.zoom_level = zoom_level
+        self.scene_to_page_matrix = fitz.Matrix(scene_to_page)
+        self.page_to_scene_matrix = ~self.scene_to_page_matrix
+        self.page_to_user_matrix = fitz.Matrix(page_to_user)
+        self._to_page = self._affine(self.scene_to_page_matrix)
+        # Inverted in float64: fitz inverts in single precision, off by ~1e-4 px at some zooms
+        self._to_scene = self._inverse(self._to_page)
+        self._to_user = self._affine(self.scene_to_page_matrix * self.page_to_user_matrix)
+
+    @classmethod
+    def for_page(cls, page, zoom_level: float) -> "PageTransform":
+        # Scene -> rotated page (undo zoom) -> unrotated page
+        scene_to_page = fitz.Matrix(1 / zoom_level, 1 / zoom_level) * page.derotation_matrix
+
+        # Unrotated page -> user space from the real boxes. PyMuPDF's
+        # transformation_matrix drops the CropBox offset on rotated pages.
+        cropbox, mediabox = page.cropbox, page.mediabox
+        page_to_user = fitz.Matrix(1, 0, 0, -1, cropbox.x0, mediabox.y1 - cropbox.y0)
+        return cls(scene_to_page, page_to_user, zoom_level)
+
+    @staticmethod
+    def _affine(matrix: fitz.Matrix):
+        # fitz maps (x, y) -> (a*x + c*y + e, b*x + d*y + f)
+        linear = np.array([[matrix.a, matrix.b], [matrix.c, matrix.d]], dtype=np.float64)
+        offset = np.array([matrix.e, matrix.f], dtype=np.float64)
+        return linear, offset
+
+    @staticmethod
+    def _inverse(affine):
+        linear, offset = affine
+        inverse = np.linalg.inv(linear)
+        return inverse, -offset @ inverse
+
+    @staticmethod
+    def _apply(affine, points) -> np.ndarray:
+        linear, offset = affine
+        array = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        return array @ linear + offset
+
+    def scene_to_pdf(self, points) -> np.ndarray:
+        """Scene points -> PyMuPDF page space, as an (N, 2) array."""
+        return self._apply(self._to_page, points)
+
+    def pdf_to_scene(self, points) -> np.ndarray:
+        """Exact inverse of scene_to_pdf (used when loading annotations)."""
+        return self._apply(self._to_scene, points)
+
+    def scene_to_user_space(self, points) -> np.ndarray:
+        """Scene points -> raw PDF user space (y up)."""
+        return self._apply(self._to_user, points)
+
+    def scene_rect_to_pdf(self, x: float, y: float, width: float, height: float) -> fitz.Rect:
+        """Scene rectangle -> page-space rectangle (normalized after derotation)."""
+        corners = self.scene_to_pdf([(x, y), (x + width, y + height)])
+        return fitz.Rect(corners[0].tolist(), corners[1].tolist()).normalize()
+
+    def pdf_rect_to_scene(self, rect) -> QRectF:
+        corners = self.pdf_to_scene([(rect[0], rect[1]), (rect[2], rect[3])])
+        x0, x1 = sorted((corners[0][0], corners[1][0]))
+        y0, y1 = sorted((corners[0][1], corners[1][1]))
+        return QRectF(x0, y0, x1 - x0, y1 - y0)
+
+    def image_rect(self, page, x: float, y: float, width: float, height: float) -> fitz.Rect:
+        """
+        Rectangle to pass to page.insert_image so the image lands on the given
+        scene rectangle. insert_image converts with page.transformation_matrix,
+        so its CropBox error on rotated pages is compensated here.
+        """
+        rect = self.scene_rect_to_pdf(x, y, width, height)
+        return rect * self.page_to_user_matrix * page.transformation_matrix
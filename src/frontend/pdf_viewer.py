@@ -1,20 +1,51 @@
-import fitz  # PyMuPDF
-from PyQt6.QtWidgets import QGraphicsView, QGraphicsScene, QPinchGesture, QSwipeGesture, QScroller, QScrollerProperties
-from PyQt6.QtGui import QPixmap, QImage, QInputDevice, QPointingDevice, QColor
-from PyQt6.QtCore import Qt, QEvent, pyqtSignal
+from src.frontend.startup_profiler import startup_profiler
+from src.frontend.tracing import tracer, traced
+with startup_profiler.phase("import fitz", "import"):
+    import fitz  # PyMuPDF
+from PyQt6.QtWidgets import QGraphicsView, QGraphicsScene, QGraphicsRectItem, QPinchGesture, QSwipeGesture, QScroller, QScrollerProperties
+from PyQt6.QtGui import QPixmap, QImage, QInputDevice, QPointingDevice, QColor, QPainter
+from PyQt6.QtCore import Qt, QEvent, QPointF, QRectF, pyqtSignal
 from src.frontend.gestures.base_gesture import BaseGesture
 from src.frontend.config_manager import ConfigManager
 from src.frontend.loader_utils import load_classes_from_path
+from src.frontend.plugin_manifest import PluginManifest, LazyGesture
 from src.frontend.ink_canvas import InkCanvas
+from src.frontend.ink_latency import InkLatencyTracker
 from src.frontend.gestures.gesture_manager import GestureManager
-from src.frontend.undo_manager import UndoManager, AddStrokeCommand, RemoveStrokeCommand, AddImageCommand, MoveItemsCommand
+from src.frontend.undo_manager import UndoManager, AddStrokeCommand, RemoveStrokeCommand, AddImageCommand, MoveItemsCommand, CompoundCommand
+from src.frontend.ink_journal import InkJournal
+from src.frontend.background_jobs import run_in_background, io_pool, fitz_lock, fitz_locked
+from src.frontend.file_utils import replace_file, file_signature
+from src.frontend.annotation_writer import take_snapshot, write_snapshot, compact_pdf, repair_pdf, load_ink_strokes
+from src.frontend.page_transform import PageTransform
+from src.frontend.cache_pool import CachePool
+from src.frontend.text_index import TextIndex, index_pool
 from PyQt6.QtGui import QKeySequence, QShortcut
 import os
+import time
 from datetime import datetime
 
 class PDFViewer(QGraphicsView):
     document_changed = pyqtSignal()
     page_changed = pyqtSignal(int)
+    save_started = pyqtSignal()
+    save_progress = pyqtSignal(int, int) # pages written, pages to write
+    save_completed = pyqtSignal(dict) # {"strategy", "duration_ms", "path"}
+    repair_started = pyqtSignal()
+    repair_progress = pyqtSignal(int, int) # steps done, total steps
+    repair_finished = pyqtSignal(bool) # True if a repaired copy is waiting for the next save
+    index_progress = pyqtSignal(int, int) # pages in the text index, page count
+    page_dirtied = pyqtSignal(int) # A page got unsaved changes
+
+    # Background compaction runs after this many incremental saves,
+    # or once the file has grown by this factor (and at least MIN_GROWTH bytes)
+    # since it was last compacted
+    COMPACT_AFTER_SAVES = 10
+    COMPACT_GROWTH_FACTOR = 1.5
+    COMPACT_MIN_GROWTH = 1 << 20
+
+    # Cost charged to the shared CachePool for a page's cached ink
+    INK_POINT_BYTES = 100 # Rough footprint of one cached stroke point (tuple of two floats)
 
     def __init__(self):
         super().__init__()
@@ -24,31 +55,85 @@ class PDFViewer(QGraphicsView):
         self.current_page_num = 0
         self.is_new_file = False
         self.page_data_cache = {} # Cache for strokes and images: {page_num: {"strokes": [], "images": []}}
+        self.dirty_pages = {} # page_num -> ids of strokes/images changed since the last save
+        self._transforms = {} # (page_num, zoom_level) -> PageTransform
+        self._page_count = 0 # Of self.doc, kept here so GUI code never waits on fitz_lock for it
+        self._page_sizes = {} # page_num -> (width, height) in points
+        self.cache_pool = CachePool.shared() # Rasters and clean ink, budgeted across all open documents
+        self._background_item = None
+        self.search_hits = {} # page_num -> hit rects (page space) of the active search
+        self._current_hit = None # (page_num, index) of the selected hit
+        self._hit_items = [] # Overlay items of the hits on the current page
         
         # Optimization: Render at a reasonable scale
         self.zoom_level = 2.0  # 2.0 = 144 DPI (High Quality)
         
+        # Save Mode: merge a page's strokes into one ink annotation per pen style
+        self.batch_ink_annotations = True
+        
+        # Pen-to-paint latency, measured while a module turns it on
+        self.ink_latency = InkLatencyTracker.shared()
+        
         # Enable Gestures via Manager
         self.gesture_manager = GestureManager(self)
         
         # Undo Manager
-        self.undo_manager = UndoManager(self)
+        self.undo_manager = UndoManager(self, scene=self.scene)
         self.connect_undo_signals()
         
+        # Write-ahead journal of unsaved ink (crash recovery)
+        self.journal = None
+        
+        # Save Strategy State
+        self._incremental_saves = 0
+        self._compacted_size = 0
+        self._compaction_job = None
+        self._compaction_result = None # Finished compaction waiting for the save worker to go idle
+        self._repair_job = None
+        self._repair_result = None # Repaired copy swapped in by the next save
+        self._index_job = None
+        self.content_hash = None # Key of the document in the text index, once indexed
+        self._save_job = None
+        self._save_snapshot = None
+        self._save_checkpoint = None
+        self._save_dirty = {} # dirty_pages captured by the running save, restored if it fails
+        self._save_requested = False
+        self._moved_during_save = set() # Stroke ids whose snapshot position is already out of date
+        self.pending_new_pages = [] # (width, height) of pages not yet written to the file
+        
         self.config_manager = ConfigManager()
+        self.scene.predictor.horizon_ms = self.config_manager.get_setting("ink_prediction_ms", 0)
         
         gestures_dict = self.config_manager.get_gestures()
+        manifest = PluginManifest.shared()
         for file_path, enabled in gestures_dict.items():
             if not enabled:
                 continue
                 
-            gesture_classes = load_classes_from_path(file_path, BaseGesture)
-            for gesture_class in gesture_classes:
-                try:
-                    self.gesture_manager.register_gesture(gesture_class())
-                except Exception as e:
-                    print(f"Failed to register gesture from {file_path}: {e}")
+            with startup_profiler.phase(f"gesture {file_path}", "plugin", once=True):
+                # Gestures with declared event types are imported by their first event
+                entries = manifest.entries(file_path, "BaseGesture")
+                if entries and all(entry["lazy"] for entry in entries):
+                    gestures = [LazyGesture(file_path, entry) for entry in entries]
+                else:
+                    gestures = [gesture_class() for gesture_class in load_classes_from_path(file_path, BaseGesture)]
+                for gesture in gestures:
+                    try:
+                        self.gesture_manager.register_gesture(gesture)
+                    except Exception as e:
+                        print(f"Failed to register gesture from {file_path}: {e}")
+        manifest.save()
+        self.gesture_manager.freeze()
+        
+        with startup_profiler.phase("QScroller setup", once=True):
+            self._setup_scroller()
         
+        # UI Polish
+        self.setDragMode(QGraphicsView.DragMode.NoDrag)  # Disable built-in drag to allow pen drawing
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+
+    def _setup_scroller(self) -> None:
         # Enable Kinetic Scrolling (Touch to Pan)
         QScroller.grabGesture(self.viewport(), QScroller.ScrollerGestureType.TouchGesture)
         scroller = QScroller.scroller(self.viewport())
@@ -60,43 +145,155 @@ class PDFViewer(QGraphicsView):
         props.setScrollMetric(QScrollerProperties.ScrollMetric.OvershootScrollDistanceFactor, 0.5)
         props.setScrollMetric(QScrollerProperties.ScrollMetric.SnapTime, 0.5)
         scroller.setScrollerProperties(props)
-        
-        # UI Polish
-        self.setDragMode(QGraphicsView.DragMode.NoDrag)  # Disable built-in drag to allow pen drawing
-        self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        
 
-    def set_document(self, doc, is_new_file: bool = False) -> None:
+    def set_document(self, doc, is_new_file: bool = False, start_page: int = 0) -> None:
+        self.flush_saves()
+        self.close_journal()
+        self.discard_repair()
+        self.cancel_indexing()
         self.doc = doc
         self.is_new_file = is_new_file
-        self.current_page_num = 0
+        # Resume where the document was left (first page if it shrank since)
+        with fitz_lock:
+            self._page_count = doc.page_count if doc else 0
+        self.current_page_num = start_page if 0 <= start_page < self._page_count else 0
         self.page_data_cache = {} # Reset cache on new document
-        self.render_page()
+        self.dirty_pages = {}
+        self._transforms = {}
+        self._page_sizes = {}
+        self.search_hits = {}
+        self._current_hit = None
+        self.cache_pool.discard_owner(self)
+        self._incremental_saves = 0
+        self._compaction_result = None
+        self.pending_new_pages = []
+        self._compacted_size = os.path.getsize(doc.name) if doc and doc.name and os.path.exists(doc.name) else 0
+        self.open_journal()
         self.render_page()
         self.document_changed.emit()
+        self.schedule_indexing()
 
     def connect_undo_signals(self):
         self.scene.strokeCreated.connect(self.on_stroke_created)
-        self.scene.strokeErased.connect(self.on_stroke_erased)
+        self.scene.strokesErased.connect(self.on_strokes_erased)
         self.scene.itemsMoved.connect(self.on_items_moved)
         self.scene.imageAdded.connect(self.on_image_added)
+        self.undo_manager.commandApplied.connect(self.on_command_applied)
+
+    def open_journal(self) -> None:
+        """Replays any unsaved ink left by a crash into page_data_cache and starts journaling."""
+        if not self.doc or self.is_new_file or not self.doc.name:
+            return # In-memory notes have no file to key the journal on until first save
+            
+        try:
+            recovered = InkJournal.replay(self.doc.name, load_page=self._load_page_data)
+            self.journal = InkJournal(self.doc.name)
+        except Exception as e:
+            print(f"[ERROR] Failed to open ink journal: {e}")
+            self.journal = None
+            return
+            
+        if recovered:
+            print(f"[Journal] Recovered unsaved ink on {len(recovered)} page(s).")
+            # Pages added after the last save only existed in memory
+            last_page = max(recovered)
+            while self._page_count <= last_page:
+                width, height = self.page_size(self._page_count - 1) if self._page_count else (595, 842)
+                self._append_page(width, height)
+                self.pending_new_pages.append((width, height))
+            self.page_data_cache = recovered
+            self.dirty_pages = {page_num: set() for page_num in recovered}
+        else:
+            # Start from a clean journal stamped with the current file state
+            self.journal.truncate()
+
+    def close_journal(self) -> None:
+        if self.journal:
+            self.journal.close()
+            self.journal = None
 
     def on_stroke_created(self, data):
+        tracer.count("strokes committed")
         cmd = AddStrokeCommand(self.scene, data)
         self.undo_manager.push(cmd)
+        self.mark_dirty([data.get("id")])
+        if self.journal:
+            self.journal.record_stroke(self.current_page_num, data)
 
-    def on_stroke_erased(self, data):
-        cmd = RemoveStrokeCommand(self.scene, data)
-        self.undo_manager.push(cmd)
+    def on_strokes_erased(self, data_list):
+        tracer.count("strokes erased", len(data_list))
+        # One eraser sweep -> one undo step
+        with self.undo_manager.transaction("Erase"):
+            for data in data_list:
+                self.undo_manager.push(RemoveStrokeCommand(self.scene, data))
+        self.mark_dirty([data.get("id") for data in data_list])
+        if self.journal:
+            self.journal.record_erase(self.current_page_num, [data.get("id") for data in data_list])
 
     def on_items_moved(self, data):
         cmd = MoveItemsCommand(self.scene, data)
         self.undo_manager.push(cmd)
+        self._mark_moved([d["id"] for d in data])
+        if self.journal:
+            self.journal.record_move(self.current_page_num, data)
 
     def on_image_added(self, data):
         cmd = AddImageCommand(self.scene, data)
         self.undo_manager.push(cmd)
+        self.mark_dirty([data.get("id")])
+        if self.journal:
+            self.journal.record_image(self.current_page_num, data)
+
+    def on_command_applied(self, command, undone):
+        self.mark_dirty(self._command_ids(command))
+        if isinstance(command, MoveItemsCommand):
+            self._mark_moved([d["id"] for d in command.move_data_list])
+        elif isinstance(command, CompoundCommand):
+            self._mark_moved([
+                d["id"] for sub_command in command.commands
+                if isinstance(sub_command, MoveItemsCommand) for d in sub_command.move_data_list
+            ])
+        # Undo/redo changes the ink too, so the journal must follow it
+        if self.journal:
+            self.journal.record_command(self.current_page_num, command, undone)
+    
+    @staticmethod
+    def _command_ids(command) -> list:
+        if isinstance(command, CompoundCommand):
+            return [uid for sub_command in command.commands for uid in PDFViewer._command_ids(sub_command)]
+        if isinstance(command, MoveItemsCommand):
+            return [d["id"] for d in command.move_data_list]
+        if isinstance(command, (AddStrokeCommand, RemoveStrokeCommand)):
+            return [command.stroke_id]
+        if isinstance(command, AddImageCommand):
+            return [command.image_id]
+        return []
+
+    def mark_dirty(self, ids: list, page_num: int = None) -> None:
+        """Records that items on a page (default: the current one) changed since the last save."""
+        if page_num is None:
+            page_num = self.current_page_num
+        newly_dirty = page_num not in self.dirty_pages
+        self.dirty_pages.setdefault(page_num, set()).update(uid for uid in ids if uid)
+        if newly_dirty:
+            self.page_dirtied.emit(page_num)
+
+    def unsaved_pages(self) -> set:
+        """Pages whose changes are not in the file yet (including new pages and pages being saved)."""
+        pages = set(self.dirty_pages) | set(self._save_dirty)
+        if self.doc and self.pending_new_pages:
+            pages.update(range(self._page_count - len(self.pending_new_pages), self._page_count))
+        return pages
+
+    def has_unsaved_changes(self) -> bool:
+        return bool(self.dirty_pages or self.pending_new_pages or self._save_requested)
+
+    def _mark_moved(self, ids: list) -> None:
+        self.mark_dirty(ids)
+        # The file has these strokes at their old position
+        self.scene.mark_strokes_as_unsaved(ids)
+        if self._save_job is not None:
+            self._moved_during_save.update(ids)
     
     def keyPressEvent(self, event):
         if event.modifiers() & Qt.KeyboardModifier.ControlModifier:
@@ -111,23 +308,126 @@ class PDFViewer(QGraphicsView):
     def get_document(self):
         return self.doc
 
+    def page_count(self) -> int:
+        return self._page_count if self.doc else 0
+
+    @fitz_locked
+    def needs_repair(self) -> bool:
+        """True if the file cannot take incremental saves (damaged, or "repaired" by MuPDF on open)."""
+        return self.doc is not None and not self.doc.can_save_incrementally()
+
+    def page_size(self, page_num: int = None) -> tuple:
+        """(width, height) in points of a page (the current one by default)."""
+        if page_num is None:
+            page_num = self.current_page_num
+        size = self._page_sizes.get(page_num)
+        if size is None:
+            with fitz_lock:
+                rect = self.doc.load_page(page_num).rect
+            size = self._page_sizes[page_num] = (rect.width, rect.height)
+        return size
+
+    def _append_page(self, width: float, height: float) -> None:
+        """Adds a blank page to the open document (in memory only)."""
+        with fitz_lock:
+            self.doc.new_page(width=width, height=height)
+        self._page_sizes[self._page_count] = (width, height)
+        self._page_count += 1
+
     def set_page(self, page_num: int) -> None:
-        # Save current page data to cache
-        if self.doc:
-            strokes = self.scene.get_strokes()
-            images = self.scene.get_images()
-            print(f"[DEBUG] Saving cache for page {self.current_page_num}: {len(strokes)} strokes, {len(images)} images")
-            self.page_data_cache[self.current_page_num] = {
-                "strokes": strokes,
-                "images": images
-            }
+        # Save current page data to cache (an untouched page already matches it)
+        if self.doc and self.current_page_num in self.dirty_pages:
+            self._cache_current_page()
             
-        self.current_page_num = page_num
         self.current_page_num = page_num
         self.render_page()
         self.undo_manager.clear() # Clear undo history on page change
         self.page_changed.emit(page_num)
 
+    def _cache_current_page(self) -> None:
+        strokes = self.scene.get_strokes()
+        images = self.scene.get_images()
+        tracer.instant("cache page", "cache", page=self.current_page_num, strokes=len(strokes), images=len(images))
+        data = self.page_data_cache.setdefault(self.current_page_num, {})
+        data["strokes"] = strokes
+        data["images"] = images
+        self._pool_page_data(self.current_page_num)
+
+    @fitz_locked
+    def _load_page_data(self, page_num: int) -> dict:
+        """
+        Cache entry for a page seen for the first time: the ink already in the
+        file, as editable saved strokes. "pdf_ids" lists the strokes the file
+        holds, so a save can tell when saved strokes were erased or moved.
+        """
+        try:
+            strokes = load_ink_strokes(self.doc, page_num, self.zoom_level)
+        except Exception as e:
+            print(f"[ERROR] Failed to load ink of page {page_num}: {e}")
+            strokes = []
+        return {"strokes": strokes, "images": [], "pdf_ids": [s["id"] for s in strokes]}
+
+    # Search highlights: overlay items above the ink, so stepping through hits never re-renders
+    HIT_COLOR = QColor(255, 220, 0, 90)
+    CURRENT_HIT_COLOR = QColor(255, 120, 0, 140)
+
+    def add_search_hits(self, page_num: int, rects) -> None:
+        self.search_hits[page_num] = list(rects)
+        if page_num == self.current_page_num:
+            self._draw_search_hits()
+
+    def clear_search_hits(self) -> None:
+        self.search_hits = {}
+        self._current_hit = None
+        self._draw_search_hits()
+
+    def set_current_hit(self, page_num: int, index: int) -> None:
+        """Selects a hit, turning to its page if needed."""
+        self._current_hit = (page_num, index)
+        if page_num != self.current_page_num:
+            self.set_page(page_num) # Redraws the hits
+        else:
+            for i, item in enumerate(self._hit_items):
+                item.setBrush(self.CURRENT_HIT_COLOR if i == index else self.HIT_COLOR)
+        if 0 <= index < len(self._hit_items):
+            self.ensureVisible(self._hit_items[index], 50, 50)
+
+    def _draw_search_hits(self) -> None:
+        for item in self._hit_items:
+            if item.scene() is self.scene:
+                self.scene.removeItem(item)
+        self._hit_items = []
+        rects = self.search_hits.get(self.current_page_num)
+        if not rects or not self.doc:
+            return
+        transform = self.page_transform()
+        for i, rect in enumerate(rects):
+            item = QGraphicsRectItem(transform.pdf_rect_to_scene(rect))
+            item.setPen(QColor(0, 0, 0, 0))
+            item.setBrush(self.CURRENT_HIT_COLOR if self._current_hit == (self.current_page_num, i) else self.HIT_COLOR)
+            item.setZValue(1000)
+            item.setAcceptedMouseButtons(Qt.MouseButton.NoButton)
+            item.setData(Qt.ItemDataRole.UserRole, "search_hit")
+            self.scene.addItem(item)
+            self._hit_items.append(item)
+
+    def _pool_page_data(self, page_num: int) -> None:
+        """Accounts a page's cached ink in the shared pool, which may drop it once it is clean."""
+        data = self.page_data_cache.get(page_num, {})
+        points = sum(len(s.get("points", ())) for s in data.get("strokes", ()))
+        cost = points * self.INK_POINT_BYTES + 1024
+        self.cache_pool.put(self, ("ink", page_num), None, cost, evict=lambda: self._release_page_data(page_num))
+
+    def _release_page_data(self, page_num: int) -> bool:
+        """Pool eviction: forgets a page's ink if the file holds all of it (it is reloaded on the next visit)."""
+        if page_num == self.current_page_num or page_num in self.dirty_pages or page_num in self._save_dirty:
+            return False
+        data = self.page_data_cache.get(page_num)
+        if data and (data.get("images") or any(not s.get("saved", False) for s in data.get("strokes", ()))):
+            return False
+        self.page_data_cache.pop(page_num, None)
+        return True
+
     def get_page(self) -> int:
         return self.current_page_num
 
@@ -139,23 +439,19 @@ class PDFViewer(QGraphicsView):
             return
             
         # Save current page data to cache
-        strokes = self.scene.get_strokes()
-        images = self.scene.get_images()
-        print(f"[DEBUG] Saving cache for page {self.current_page_num} (before new page): {len(strokes)} strokes, {len(images)} images")
-        self.page_data_cache[self.current_page_num] = {
-            "strokes": strokes,
-            "images": images
-        }
+        if self.current_page_num in self.dirty_pages:
+            self._cache_current_page()
             
         # Get dimensions of the last page to match
         width, height = 595, 842 # Default A4
-        if self.doc.page_count > 0:
-            last_page = self.doc.load_page(self.doc.page_count - 1)
-            rect = last_page.rect
-            width, height = rect.width, rect.height
+        if self._page_count > 0:
+            width, height = self.page_size(self._page_count - 1)
             
-        self.doc.new_page(width=width, height=height)
-        self.current_page_num = self.doc.page_count - 1
+        self._append_page(width, height)
+        if not self.is_new_file:
+            self.pending_new_pages.append((width, height)) # Written by the next save
+        self.current_page_num = self._page_count - 1
+        self.mark_dirty([])
         self.render_page()
         self.page_changed.emit(self.current_page_num)
         self.document_changed.emit() # Page count changed, so doc changed too
@@ -163,39 +459,110 @@ class PDFViewer(QGraphicsView):
     def render_page(self) -> None:
         if not self.doc:
             return
+        with startup_profiler.phase("first render_page", "render", once=True), \
+                tracer.span("render_page", "render", page=self.current_page_num):
+            self._render_page()
 
-        try:
-            page = self.doc.load_page(self.current_page_num)
-        except Exception as e:
-            print(f"Error loading page {self.current_page_num}: {e}")
+    def _render_page(self) -> None:
+        pixmap = self._page_raster(self.current_page_num)
+        if pixmap is None:
             return
         
-        # Render page to image
-        mat = fitz.Matrix(self.zoom_level, self.zoom_level)
-        pix = page.get_pixmap(matrix=mat)
-        
-        # Convert to QImage
-        img_format = QImage.Format.Format_RGB888
-        img = QImage(pix.samples, pix.width, pix.height, pix.stride, img_format)
-        
-        # Convert to QPixmap and add to scene
-        pixmap = QPixmap.fromImage(img)
-        
         self.scene.clear()
+        self._hit_items = [] # Deleted with the scene's items
         bg_item = self.scene.addPixmap(pixmap)
         bg_item.setData(Qt.ItemDataRole.UserRole, "background")
-        self.setSceneRect(0, 0, pix.width, pix.height)
+        self._background_item = bg_item
+        self.setSceneRect(0, 0, pixmap.width(), pixmap.height())
         
-        # Restore strokes and images from cache if available
-        if self.current_page_num in self.page_data_cache:
-            data = self.page_data_cache[self.current_page_num]
-            strokes = data.get("strokes", [])
-            images = data.get("images", [])
-            print(f"[DEBUG] Restoring cache for page {self.current_page_num}: {len(strokes)} strokes, {len(images)} images")
+        # Restore strokes and images from cache, reading the file's ink on first visit
+        if self.current_page_num not in self.page_data_cache:
+            tracer.count("page data cache miss")
+            self.page_data_cache[self.current_page_num] = self._load_page_data(self.current_page_num)
+            self._pool_page_data(self.current_page_num)
+        else:
+            tracer.count("page data cache hit")
+        data = self.page_data_cache[self.current_page_num]
+        strokes = data.get("strokes", [])
+        images = data.get("images", [])
+        with tracer.span("load ink", "render", strokes=len(strokes), images=len(images)):
             self.scene.load_strokes(strokes)
             self.scene.load_images(images)
+        self._draw_search_hits()
+
+    def _page_raster(self, page_num: int) -> QPixmap:
+        """The page's raster at the current zoom; the page is only loaded on a cache miss (None if it fails to load)."""
+        key = ("raster", page_num, self.zoom_level)
+        pixmap = self.cache_pool.get(self, key)
+        if pixmap is None:
+            tracer.count("raster cache miss")
+            with fitz_lock:
+                try:
+                    page = self.doc.load_page(page_num)
+                except Exception as e:
+                    print(f"Error loading page {page_num}: {e}")
+                    return None
+                with tracer.span("rasterize", "render", page=page_num, zoom=self.zoom_level):
+                    pixmap = self._render_pixmap(page)
+            cost = pixmap.width() * pixmap.height() * max(pixmap.depth() // 8, 1)
+            self.cache_pool.put(self, key, pixmap, cost)
         else:
-            print(f"[DEBUG] No cache found for page {self.current_page_num}")
+            tracer.count("raster cache hit")
+        return pixmap
+
+    def invalidate_raster(self, page_num: int) -> None:
+        """Drops the cached raster of a page whose content changed."""
+        self.cache_pool.discard(self, ("raster", page_num, self.zoom_level))
+
+    def _render_pixmap(self, page) -> QPixmap:
+        # Render page to image. Ink annotations are drawn by the ink layer
+        mat = fitz.Matrix(self.zoom_level, self.zoom_level)
+        pix = page.get_pixmap(matrix=mat, annots=False)
+        
+        # Convert to QImage
+        img_format = QImage.Format.Format_RGB888
+        img = QImage(pix.samples, pix.width, pix.height, pix.stride, img_format)
+        
+        # Other annotations (highlights, notes...) are still part of the page
+        others = [annot for annot in page.annots() if annot.type[0] != fitz.PDF_ANNOT_INK]
+        if others:
+            img = img.copy()
+            transform = self.page_transform(page.number)
+            painter = QPainter(img)
+            for annot in others:
+                annot_pix = annot.get_pixmap(matrix=mat, alpha=True)
+                annot_img = QImage(annot_pix.samples, annot_pix.width, annot_pix.height, annot_pix.stride, QImage.Format.Format_RGBA8888)
+                painter.drawImage(transform.pdf_rect_to_scene(annot.rect), annot_img)
+            painter.end()
+        
+        # Convert to QPixmap
+        return QPixmap.fromImage(img)
+
+    def page_transform(self, page_num: int = None) -> PageTransform:
+        """Scene <-> PDF mapping of a page at the current zoom (cached per page)."""
+        if page_num is None:
+            page_num = self.current_page_num
+        key = (page_num, self.zoom_level)
+        transform = self._transforms.get(key)
+        if transform is None:
+            with fitz_lock:
+                transform = PageTransform.for_page(self.doc.load_page(page_num), self.zoom_level)
+            self._transforms[key] = transform
+        return transform
+
+    def refresh_background(self) -> None:
+        """Re-renders only the page raster, leaving the ink items untouched."""
+        if not self.doc:
+            return
+        self.invalidate_raster(self.current_page_num)
+        pixmap = self._page_raster(self.current_page_num)
+        if pixmap is not None and self._background_item is not None:
+            self._background_item.setPixmap(pixmap)
+
+    def paintEvent(self, event) -> None:
+        super().paintEvent(event)
+        if self.ink_latency.enabled:
+            self.ink_latency.on_painted() # This paint shows the samples flushed since the last one
 
     def event(self, event: QEvent) -> bool:
         if event.type() == QEvent.Type.Gesture:
@@ -203,185 +570,415 @@ class PDFViewer(QGraphicsView):
         return super().event(event)
 
     def viewportEvent(self, event: QEvent) -> bool:
+        # The one delivery path of viewport input (mouse, tablet) to the gestures;
+        # the mouse*Event handlers below it are not given the events again
         if self.gesture_manager.dispatch_event(event):
+            if not startup_profiler.done and event.type() == QEvent.Type.TabletPress:
+                startup_profiler.mark("first pen event")
             return True
         return super().viewportEvent(event)
 
-    def mousePressEvent(self, event: QEvent) -> None:
-        if self.gesture_manager.dispatch_event(event):
+    def _needs_compaction(self) -> bool:
+        if self._compaction_job is not None:
+            return False
+        if self._incremental_saves >= self.COMPACT_AFTER_SAVES:
+            return True
+        try:
+            size = os.path.getsize(self.doc.name)
+        except OSError:
+            return False
+        if not self._compacted_size or size - self._compacted_size < self.COMPACT_MIN_GROWTH:
+            return False
+        return size > self._compacted_size * self.COMPACT_GROWTH_FACTOR
+
+    def schedule_compaction(self) -> None:
+        """
+        Rewrites the file with garbage collection on a background worker.
+        The result is swapped in only if the file was not saved again meanwhile.
+        """
+        if not self.doc or self.is_new_file or self._compaction_job is not None:
             return
-        super().mousePressEvent(event)
+        path = self.doc.name
+        print(f"[Save] Scheduling background compaction of {path}")
+        self._compaction_job = run_in_background(
+            compact_pdf, path,
+            on_finished=self.on_compaction_finished,
+            on_failed=self.on_compaction_failed,
+            pool=io_pool()
+        )
 
-    def mouseMoveEvent(self, event: QEvent) -> None:
-        if self.gesture_manager.dispatch_event(event):
+    def on_compaction_finished(self, result) -> None:
+        self._compaction_job = None
+        if self._save_job is not None:
+            # A save worker may be reading the file; decide once it is done
+            self._compaction_result = result
             return
-        super().mouseMoveEvent(event)
+        self._apply_compaction(result)
 
-    def mouseReleaseEvent(self, event: QEvent) -> None:
-        if self.gesture_manager.dispatch_event(event):
+    @fitz_locked
+    def _apply_compaction(self, result) -> None:
+        temp_path, source_path, source_signature, duration_ms = result
+        
+        # The user may have saved (or switched documents) while we were compacting
+        if not self.doc or self.doc.name != source_path or file_signature(source_path) != source_signature:
+            print("[Save] Document changed during compaction, discarding result.")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+
+        if not self._swap_in_file(temp_path, source_path):
+            return
+        
+        self._incremental_saves = 0
+        self._compacted_size = os.path.getsize(source_path)
+        # Unsaved ink is still valid against the compacted file
+        if self.journal:
+            self.journal.restamp()
+            
+        report = {"strategy": "compaction", "duration_ms": duration_ms, "path": source_path}
+        print(f"[Save] Background compaction took {duration_ms:.1f} ms")
+        self.save_completed.emit(report)
+
+    def on_compaction_failed(self, error: str) -> None:
+        self._compaction_job = None
+        print(f"[ERROR] Background compaction failed: {error}")
+
+    @fitz_locked
+    def _swap_in_file(self, temp_path: str, target_path: str) -> bool:
+        """Replaces the open document's file and reopens our handle on it."""
+        ok = True
+        try:
+            # Windows cannot replace a file that is open, so swap handles around it
+            self.doc.close()
+            replace_file(temp_path, target_path)
+        except Exception as e:
+            print(f"[ERROR] Failed to swap in {temp_path}: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            ok = False
+        self._reopen_document(target_path)
+        return ok
+
+    @fitz_locked
+    def _reopen_document(self, path: str) -> None:
+        """
+        Opens a fresh handle after the file was written by a worker.
+        Pages added since the snapshot only exist in memory, so they are re-created.
+        """
+        if not self.doc.is_closed:
+            self.doc.close()
+        self.doc = fitz.open(path)
+        self._page_count = self.doc.page_count
+        for width, height in self.pending_new_pages:
+            self._append_page(width, height)
+
+    def schedule_repair(self) -> None:
+        """
+        Normalizes a document that cannot be saved incrementally on a
+        background worker. The copy replaces the file at the next save, so
+        opening never waits on it and an unsaved session leaves the file alone.
+        """
+        if not self.doc or self.is_new_file or self._repair_job is not None:
+            return
+        print(f"[OpenPDF] Repairing {self.doc.name} in the background")
+        self.repair_started.emit()
+        self._repair_job = run_in_background(
+            repair_pdf, self.doc.name,
+            on_finished=self.on_repair_finished,
+            on_failed=self.on_repair_failed,
+            on_progress=self.on_repair_progress,
+            pass_job=True
+        )
+
+    def is_repairing(self) -> bool:
+        return self._repair_job is not None
+
+    def on_repair_progress(self, done: int, total: int) -> None:
+        self.repair_progress.emit(done, total)
+
+    def on_repair_finished(self, result) -> None:
+        self._repair_job = None
+        if result is None:
+            return # Cancelled
+        temp_path, source_path, source_signature, duration_ms = result
+        if not self.doc or self.doc.name != source_path or file_signature(source_path) != source_signature:
+            # Switched documents, or a full save already rewrote the file
+            print("[OpenPDF] Document changed during repair, discarding result.")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            self.repair_finished.emit(False)
             return
-        super().mouseReleaseEvent(event)
+        print(f"[OpenPDF] Repaired copy ready after {duration_ms:.1f} ms; it replaces the file at the next save.")
+        self._repair_result = result
+        self.repair_finished.emit(True)
+
+    def on_repair_failed(self, error: str) -> None:
+        self._repair_job = None
+        print(f"[ERROR] Background repair failed: {error}")
+        self.repair_finished.emit(False)
+
+    @fitz_locked
+    def _apply_repair(self) -> None:
+        temp_path, source_path, source_signature, _ = self._repair_result
+        self._repair_result = None
+        if self.doc.name != source_path or file_signature(source_path) != source_signature:
+            print("[OpenPDF] Document changed since repair, discarding result.")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+        if not self._swap_in_file(temp_path, source_path):
+            return
+        self._compacted_size = os.path.getsize(source_path)
+        # Unsaved ink is still valid against the repaired file
+        if self.journal:
+            self.journal.restamp()
+
+    def discard_repair(self) -> None:
+        """Drops a pending or finished repair (document closed without saving)."""
+        if self._repair_job is not None:
+            job, self._repair_job = self._repair_job, None
+            job.cancel()
+            # If it is already running, clean up its copy when it returns
+            job.signals.finished.disconnect(self.on_repair_finished)
+            job.signals.failed.disconnect(self.on_repair_failed)
+            job.signals.progress.disconnect(self.on_repair_progress)
+            job.signals.finished.connect(self._delete_repair_copy)
+            self.repair_finished.emit(False)
+        if self._repair_result is not None:
+            self._delete_repair_copy(self._repair_result)
+            self._repair_result = None
+
+    @staticmethod
+    def _delete_repair_copy(result) -> None:
+        if result and os.path.exists(result[0]):
+            os.remove(result[0])
 
-    def save_annotations(self, save_to_disk: bool = True) -> None:
+    def schedule_indexing(self) -> None:
+        """Extracts the document's text into the search index on the low-priority index pool."""
+        if not self.doc or self.is_new_file or not self.doc.name or not os.path.exists(self.doc.name):
+            return
+        self._index_job = run_in_background(
+            TextIndex.shared().index_document, self.doc.name,
+            on_finished=self.on_indexing_finished,
+            on_failed=self.on_indexing_failed,
+            on_progress=self.on_index_progress,
+            pool=index_pool(),
+            pass_job=True
+        )
+
+    def on_index_progress(self, done: int, total: int) -> None:
+        self.index_progress.emit(done, total)
+
+    def on_indexing_finished(self, digest) -> None:
+        self._index_job = None
+        if digest:
+            self.content_hash = digest
+
+    def on_indexing_failed(self, error: str) -> None:
+        self._index_job = None
+        print(f"[ERROR] Text indexing failed: {error}")
+
+    def cancel_indexing(self) -> None:
+        """Stops indexing the current document (pages done so far stay indexed)."""
+        self.content_hash = None
+        if self._index_job is not None:
+            job, self._index_job = self._index_job, None
+            job.cancel()
+            job.signals.finished.disconnect(self.on_indexing_finished)
+            job.signals.failed.disconnect(self.on_indexing_failed)
+            job.signals.progress.disconnect(self.on_index_progress)
+
+    def is_saving(self) -> bool:
+        return self._save_job is not None
+
+    @traced("save_annotations", "save")
+    def save_annotations(self, incremental: bool = True) -> None:
+        """
+        Saves all unsaved ink. The current state is captured in an immutable
+        snapshot on the GUI thread; encoding and writing happen on a worker
+        with its own document handle, so inking and page flips continue
+        during the save. Use flush_saves() to wait for completion.
+        """
         if not self.doc: return
+
+        if self._save_job is not None:
+            # One save at a time; the next one picks up everything new
+            if self.dirty_pages:
+                self._save_requested = True
+            return
+
+        if not self.dirty_pages and not self.pending_new_pages:
+            print("[Save] No changes to save.")
+            return
         
         # Save current page to cache first
-        self.page_data_cache[self.current_page_num] = {
-            "strokes": self.scene.get_strokes(),
-            "images": self.scene.get_images()
-        }
-        
-        # Iterate through all cached pages
-        for page_num, data in self.page_data_cache.items():
-            try:
-                page = self.doc.load_page(page_num)
-            except Exception as e:
-                print(f"[ERROR] Failed to load page {page_num} for saving: {e}")
-                continue
-                
-            strokes = data.get("strokes", [])
-            images = data.get("images", [])
-            
-            # Process Strokes
-            page_saved_stroke_ids = []
-            for stroke in strokes:
-                if stroke.get("saved", False):
-                    continue
-                    
-                points = stroke["points"]
-                if len(points) < 2: continue
-                
-                # Convert scene points to PDF coordinates
-                pdf_points = []
-                for x, y in points:
-                    pdf_points.append((x / self.zoom_level, y / self.zoom_level))
-                    
-                annot = page.add_ink_annot([pdf_points])
-                
-                # Parse color
-                try:
-                    qcolor = QColor(stroke["color"])
-                    if not qcolor.isValid():
-                        print(f"[ERROR] Invalid color: {stroke['color']}")
-                        rgb = (0, 0, 0) # Default to black
-                    else:
-                        rgb = (qcolor.redF(), qcolor.greenF(), qcolor.blueF())
-                    
-                    annot.set_colors(stroke=rgb)
-                except Exception as e:
-                    print(f"[ERROR] Failed to set color: {e}, stroke color data: {stroke.get('color')}")
-                    annot.set_colors(stroke=(0, 0, 0)) # Fallback
-                    
-                annot.set_border(width=stroke["width"] / self.zoom_level)
-                annot.update()
-                
-                # Add to saved list
-                if "id" in stroke:
-                    page_saved_stroke_ids.append(stroke["id"])
-                    stroke["saved"] = True # Update local cache immediately
-            
-            # Process Images
-            page_saved_image_ids = []
-            print(f"[DEBUG] Found {len(images)} images on page {page_num}.")
-            for img_data in images:
-                if img_data.get("saved", False):
-                    continue
-                    
-                try:
-                    # Convert QImage to bytes (PNG format)
-                    qimage = img_data["image"]
-                    from PyQt6.QtCore import QBuffer, QIODevice
-                    ba = QBuffer()
-                    ba.open(QIODevice.OpenModeFlag.ReadWrite)
-                    qimage.save(ba, "PNG")
-                    image_bytes = ba.data().data()
-                    
-                    # Calculate PDF coordinates
-                    # Scene coordinates are zoomed, so divide by zoom_level
-                    x = img_data["x"] / self.zoom_level
-                    y = img_data["y"] / self.zoom_level
-                    w = img_data["width"] / self.zoom_level
-                    h = img_data["height"] / self.zoom_level
-                    
-                    print(f"[DEBUG] Saving image at PDF coords: {x}, {y}, {w}, {h}")
-                    
-                    # Create rectangle
-                    rect = fitz.Rect(x, y, x + w, y + h)
-                    
-                    # Insert image
-                    page.insert_image(rect, stream=image_bytes)
-                    print("[DEBUG] Image inserted successfully.")
-                    
-                    if "id" in img_data:
-                        page_saved_image_ids.append(img_data["id"])
-                        img_data["saved"] = True # Update local cache immediately
-                        
-                except Exception as e:
-                    print(f"[ERROR] Error saving image: {e}")
-            
-        if save_to_disk:
-            print("[DEBUG] Saving document to disk...")
-            
-            if self.is_new_file:
-                # Create notes folder if it doesn't exist
-                notes_dir = os.path.join(os.getcwd(), "notes")
-                os.makedirs(notes_dir, exist_ok=True)
-                
-                # Filename is the timestamp
-                timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-                file_path = os.path.join(notes_dir, f"{timestamp}.pdf")
-                
-                self.doc.save(file_path)
-                self.doc = fitz.open(file_path) # Re-open as real file
-                self.is_new_file = False
-                print(f"[DEBUG] Saved new file to {file_path}")
+        if self.current_page_num in self.dirty_pages:
+            self._cache_current_page()
+        # Only pages with changes are scanned and written
+        dirty, self.dirty_pages = self.dirty_pages, {}
+        page_data = {num: self.page_data_cache[num] for num in dirty if num in self.page_data_cache}
+
+        if self.is_new_file:
+            # Create notes folder if it doesn't exist
+            notes_dir = os.path.join(os.getcwd(), "notes")
+            # Filename is the timestamp
+            timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+            file_path = os.path.join(notes_dir, f"{timestamp}.pdf")
+            with fitz_lock:
+                source_bytes = self.doc.tobytes()
+            snapshot = take_snapshot(
+                page_data, file_path, self.zoom_level,
+                source_bytes=source_bytes,
+                batch_ink=self.batch_ink_annotations
+            )
+        else:
+            snapshot = take_snapshot(
+                page_data, self.doc.name, self.zoom_level,
+                new_page_sizes=tuple(self.pending_new_pages),
+                incremental=incremental,
+                batch_ink=self.batch_ink_annotations
+            )
+
+        if self._repair_result is not None and not self.is_new_file:
+            self._apply_repair()
+
+        tracer.instant("save started", "save", pages=len(dirty), new_file=self.is_new_file)
+        self._save_snapshot = snapshot
+        self._save_dirty = dirty
+        self._save_checkpoint = self.journal.checkpoint() if self.journal else None
+        self._moved_during_save.clear()
+        self.save_started.emit()
+        job = run_in_background(
+            write_snapshot, snapshot,
+            on_progress=self.save_progress.emit,
+            pool=io_pool(), pass_job=True
+        )
+        job.signals.finished.connect(lambda report, job=job: self.on_save_finished(job, report))
+        job.signals.failed.connect(lambda error, job=job: self.on_save_failed(job, error))
+        self._save_job = job
+
+    @traced("apply save", "save")
+    @fitz_locked
+    def on_save_finished(self, job, report: dict) -> None:
+        if job is not self._save_job:
+            return # Already handled by flush_saves()
+        self._save_job = None
+        snapshot = self._save_snapshot
+        self._save_snapshot = None
+        self._save_dirty = {}
+
+        if snapshot.source_bytes is not None:
+            # First save of an in-memory note: it is a real file from now on
+            saved_doc = fitz.open(snapshot.path)
+            # Keep pages added while the save was running
+            added = [self.page_size(i) for i in range(saved_doc.page_count, self._page_count)]
+            self.doc.close()
+            self.doc = saved_doc
+            self._page_count = saved_doc.page_count
+            for width, height in added:
+                self._append_page(width, height)
+                self.pending_new_pages.append((width, height))
+            self.is_new_file = False
+            tracer.instant("saved new file", "save", path=snapshot.path)
+            self.open_journal()
+        else:
+            # The pages we wrote are in the file now
+            self.pending_new_pages = self.pending_new_pages[len(snapshot.new_page_sizes):]
+            if report["strategy"] == "full":
+                self._swap_in_file(report["temp_path"], snapshot.path)
+                self._incremental_saves = 0
+                self._compacted_size = os.path.getsize(snapshot.path)
             else:
-                # SAFE FULL SAVE STRATEGY
-                # Always perform a full save to a temporary file and replace the original.
-                # This prevents "xref" errors and "repaired file" issues.
-                try:
-                    import shutil
-                    import time
-                    
-                    original_path = self.doc.name
-                    temp_path = original_path + ".tmp"
-                    
-                    # Full save with garbage collection and deflation
-                    # garbage=4: Remove unused objects
-                    # deflate=True: Compress streams
-                    self.doc.save(temp_path, garbage=4, deflate=True)
-                    self.doc.close()
-                    
-                    # Robust File Replacement with Retries
-                    max_retries = 3
-                    for attempt in range(max_retries):
-                        try:
-                            if os.path.exists(original_path):
-                                os.replace(temp_path, original_path)
-                            else:
-                                os.rename(temp_path, original_path)
-                            break # Success
-                        except OSError as e_os:
-                            if attempt < max_retries - 1:
-                                print(f"[WARNING] File replace failed (attempt {attempt+1}/{max_retries}): {e_os}. Retrying...")
-                                time.sleep(0.5)
-                            else:
-                                raise e_os
-
-                    print(f"[DEBUG] Safe full save completed to {original_path}")
-                    
-                    # Re-open the document
-                    self.doc = fitz.open(original_path)
-                    
-                except Exception as e:
-                    print(f"[FATAL] Save failed: {e}")
-                    # Attempt recovery
-                    if os.path.exists(self.doc.name):
-                         self.doc = fitz.open(self.doc.name)
-
-            # Clear cache and re-render to show baked state
-            self.page_data_cache = {}
-            self.render_page()
+                self._reopen_document(snapshot.path)
+                self._incremental_saves += 1
                 
-            # Clear undo history as we have committed changes
-            self.undo_manager.clear()
+            # Everything journaled before the snapshot is now in the PDF
+            if self.journal:
+                self.journal.truncate(self._save_checkpoint)
+
+        self._mark_saved(snapshot)
+        
+        tracer.instant("save finished", "save", strategy=report["strategy"], duration_ms=report["duration_ms"])
+        print(f"[Save] {report['strategy']} save took {report['duration_ms']:.1f} ms")
+        self.save_completed.emit(report)
+
+        if self._compaction_result is not None:
+            result, self._compaction_result = self._compaction_result, None
+            self._apply_compaction(result)
+
+        if self._save_requested:
+            self._save_requested = False
+            self.save_annotations()
+        elif self._needs_compaction():
+            self.schedule_compaction()
+
+    def on_save_failed(self, job, error: str) -> None:
+        if job is not self._save_job:
+            return
+        self._save_job = None
+        self._save_snapshot = None
+        # Nothing was written: the pages are still dirty
+        for page_num, ids in self._save_dirty.items():
+            self.dirty_pages.setdefault(page_num, set()).update(ids)
+        self._save_dirty = {}
+        print(f"[FATAL] Save failed: {error}")
+        if self._save_requested:
+            self._save_requested = False
+            self.save_annotations()
+
+    def flush_saves(self) -> None:
+        """Blocks until every requested save has been written (used on close)."""
+        while self._save_job is not None:
+            job = self._save_job
+            job.wait()
+            # Deliver the result now instead of waiting for the event loop
+            if job.result is not None:
+                self.on_save_finished(job, job.result)
+            else:
+                self.on_save_failed(job, "save worker did not return a result")
+
+    def _mark_saved(self, snapshot) -> None:
+        """
+        Records what a save wrote. Strokes stay on the ink layer as saved
+        (still editable); images are baked into the page content, so they
+        leave the ink layer and the page raster is refreshed. Anything drawn
+        or moved since the snapshot was taken is left unsaved.
+        """
+        image_ids = set()
+        image_pages = set()
+        for page_record in snapshot.pages:
+            data = self.page_data_cache.setdefault(page_record.page_num, {"strokes": [], "images": []})
+            written = {stroke.id for stroke in page_record.strokes}
+            if page_record.replace_ink:
+                data["pdf_ids"] = list(written)
+            else:
+                data["pdf_ids"] = list(set(data.get("pdf_ids", ())) | written)
+
+            saved = written - self._moved_during_save
+            for stroke in data.get("strokes", []):
+                if stroke.get("id") in saved:
+                    stroke["saved"] = True
+            if page_record.page_num == self.current_page_num:
+                self.scene.mark_strokes_as_saved(list(saved))
+
+            if page_record.images:
+                ids = {image.id for image in page_record.images}
+                data["images"] = [i for i in data.get("images", []) if i.get("id") not in ids]
+                image_ids.update(ids)
+                image_pages.add(page_record.page_num)
+        self._moved_during_save.clear()
+
+        if not image_ids:
+            return
+        for page_num in image_pages:
+            self.invalidate_raster(page_num)
+        for uid in image_ids:
+            item = self.scene.find_item_by_id(uid)
+            if item is not None:
+                if item in self.scene.selected_items_group:
+                    self.scene.clear_selection()
+                self.scene.removeItem(item)
+        self.refresh_background()
+            
+        # Baked images cannot be undone any more
+        self.undo_manager.clear()
@@ -0,0 +1,259 @@
+import ast
+import json
+import os
+
+from PyQt6.QtCore import QEvent, Qt
+from PyQt6.QtGui import QAction
+
+from src.frontend.file_utils import file_signature, replace_file
+from src.frontend.loader_utils import load_class
+from src.frontend.modules.base_module import BaseModule
+from src.frontend.gestures.base_gesture import BaseGesture
+
+MANIFEST_VERSION = 1
+
+# Modules defining these must exist before the first tab or toolbar is built
+EAGER_HOOKS = ("init_ui", "on_viewer_added", "on_viewer_removed")
+
+def _body(function: ast.FunctionDef) -> list:
+    """Statements of a function, without its docstring."""
+    body = function.body
+    if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant):
+        body = body[1:]
+    return body
+
+def _returned_constant(function: ast.FunctionDef):
+    body = _body(function)
+    if len(body) == 1 and isinstance(body[0], ast.Return) and isinstance(body[0].value, ast.Constant):
+        return body[0].value.value
+    return None
+
+def _returned_enum_names(function: ast.FunctionDef):
+    """['PinchGesture'] for 'return [Qt.GestureType.PinchGesture]'; None if not that simple."""
+    body = _body(function)
+    if len(body) != 1 or not isinstance(body[0], ast.Return) or not isinstance(body[0].value, ast.List):
+        return None
+    names = []
+    for element in body[0].value.elts:
+        if not isinstance(element, ast.Attribute):
+            return None
+        names.append(element.attr)
+    return names
+
+def _static_actions(function: ast.FunctionDef):
+    """
+    Toolbar actions of a get_actions() that only creates QActions with
+    literal labels and connects them to methods of the module:
+    [{"label", "tooltip", "method"}]. None if it does anything else.
+    """
+    actions = {}
+    returned = None
+    for statement in _body(function):
+        if isinstance(statement, ast.Assign) and len(statement.targets) == 1 and isinstance(statement.targets[0], ast.Name):
+            call = statement.value
+            if (isinstance(call, ast.Call) and isinstance(call.func, ast.Name) and call.func.id == "QAction"
+                    and call.args and isinstance(call.args[0], ast.Constant) and isinstance(call.args[0].value, str)):
+                actions[statement.targets[0].id] = {"label": call.args[0].value, "tooltip": None, "method": None}
+                continue
+            return None
+        if isinstance(statement, ast.Expr) and isinstance(statement.value, ast.Call):
+            call = statement.value
+            func = call.func
+            if not isinstance(func, ast.Attribute) or len(call.args) != 1:
+                return None
+            # action.setToolTip("...")
+            if (func.attr == "setToolTip" and isinstance(func.value, ast.Name) and func.value.id in actions
+                    and isinstance(call.args[0], ast.Constant)):
+                actions[func.value.id]["tooltip"] = call.args[0].value
+                continue
+            # action.triggered.connect(self.method)
+            target = call.args[0]
+            if (func.attr == "connect" and isinstance(func.value, ast.Attribute) and func.value.attr == "triggered"
+                    and isinstance(func.value.value, ast.Name) and func.value.value.id in actions
+                    and isinstance(target, ast.Attribute) and isinstance(target.value, ast.Name) and target.value.id == "self"):
+                actions[func.value.value.id]["method"] = target.attr
+                continue
+            return None
+        if isinstance(statement, ast.Return) and isinstance(statement.value, ast.List):
+            if not all(isinstance(e, ast.Name) and e.id in actions for e in statement.value.elts):
+                return None
+            returned = [actions[e.id] for e in statement.value.elts]
+            continue
+        return None
+    if returned is None or any(action["method"] is None for action in returned):
+        return None
+    return returned
+
+def scan_plugin_file(file_path: str, base_name: str) -> list:
+    """
+    Reads what the toolbar and gesture manager need from a plugin file's
+    source, without importing it: one entry per class deriving from
+    base_name ("BaseModule" or "BaseGesture"). "lazy" tells whether the
+    class can be created on first use.
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=file_path)
+
+    entries = []
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        bases = [b.id if isinstance(b, ast.Name) else getattr(b, "attr", None) for b in node.bases]
+        if base_name not in bases:
+            continue
+        methods = {f.name: f for f in node.body if isinstance(f, ast.FunctionDef)}
+        entry = {"class": node.name, "methods": sorted(methods)}
+        if base_name == "BaseModule":
+            entry["priority"] = _returned_constant(methods["priority"]) if "priority" in methods else 100
+            entry["actions"] = _static_actions(methods["get_actions"]) if "get_actions" in methods else None
+            entry["lazy"] = (
+                isinstance(entry["priority"], int)
+                and entry["actions"] is not None
+                and not any(hook in methods for hook in EAGER_HOOKS)
+            )
+        else:
+            entry["gesture_types"] = _returned_enum_names(methods["gesture_types"]) if "gesture_types" in methods else []
+            entry["event_types"] = _returned_enum_names(methods["event_types"]) if "event_types" in methods else []
+            entry["lazy"] = entry["gesture_types"] is not None and entry["event_types"] is not None
+        entries.append(entry)
+    return entries
+
+class PluginManifest:
+    """
+    Cache of scan_plugin_file() results for the plugins in config.json,
+    stored in .plugin_manifest.json and refreshed per file when its mtime or
+    size changes. With a warm cache, starting the app parses no plugin
+    source and imports only the plugins that must be loaded eagerly.
+    """
+    _shared = None
+
+    def __init__(self, cache_path: str = None):
+        self.cache_path = cache_path or os.path.join(os.getcwd(), ".plugin_manifest.json")
+        self._files = {}
+        self._changed = False
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                self._files = data.get("files", {})
+        except (OSError, ValueError):
+            pass
+
+    @classmethod
+    def shared(cls) -> "PluginManifest":
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def entries(self, file_path: str, base_name: str) -> list:
+        """Manifest entries of a plugin file (None if it cannot be read or parsed)."""
+        key = f"{base_name}:{file_path}"
+        signature = file_signature(os.path.abspath(file_path))
+        if signature is None:
+            print(f"File not found: {file_path}")
+            return None
+        cached = self._files.get(key)
+        if cached and cached["signature"] == signature:
+            return cached["classes"]
+        try:
+            classes = scan_plugin_file(file_path, base_name)
+        except (OSError, SyntaxError, ValueError) as e:
+            print(f"[Plugins] Could not scan {file_path}: {e}")
+            return None
+        self._files[key] = {"signature": signature, "classes": classes}
+        self._changed = True
+        return classes
+
+    def save(self) -> None:
+        if not self._changed:
+            return
+        temp_path = self.cache_path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": MANIFEST_VERSION, "files": self._files}, f, indent=1)
+            replace_file(temp_path, self.cache_path)
+            self._changed = False
+        except OSError as e:
+            print(f"[Plugins] Could not write the plugin manifest: {e}")
+
+class LazyModule(BaseModule):
+    """
+    Toolbar entry of a module that is imported and created on first use:
+    its actions are built from the manifest and call into the real module
+    once it exists. Tab hooks are forwarded from then on.
+    """
+    def __init__(self, main_window, file_path: str, entry: dict):
+        super().__init__(main_window)
+        self.file_path = file_path
+        self.entry = entry
+        self.instance = None
+
+    @property
+    def priority(self):
+        return self.entry["priority"]
+
+    def get_actions(self):
+        actions = []
+        for spec in self.entry["actions"]:
+            action = QAction(spec["label"], self.main_window)
+            if spec.get("tooltip"):
+                action.setToolTip(spec["tooltip"])
+            action.triggered.connect(lambda checked=False, method=spec["method"]: self.call(method))
+            actions.append(action)
+        return actions
+
+    def load(self) -> BaseModule:
+        if self.instance is None:
+            module_class = load_class(self.file_path, self.entry["class"])
+            if module_class is None:
+                return None
+            print(f"[Plugins] Loading {self.entry['class']} on first use")
+            self.instance = module_class(self.main_window)
+            self.instance.init_ui()
+            self.instance.on_viewer_changed(None, self.main_window.pdf_viewer)
+        return self.instance
+
+    def call(self, method: str):
+        instance = self.load()
+        if instance is not None:
+            return getattr(instance, method)()
+
+    def on_viewer_added(self, viewer):
+        if self.instance is not None:
+            self.instance.on_viewer_added(viewer)
+
+    def on_viewer_removed(self, viewer):
+        if self.instance is not None:
+            self.instance.on_viewer_removed(viewer)
+
+    def on_viewer_changed(self, old_viewer, new_viewer):
+        if self.instance is not None:
+            self.instance.on_viewer_changed(old_viewer, new_viewer)
+
+class LazyGesture(BaseGesture):
+    """A gesture registered from the manifest; its code is imported by the first event it receives."""
+    def __init__(self, file_path: str, entry: dict):
+        self.file_path = file_path
+        self.entry = entry
+        self.gesture = None
+
+    def gesture_types(self) -> list[Qt.GestureType]:
+        return [getattr(Qt.GestureType, name) for name in self.entry["gesture_types"]]
+
+    def event_types(self) -> list[QEvent.Type]:
+        return [getattr(QEvent.Type, name) for name in self.entry["event_types"]]
+
+    def load(self) -> BaseGesture:
+        if self.gesture is None:
+            gesture_class = load_class(self.file_path, self.entry["class"])
+            if gesture_class is None:
+                return None
+            self.gesture = gesture_class()
+        return self.gesture
+
+    def handle_event(self, event, view) -> bool:
+        gesture = self.load()
+        return gesture is not None and gesture.handle_event(event, view)
+
+    def claims(self) -> bool:
+        return self.gesture is not None and self.gesture.claims()
@@ -0,0 +1,118 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+APP_PREFIX = "src/" # Frames of our own code, e.g. "PDFViewer.render_page (src/frontend/pdf_viewer.py)"
+
+class SamplingProfiler:
+    """
+    In-process sampling profiler for one thread (by default the GUI thread).
+    While running, a helper thread looks at the target thread's Python stack
+    every INTERVAL_MS and charges the time since the previous look to that
+    stack, so a long call that held the interpreter is weighted by how long
+    it actually took, not counted as a single sample.
+
+    Nothing is hooked into the profiled code: while stopped there is no
+    helper thread and no cost at all.
+
+    Results are folded stacks ("root;caller;callee weight", weights in
+    microseconds), the input format of flamegraph.pl, speedscope and
+    inferno.
+    """
+    INTERVAL_MS = 5
+
+    def __init__(self, interval_ms: float = INTERVAL_MS):
+        self.interval_ms = interval_ms
+        self.stacks = Counter() # Folded stack -> µs
+        self.samples = 0
+        self.duration_ms = 0.0
+        self._labels = {} # Code object -> frame label
+        self._thread = None
+        self._stop = threading.Event()
+        self._target = None
+        self._started = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self, thread_id: int = None) -> None:
+        """Starts sampling thread_id (the calling thread by default); earlier results are dropped."""
+        if self.running:
+            return
+        self.stacks.clear()
+        self.samples = 0
+        self.duration_ms = 0.0
+        self._target = thread_id if thread_id is not None else threading.get_ident()
+        self._stop.clear()
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if not self.running:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.duration_ms = (time.perf_counter() - self._started) * 1000
+
+    def _run(self) -> None:
+        interval = self.interval_ms / 1000
+        last = time.perf_counter()
+        while not self._stop.wait(interval):
+            frame = sys._current_frames().get(self._target)
+            now = time.perf_counter()
+            if frame is None:
+                return # The thread is gone
+            self.stacks[self._fold(frame)] += int((now - last) * 1e6)
+            self.samples += 1
+            last = now
+
+    def _fold(self, frame) -> str:
+        labels = []
+        while frame is not None:
+            labels.append(self._label(frame.f_code))
+            frame = frame.f_back
+        labels.reverse()
+        return ";".join(labels)
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            path = code.co_filename
+            if path.startswith(REPO_ROOT + os.sep):
+                path = os.path.relpath(path, REPO_ROOT).replace(os.sep, "/")
+            else:
+                path = os.path.basename(path)
+            label = f"{code.co_qualname} ({path})"
+            self._labels[code] = label
+        return label
+
+    def hot_functions(self, limit: int = 10) -> list:
+        """
+        Our own functions by inclusive time: [(label, ms, percent of the
+        profiled time)], slowest first. A function that appears several times
+        in one stack (recursion) is charged once.
+        """
+        total = sum(self.stacks.values())
+        times = Counter()
+        for stack, weight in self.stacks.items():
+            for label in set(stack.split(";")):
+                if f"({APP_PREFIX}" in label:
+                    times[label] += weight
+        return [
+            (label, round(us / 1000, 1), round(100 * us / total, 1) if total else 0.0)
+            for label, us in times.most_common(limit)
+        ]
+
+    def write_folded(self, path: str) -> None:
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, weight in sorted(self.stacks.items()):
+                if weight > 0:
+                    f.write(f"{stack} {weight}\n")
@@ -0,0 +1,108 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+
+class StartupProfiler:
+    """
+    Timestamps of the phases of a cold start, from the first import of this
+    module (main_window imports it before anything else) up to the first
+    paint, the window being ready (toolbar and document up) and the first
+    accepted pen event.
+
+    Phases are timed with phase() blocks and may nest (a plugin import inside
+    "load modules"); milestones are single points recorded with mark(). Once
+    every milestone is in, recording stops, so later tabs or renders cost a
+    flag check. Nothing here imports Qt, so importing PyQt6 can be timed too.
+    """
+    MILESTONES = ("first paint", "ready", "first pen event")
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.phases = [] # {"name", "category", "start_ms", "duration_ms"}
+        self.milestones = {} # name -> ms since origin
+        self.done = False
+        self.on_milestone = None # Called with the milestone name
+        self._seen = set()
+
+    def now_ms(self) -> float:
+        return (time.perf_counter() - self.origin) * 1000
+
+    @contextmanager
+    def phase(self, name: str, category: str = "setup", once: bool = False):
+        """Times the block. With once=True only its first run is recorded (e.g. the first render)."""
+        if self.done or (once and name in self._seen):
+            yield
+            return
+        self._seen.add(name)
+        start = self.now_ms()
+        try:
+            yield
+        finally:
+            self.phases.append({
+                "name": name,
+                "category": category,
+                "start_ms": round(start, 2),
+                "duration_ms": round(self.now_ms() - start, 2)
+            })
+
+    def mark(self, name: str) -> None:
+        """Records a milestone the first time it is reached."""
+        if self.done or name in self.milestones:
+            return
+        self.milestones[name] = round(self.now_ms(), 2)
+        if all(milestone in self.milestones for milestone in self.MILESTONES):
+            self.done = True
+        if self.on_milestone is not None:
+            self.on_milestone(name)
+
+    # Reporting
+    def report(self) -> dict:
+        return {
+            "milestones": dict(self.milestones),
+            "phases": sorted(self.phases, key=lambda p: p["duration_ms"], reverse=True)
+        }
+
+    def format_report(self) -> str:
+        lines = ["Startup profile (ms since start)"]
+        for name, at in sorted(self.milestones.items(), key=lambda item: item[1]):
+            lines.append(f"  {name:<44} at {at:9.1f}")
+        lines.append("Phases (slowest first; nested phases are included in their parent)")
+        for p in self.report()["phases"]:
+            lines.append(f"  {p['duration_ms']:9.1f}  {p['category']:<7} {p['name']}  (at {p['start_ms']:.1f})")
+        return "\n".join(lines)
+
+    def write_json(self, path: str) -> None:
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+
+    def check_budget(self, budget: dict) -> list:
+        """
+        Compares the profile with a budget:
+        {"milestones": {"first paint": ms}, "phases": {name: ms}, "plugin_ms_max": ms}.
+        Returns the violations as messages (empty when within budget).
+        A milestone that was never reached is not a violation.
+        """
+        return check_budget(self.report(), budget)
+
+def check_budget(report: dict, budget: dict) -> list:
+    violations = []
+    for name, limit in budget.get("milestones", {}).items():
+        at = report["milestones"].get(name)
+        if at is not None and at > limit:
+            violations.append(f"{name} at {at:.1f} ms > {limit} ms")
+    durations = {p["name"]: p["duration_ms"] for p in report["phases"]}
+    for name, limit in budget.get("phases", {}).items():
+        if durations.get(name, 0) > limit:
+            violations.append(f"phase '{name}' took {durations[name]:.1f} ms > {limit} ms")
+    plugin_limit = budget.get("plugin_ms_max")
+    if plugin_limit is not None:
+        for p in report["phases"]:
+            if p["category"] == "plugin" and p["duration_ms"] > plugin_limit:
+                violations.append(f"{p['name']} took {p['duration_ms']:.1f} ms > {plugin_limit} ms")
+    return violations
+
+# Shared by everything that is timed during startup
+startup_profiler = StartupProfiler()
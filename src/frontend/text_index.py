@@ -0,0 +1,266 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import fitz  # PyMuPDF
+from PyQt6.QtCore import QThread, QThreadPool
+
+from src.frontend.file_utils import file_signature
+from src.frontend.background_jobs import fitz_lock
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS TextIndexFiles (
+    FilePath TEXT PRIMARY KEY,
+    FileMTime INTEGER NOT NULL,
+    FileSize INTEGER NOT NULL,
+    ContentHash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS TextIndexDocs (
+    ContentHash TEXT PRIMARY KEY,
+    PageCount INTEGER NOT NULL,
+    PagesIndexed INTEGER NOT NULL DEFAULT 0
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS PageText USING fts5(
+    Text UNINDEXED,
+    SearchKey,
+    ContentHash UNINDEXED,
+    PageNum UNINDEXED,
+    tokenize = 'trigram'
+);
+"""
+
+# Trigram MATCH needs this many characters; shorter keys scan the stored keys
+MIN_MATCH_CHARS = 3
+
+_REF = re.compile(r"(\d+) 0 R")
+_SEPARATORS = re.compile(r"[\s\-]+")
+_index_pool = None
+
+def index_pool() -> QThreadPool:
+    """Single low-priority thread for text extraction, so indexing never competes with saves or the GUI."""
+    global _index_pool
+    if _index_pool is None:
+        _index_pool = QThreadPool()
+        _index_pool.setMaxThreadCount(1)
+        _index_pool.setThreadPriority(QThread.Priority.LowestPriority)
+    return _index_pool
+
+def content_hash(doc) -> str:
+    """
+    Hash of what the pages show: the decompressed content streams of every
+    page. Ink annotations, incremental saves and compaction leave it
+    unchanged, so a document is extracted once however often it is saved.
+    """
+    sha = hashlib.sha1(str(doc.page_count).encode("ascii"))
+    for page_num in range(doc.page_count):
+        # Read /Contents from the page object directly: loading every page is far slower
+        kind, value = doc.xref_get_key(doc.page_xref(page_num), "Contents")
+        if kind in ("xref", "array"):
+            for xref in _REF.findall(value):
+                sha.update(doc.xref_stream(int(xref)) or b"")
+        sha.update(b"\0")
+    return sha.hexdigest()
+
+def search_key(text: str) -> str:
+    """
+    Text as compared by the candidate filter (stored with each page when it
+    is indexed): lower case, without whitespace or hyphens. page.search_for() ignores case, matches any whitespace run
+    with any other and joins words hyphenated across lines; stripping the
+    same from the page text and the query keeps the filter a superset of
+    what it can find (mid-word substrings included).
+    """
+    return _SEPARATORS.sub("", text.lower())
+
+class TextIndex:
+    """
+    Extracted text of document pages, stored in SQLite FTS5 next to the
+    library (study_data.db) with its search_key() in a trigram index.
+    Searches narrow the pages down with a MATCH on that index (a substring
+    match, mid-word included), then let page.search_for() find the hits.
+
+    Pages are keyed by content hash rather than path, so a file is extracted
+    only once and copies or saved versions share the index. Extraction runs
+    page by page on the index pool and commits in small batches: searches see
+    the pages indexed so far while a large book is still being indexed.
+    """
+    BATCH_PAGES = 16
+    _shared = None
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or os.path.join(os.getcwd(), "study_data.db")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        # WAL: searches read while the indexer writes
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(PageText)")]
+        if columns and "SearchKey" not in columns:
+            # Index from before the search keys: extract everything again
+            self._conn.executescript("DROP TABLE PageText; DELETE FROM TextIndexDocs;")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    @classmethod
+    def shared(cls) -> "TextIndex":
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _execute(self, sql: str, params=()) -> list:
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+            self._conn.commit()
+            return rows
+
+    # Hashing
+    def hash_for(self, path: str, doc=None) -> str:
+        """Content hash of a file, recomputed only when its mtime or size changed."""
+        path = os.path.abspath(path)
+        signature = file_signature(path)
+        if signature is None:
+            raise FileNotFoundError(path)
+        rows = self._execute(
+            "SELECT ContentHash FROM TextIndexFiles WHERE FilePath = ? AND FileMTime = ? AND FileSize = ?",
+            (path, signature[0], signature[1])
+        )
+        if rows:
+            return rows[0][0]
+        own_doc = doc is None
+        with fitz_lock:
+            doc = fitz.open(path) if own_doc else doc
+            try:
+                digest = content_hash(doc)
+            finally:
+                if own_doc:
+                    doc.close()
+        self._execute(
+            "INSERT OR REPLACE INTO TextIndexFiles (FilePath, FileMTime, FileSize, ContentHash) VALUES (?, ?, ?, ?)",
+            (path, signature[0], signature[1], digest)
+        )
+        return digest
+
+    # Indexing
+    def progress(self, digest: str):
+        """(pages indexed, page count) of a document, or None if it was never seen."""
+        rows = self._execute("SELECT PagesIndexed, PageCount FROM TextIndexDocs WHERE ContentHash = ?", (digest,))
+        return tuple(rows[0]) if rows else None
+
+    def index_document(self, path: str, job=None):
+        """
+        Worker-side: extracts the text of every page not indexed yet.
+        Reports (pages indexed, page count) after each batch. Returns the
+        content hash, or None if cancelled (the pages done so far are kept
+        and indexing resumes from there next time).
+        """
+        with fitz_lock:
+            doc = fitz.open(path)
+            page_count = doc.page_count
+        try:
+            digest = self.hash_for(path, doc)
+            known = self.progress(digest)
+            if known is None:
+                self._execute(
+                    "INSERT INTO TextIndexDocs (ContentHash, PageCount, PagesIndexed) VALUES (?, ?, 0)",
+                    (digest, page_count)
+                )
+                known = (0, page_count)
+            done, total = known
+            if job is not None:
+                job.report_progress(done, total)
+            while done < total:
+                if job is not None and job.cancelled:
+                    return None
+                end = min(done + self.BATCH_PAGES, total)
+                rows = []
+                for page_num in range(done, end):
+                    with fitz_lock:
+                        text = doc.load_page(page_num).get_text("text")
+                    rows.append((text, search_key(text), digest, page_num))
+                    time.sleep(0) # Let the GUI thread have the interpreter (and fitz) between pages
+                with self._lock:
+                    self._conn.executemany(
+                        "INSERT INTO PageText (Text, SearchKey, ContentHash, PageNum) VALUES (?, ?, ?, ?)", rows
+                    )
+                    self._conn.execute("UPDATE TextIndexDocs SET PagesIndexed = ? WHERE ContentHash = ?", (end, digest))
+                    self._conn.commit()
+                done = end
+                if job is not None:
+                    job.report_progress(done, total)
+            return digest
+        finally:
+            with fitz_lock:
+                doc.close()
+
+    # Queries
+    def page_text(self, digest: str, page_num: int):
+        """Extracted text of a page, or None if it is not indexed yet."""
+        rows = self._execute("SELECT Text FROM PageText WHERE ContentHash = ? AND PageNum = ?", (digest, page_num))
+        return rows[0][0] if rows else None
+
+    def search_pages(self, digest: str, query: str) -> list:
+        """
+        Indexed pages that may contain the query, in page order: every page
+        where page.search_for(query) can find it, possibly a few more.
+        """
+        key = search_key(query)
+        if len(key) >= MIN_MATCH_CHARS:
+            rows = self._execute(
+                "SELECT PageNum FROM PageText WHERE SearchKey MATCH ? AND ContentHash = ? ORDER BY PageNum",
+                ('"' + key.replace('"', '""') + '"', digest)
+            )
+        else:
+            rows = self._execute(
+                "SELECT PageNum FROM PageText WHERE ContentHash = ? AND instr(SearchKey, ?) > 0 ORDER BY PageNum",
+                (digest, key)
+            )
+        return [row[0] for row in rows]
+
+    def search(self, doc, digest: str, query: str, job=None):
+        """
+        Yields (page_num, hit rects) for every page of doc containing the
+        query, in page order. Indexed pages are narrowed down by their
+        stored text first; pages the indexer has not reached yet are scanned
+        directly, so results are complete at any point of indexing. Rects are
+        in page space (see PageTransform.pdf_rect_to_scene).
+        """
+        if not query.strip():
+            return
+        done, _ = self.progress(digest) or (0, 0)
+        with fitz_lock:
+            page_count = doc.page_count
+        candidates = [num for num in self.search_pages(digest, query) if num < page_count]
+        candidates += range(done, page_count)
+        for page_num in candidates:
+            if job is not None and job.cancelled:
+                return
+            with fitz_lock:
+                rects = doc.load_page(page_num).search_for(query)
+            if rects:
+                yield page_num, rects
+
+    def search_file(self, path: str, query: str, job=None) -> int:
+        """
+        Worker-side search of a file on disk. Each page with hits is reported
+        as soon as it is found through job.report_partial((page_num, rects)).
+        Returns the number of pages with hits.
+        """
+        with fitz_lock:
+            doc = fitz.open(path)
+        try:
+            digest = self.hash_for(path, doc)
+            found = 0
+            for page_num, rects in self.search(doc, digest, query, job=job):
+                found += 1
+                if job is not None:
+                    job.report_partial((page_num, rects))
+            return found
+        finally:
+            with fitz_lock:
+                doc.close()
@@ -0,0 +1,117 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+class _NullSpan:
+    """What span() returns while tracing is off: entering and leaving it does nothing."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class Tracer:
+    """
+    Named spans, instants and counters of the hot paths (rendering, caches,
+    ink, undo, saving), exported in the Chrome trace-event format (open the
+    file in chrome://tracing or https://ui.perfetto.dev).
+
+    Off by default. While off, span() returns a shared no-op context and
+    instant()/count() return after one flag check, so instrumented code pays
+    almost nothing. Counters are kept as running totals either way; only the
+    trace events need tracing on.
+    """
+    MAX_EVENTS = 500_000 # Oldest events are dropped beyond this
+
+    def __init__(self):
+        self.enabled = False
+        self.events = deque(maxlen=self.MAX_EVENTS)
+        self.counters = {}
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+
+    def start(self) -> None:
+        self.events.clear()
+        self._origin = time.perf_counter()
+        self.enabled = True
+
+    def stop(self) -> None:
+        self.enabled = False
+
+    def _now_us(self) -> float:
+        return (time.perf_counter() - self._origin) * 1e6
+
+    def span(self, name: str, category: str = "app", **args):
+        """Context manager timing a block as one complete ("X") event."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._span(name, category, args)
+
+    @contextmanager
+    def _span(self, name, category, args):
+        start = self._now_us()
+        try:
+            yield
+        finally:
+            event = {
+                "name": name, "cat": category, "ph": "X",
+                "ts": round(start, 1), "dur": round(self._now_us() - start, 1),
+                "pid": self._pid, "tid": threading.get_ident()
+            }
+            if args:
+                event["args"] = args
+            self.events.append(event)
+
+    def instant(self, name: str, category: str = "app", **args) -> None:
+        """A point in time, e.g. a decision worth seeing on the timeline."""
+        if not self.enabled:
+            return
+        event = {
+            "name": name, "cat": category, "ph": "i", "s": "t",
+            "ts": round(self._now_us(), 1), "pid": self._pid, "tid": threading.get_ident()
+        }
+        if args:
+            event["args"] = args
+        self.events.append(event)
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """Adds to a running counter (e.g. "raster cache hit"); traced as a counter ("C") event."""
+        total = self.counters.get(name, 0) + amount
+        self.counters[name] = total
+        if self.enabled:
+            self.events.append({
+                "name": name, "ph": "C", "ts": round(self._now_us(), 1),
+                "pid": self._pid, "tid": threading.get_ident(), "args": {"value": total}
+            })
+
+    def chrome_trace(self) -> dict:
+        return {"traceEvents": list(self.events), "displayTimeUnit": "ms", "otherData": {"counters": dict(self.counters)}}
+
+    def write_chrome_trace(self, path: str) -> None:
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+
+def traced(name: str, category: str = "app"):
+    """Decorator: the whole call is a span while tracing is on."""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return function(*args, **kwargs)
+            with tracer._span(name, category, None):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+# Shared by every instrumented module
+tracer = Tracer()
@@ -2,7 +2,18 @@ from abc import ABC, abstractmethod
 from PyQt6.QtWidgets import QGraphicsItem, QGraphicsPathItem, QGraphicsPixmapItem
 from PyQt6.QtCore import QObject, pyqtSignal, QPointF, Qt
 from PyQt6.QtGui import QColor, QPen, QTransform
+from contextlib import contextmanager
 import uuid
+from src.frontend.tracing import traced
+
+def find_item_by_id(scene, uid):
+    """Looks up a scene item by its UUID, using the scene's id index when available."""
+    if hasattr(scene, "find_item_by_id"):
+        return scene.find_item_by_id(uid)
+    for item in scene.items():
+        if item.data(Qt.ItemDataRole.UserRole + 1) == uid:
+            return item
+    return None
 
 class Command(ABC):
     @abstractmethod
@@ -59,10 +70,7 @@ class AddStrokeCommand(Command):
                 self.scene.removeItem(item)
 
     def _find_item_by_id(self, uid):
-        for item in self.scene.items():
-            if item.data(Qt.ItemDataRole.UserRole + 1) == uid:
-                return item
-        return None
+        return find_item_by_id(self.scene, uid)
 
 class RemoveStrokeCommand(Command):
     def __init__(self, scene, stroke_data):
@@ -96,12 +104,12 @@ class RemoveStrokeCommand(Command):
         self.item = self.scene.addPath(path, pen)
         self.item.setFlag(QGraphicsPathItem.GraphicsItemFlag.ItemIsSelectable)
         self.item.setData(Qt.ItemDataRole.UserRole + 1, self.stroke_id)
+        # A stroke that was already in the file is still there
+        if self.stroke_data.get("saved", False):
+            self.item.setData(Qt.ItemDataRole.UserRole + 2, True)
 
     def _find_item_by_id(self, uid):
-        for item in self.scene.items():
-            if item.data(Qt.ItemDataRole.UserRole + 1) == uid:
-                return item
-        return None
+        return find_item_by_id(self.scene, uid)
 
 class AddImageCommand(Command):
     def __init__(self, scene, image_data):
@@ -140,10 +148,7 @@ class AddImageCommand(Command):
                 self.scene.removeItem(item)
 
     def _find_item_by_id(self, uid):
-        for item in self.scene.items():
-            if item.data(Qt.ItemDataRole.UserRole + 1) == uid:
-                return item
-        return None
+        return find_item_by_id(self.scene, uid)
 
 class MoveItemsCommand(Command):
     def __init__(self, scene, move_data_list):
@@ -188,55 +193,133 @@ class MoveItemsCommand(Command):
         self.scene.clear_selection()
 
     def _find_item_by_id(self, uid):
-        for item in self.scene.items():
-            if item.data(Qt.ItemDataRole.UserRole + 1) == uid:
-                return item
-        return None
+        return find_item_by_id(self.scene, uid)
+
+class CompoundCommand(Command):
+    """
+    Groups several commands (e.g. every stroke removed by one eraser sweep)
+    so they are undone and redone as a single history step.
+    """
+    def __init__(self, commands=None, label: str = ""):
+        self.commands = list(commands or [])
+        self.label = label
+
+    def redo(self):
+        for command in self.commands:
+            command.redo()
+
+    def undo(self):
+        # Reverse order so later commands see the state they were created in
+        for command in reversed(self.commands):
+            command.undo()
 
 class UndoManager(QObject):
     canUndoChanged = pyqtSignal(bool)
     canRedoChanged = pyqtSignal(bool)
     historyChanged = pyqtSignal(int, int) # current_index, total_count
+    commandApplied = pyqtSignal(object, bool) # command, True if it was undone
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, scene=None):
         super().__init__(parent)
         self.undo_stack = []
         self.redo_stack = []
+        self.scene = scene # Optional: scene whose updates are suspended during batch undo/redo
+
+        # Transaction State
+        self._transaction = None
+        self._transaction_depth = 0
+
+    def begin_transaction(self, label: str = ""):
+        """
+        Starts collecting pushed commands into one CompoundCommand.
+        Transactions nest; only the outermost end_transaction() pushes.
+        """
+        if self._transaction_depth == 0:
+            self._transaction = CompoundCommand(label=label)
+        self._transaction_depth += 1
+
+    def end_transaction(self):
+        if self._transaction_depth == 0:
+            return
+        self._transaction_depth -= 1
+        if self._transaction_depth > 0:
+            return
+
+        compound = self._transaction
+        self._transaction = None
+        if not compound.commands:
+            return
+        # A single command does not need the wrapper
+        if len(compound.commands) == 1:
+            self.push(compound.commands[0])
+        else:
+            self.push(compound)
+
+    @contextmanager
+    def transaction(self, label: str = ""):
+        self.begin_transaction(label)
+        try:
+            yield
+        finally:
+            self.end_transaction()
+
+    @contextmanager
+    def _suspended_updates(self, stack: list, steps: int):
+        # Let the scene skip index maintenance and repaints until the batch is done.
+        # One plain command is cheaper than rebuilding the index afterwards
+        batch = steps > 1 or (stack and isinstance(stack[-1], CompoundCommand))
+        if batch and self.scene is not None and hasattr(self.scene, "suspend_updates"):
+            with self.scene.suspend_updates():
+                yield
+        else:
+            yield
 
     def push(self, command: Command):
+        if self._transaction is not None:
+            self._transaction.commands.append(command)
+            return
+
         self.undo_stack.append(command)
         self.redo_stack.clear() # New action invalidates redo history
         self.canUndoChanged.emit(True)
         self.canRedoChanged.emit(False)
         self._emit_history_changed()
 
+    @traced("undo", "undo")
     def undo(self, steps: int = 1):
-        for _ in range(steps):
-            if not self.undo_stack:
-                break
-            
-            command = self.undo_stack.pop()
-            command.undo()
-            self.redo_stack.append(command)
+        with self._suspended_updates(self.undo_stack, steps):
+            for _ in range(steps):
+                if not self.undo_stack:
+                    break
+                
+                command = self.undo_stack.pop()
+                command.undo()
+                self.redo_stack.append(command)
+                self.commandApplied.emit(command, True)
         
         self.canUndoChanged.emit(len(self.undo_stack) > 0)
         self.canRedoChanged.emit(True)
         self._emit_history_changed()
 
+    @traced("redo", "undo")
     def redo(self, steps: int = 1):
-        for _ in range(steps):
-            if not self.redo_stack:
-                break
-                
-            command = self.redo_stack.pop()
-            command.redo()
-            self.undo_stack.append(command)
+        with self._suspended_updates(self.redo_stack, steps):
+            for _ in range(steps):
+                if not self.redo_stack:
+                    break
+                    
+                command = self.redo_stack.pop()
+                command.redo()
+                self.undo_stack.append(command)
+                self.commandApplied.emit(command, False)
         
         self.canUndoChanged.emit(True)
         self.canRedoChanged.emit(len(self.redo_stack) > 0)
         self._emit_history_changed()
 
     def clear(self):
+        self._transaction = None
+        self._transaction_depth = 0
         self.undo_stack.clear()
         self.redo_stack.clear()
         self.canUndoChanged.emit(False)
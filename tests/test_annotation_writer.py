@@ -0,0 +1,128 @@
+import os
+import tempfile
+import unittest
+import fitz
+from PyQt6.QtWidgets import QApplication
+from src.frontend.annotation_writer import take_snapshot, apply_snapshot, load_ink_strokes, read_stroke_ids, repair_pdf
+
+app = QApplication.instance() or QApplication([])
+
+ZOOM = 2.0
+
+class TestAnnotationWriter(unittest.TestCase):
+    def setUp(self):
+        self.doc = fitz.open()
+        self.doc.new_page(width=400, height=600)
+
+    def _stroke(self, uid, x=20.0, saved=False, color="#ff0000ff"):
+        return {"points": [(x, 40.0), (x + 100, 140.0)], "color": color, "width": 4, "id": uid, "saved": saved}
+
+    def _save(self, cache):
+        snapshot = take_snapshot(cache, "", ZOOM)
+        apply_snapshot(self.doc, snapshot)
+        return snapshot
+
+    def test_saved_ink_loads_back_as_strokes(self):
+        self._save({0: {"strokes": [self._stroke("a"), self._stroke("b", 200, color="#80008000")]}})
+
+        strokes = load_ink_strokes(self.doc, 0, ZOOM)
+        self.assertEqual(sorted(s["id"] for s in strokes), ["a", "b"])
+        self.assertTrue(all(s["saved"] for s in strokes))
+        by_id = {s["id"]: s for s in strokes}
+        self.assertEqual(by_id["b"]["color"], "#80008000")
+        self.assertEqual(by_id["b"]["width"], 4)
+        for x, y in zip(by_id["a"]["points"], self._stroke("a")["points"]):
+            self.assertAlmostEqual(x[0], y[0], places=3)
+            self.assertAlmostEqual(x[1], y[1], places=3)
+
+    def test_new_strokes_append_and_erasing_rewrites_page(self):
+        self._save({0: {"strokes": [self._stroke("a")]}})
+        page_data = {"strokes": load_ink_strokes(self.doc, 0, ZOOM), "pdf_ids": ["a"]}
+
+        # Unchanged page: nothing to write
+        self.assertEqual(take_snapshot({0: page_data}, "", ZOOM).pages, ())
+
+        # New stroke: only it is written, next to the existing annotation
+        page_data["strokes"].append(self._stroke("b", 200))
+        record = self._save({0: page_data}).pages[0]
+        self.assertFalse(record.replace_ink)
+        self.assertEqual([s.id for s in record.strokes], ["b"])
+        self.assertEqual(len(list(self.doc[0].annots())), 2)
+
+        # Erased saved stroke: the page's ink is rewritten without it
+        page_data = {"strokes": [self._stroke("b", 200, saved=True)], "pdf_ids": ["a", "b"]}
+        record = self._save({0: page_data}).pages[0]
+        self.assertTrue(record.replace_ink)
+        self.assertEqual([s["id"] for s in load_ink_strokes(self.doc, 0, ZOOM)], ["b"])
+
+    def _ink_annots(self):
+        """(stroke ids, paths, opacity) of each ink annotation on page 0."""
+        page = self.doc[0]
+        return [
+            (read_stroke_ids(self.doc, annot), annot.vertices, annot.opacity)
+            for annot in page.annots(types=[fitz.PDF_ANNOT_INK])
+        ]
+
+    def test_strokes_are_batched_by_style_in_order(self):
+        self._save({0: {"strokes": [
+            self._stroke("a", 20), self._stroke("red-translucent", 60, color="#80ff0000"),
+            self._stroke("b", 100), self._stroke("blue", 140, color="#ff0000f0"),
+            self._stroke("c", 180)
+        ]}})
+        annots = self._ink_annots()
+        self.assertEqual([ids for ids, _, _ in annots], [["a", "b", "c"], ["red-translucent"], ["blue"]])
+        # One path per stroke, in drawing order
+        self.assertEqual([round(path[0][0]) for path in annots[0][1]], [10, 50, 90])
+        self.assertAlmostEqual(annots[1][2], 0.5, places=2)
+
+        strokes = load_ink_strokes(self.doc, 0, ZOOM)
+        self.assertEqual([s["id"] for s in strokes], ["a", "b", "c", "red-translucent", "blue"])
+        self.assertEqual(strokes[3]["color"], "#80ff0000")
+
+    def test_strokes_without_ids_and_foreign_ink_get_fresh_ids(self):
+        self._save({0: {"strokes": [self._stroke(None), self._stroke("b", 200)]}})
+        foreign = self.doc[0].add_ink_annot([[(10, 10), (50, 50)], [(60, 60), (90, 90)]])
+        foreign.update()
+
+        annots = self._ink_annots()
+        self.assertEqual([ids for ids, _, _ in annots], [["", "b"], []])
+        strokes = load_ink_strokes(self.doc, 0, ZOOM)
+        self.assertEqual(len(strokes), 4)
+        self.assertEqual(strokes[1]["id"], "b")
+        fresh = [strokes[0]["id"], strokes[2]["id"], strokes[3]["id"]]
+        self.assertTrue(all(fresh) and len(set(fresh)) == 3)
+        self.assertEqual(strokes[2]["points"][0], (20.0, 20.0)) # Foreign ink in scene coordinates
+
+    def test_erasing_from_a_batched_annotation_rewrites_the_page(self):
+        self._save({0: {"strokes": [self._stroke("a", 20), self._stroke("b", 100), self._stroke("c", 180)]}})
+        self.assertEqual(len(self._ink_annots()), 1)
+
+        page_data = {"strokes": load_ink_strokes(self.doc, 0, ZOOM), "pdf_ids": ["a", "b", "c"]}
+        page_data["strokes"] = [s for s in page_data["strokes"] if s["id"] != "b"]
+        record = self._save({0: page_data}).pages[0]
+        self.assertTrue(record.replace_ink)
+
+        annots = self._ink_annots()
+        self.assertEqual([ids for ids, _, _ in annots], [["a", "c"]])
+        self.assertEqual([round(path[0][0]) for path in annots[0][1]], [10, 90])
+
+    def test_repair_writes_verified_copy(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "broken.pdf")
+            # Bogus xref offset: MuPDF repairs the file on open
+            data = self.doc.tobytes().replace(b"startxref", b"startxref\n0\n%%", 1)
+            with open(path, "wb") as f:
+                f.write(data)
+            self.assertFalse(fitz.open(path).can_save_incrementally())
+
+            temp_path, source_path, _, _ = repair_pdf(path)
+            self.assertEqual(source_path, path)
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), data) # Original untouched
+            repaired = fitz.open(temp_path)
+            self.assertTrue(repaired.can_save_incrementally())
+            self.assertEqual(repaired.page_count, 1)
+            repaired.close()
+
+if __name__ == '__main__':
+    unittest.main()
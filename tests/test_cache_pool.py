@@ -0,0 +1,41 @@
+import unittest
+from src.frontend.cache_pool import CachePool
+
+class TestCachePool(unittest.TestCase):
+    def setUp(self):
+        self.pool = CachePool(budget_bytes=100)
+
+    def test_background_owner_is_evicted_first(self):
+        self.pool.set_active_owner("active")
+        self.pool.put("active", "a", 1, 40)
+        self.pool.put("background", "b", 2, 40)
+        self.pool.put("active", "c", 3, 40) # Over budget: the newer background entry goes first
+        self.assertIsNone(self.pool.get("background", "b"))
+        self.assertEqual(self.pool.get("active", "a"), 1)
+        self.assertEqual(self.pool.used_bytes, 80)
+
+    def test_least_recently_used_first(self):
+        self.pool.put("owner", "a", 1, 40)
+        self.pool.put("owner", "b", 2, 40)
+        self.pool.get("owner", "a")
+        self.pool.put("owner", "c", 3, 40)
+        self.assertIsNone(self.pool.get("owner", "b"))
+        self.assertEqual(self.pool.get("owner", "a"), 1)
+
+    def test_evict_callback_can_pin_an_entry(self):
+        released = []
+        self.pool.put("owner", "pinned", None, 60, evict=lambda: False)
+        self.pool.put("owner", "clean", None, 30, evict=lambda: released.append("clean"))
+        self.pool.put("owner", "new", None, 30)
+        self.assertEqual(released, ["clean"])
+        self.assertEqual(self.pool.used_bytes, 90)
+
+    def test_discard_owner(self):
+        self.pool.put("a", 1, "x", 10)
+        self.pool.put("b", 1, "y", 20)
+        self.pool.discard_owner("a")
+        self.assertEqual(self.pool.used_bytes, 20)
+        self.assertEqual(self.pool.owner_bytes("b"), 20)
+
+if __name__ == '__main__':
+    unittest.main()
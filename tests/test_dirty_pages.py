@@ -0,0 +1,103 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import fitz
+from PyQt6.QtWidgets import QApplication
+from src.frontend.pdf_viewer import PDFViewer
+from src.frontend.text_index import TextIndex, index_pool
+from src.frontend.library import DocumentLibrary
+
+app = QApplication.instance() or QApplication([])
+
+APP_DATA = ("study_data.db", "study_data.db-wal", "study_data.db-shm", "journals", "thumbnails")
+
+def app_data_state() -> dict:
+    """What the app keeps in the working directory: file stamps and directory listings."""
+    state = {}
+    for name in APP_DATA:
+        path = os.path.join(os.getcwd(), name)
+        if os.path.isdir(path):
+            state[name] = sorted(os.listdir(path))
+        elif os.path.exists(path):
+            stat = os.stat(path)
+            state[name] = (stat.st_mtime_ns, stat.st_size)
+    return state
+
+class TestDirtyPages(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.app_data = app_data_state()
+        # Journals, the search index and the library go to the temporary directory
+        self.index = TextIndex(os.path.join(self.tmp_dir.name, "study_data.db"))
+        self.library = DocumentLibrary(os.path.join(self.tmp_dir.name, "study_data.db"))
+        for patcher in (
+            mock.patch("src.frontend.ink_journal.JOURNALS_DIR", os.path.join(self.tmp_dir.name, "journals")),
+            mock.patch.object(TextIndex, "_shared", self.index),
+            mock.patch.object(DocumentLibrary, "_shared", self.library)
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.path = os.path.join(self.tmp_dir.name, "doc.pdf")
+        doc = fitz.open()
+        for _ in range(3):
+            doc.new_page(width=400, height=600)
+        doc.save(self.path)
+        doc.close()
+        self.viewer = PDFViewer()
+        self.viewer.set_document(fitz.open(self.path))
+
+    def tearDown(self):
+        self.viewer.cancel_indexing()
+        index_pool().waitForDone()
+        self.viewer.close_journal()
+        self.viewer.doc.close()
+        self.index.close()
+        self.library.close()
+        self.tmp_dir.cleanup()
+        self.assertEqual(app_data_state(), self.app_data)
+
+    def _draw(self, uid):
+        data = {"points": [(20.0, 40.0), (120.0, 140.0)], "color": "#ff0000ff", "width": 4, "id": uid}
+        self.viewer.scene.load_strokes([data])
+        self.viewer.scene.strokeCreated.emit(data)
+
+    def _ink_pages(self):
+        return [page.number for page in self.viewer.doc if list(page.annots())]
+
+    def test_untouched_document_is_not_rewritten(self):
+        self.viewer.set_page(1)
+        self.viewer.set_page(0)
+        signature = os.stat(self.path).st_mtime_ns, os.path.getsize(self.path)
+
+        self.assertFalse(self.viewer.has_unsaved_changes())
+        self.viewer.save_annotations()
+        self.viewer.flush_saves()
+        self.assertEqual((os.stat(self.path).st_mtime_ns, os.path.getsize(self.path)), signature)
+
+    def test_only_dirty_pages_are_saved(self):
+        self.viewer.set_page(2)
+        self._draw("a")
+        self.viewer.set_page(0)
+        self.assertEqual(list(self.viewer.dirty_pages), [2])
+
+        self.viewer.save_annotations()
+        self.assertEqual([p.page_num for p in self.viewer._save_snapshot.pages], [2])
+        self.viewer.flush_saves()
+        self.assertEqual(self._ink_pages(), [2])
+        self.assertFalse(self.viewer.has_unsaved_changes())
+
+    def test_undo_marks_page_dirty(self):
+        self._draw("a")
+        self.viewer.save_annotations()
+        self.viewer.flush_saves()
+
+        self.viewer.undo_manager.undo()
+        self.assertTrue(self.viewer.has_unsaved_changes())
+        self.viewer.save_annotations()
+        self.viewer.flush_saves()
+        self.assertEqual(self._ink_pages(), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+from PyQt6.QtCore import QEvent
+from PyQt6.QtWidgets import QApplication, QGraphicsView
+from src.frontend.gestures.base_gesture import BaseGesture
+from src.frontend.gestures.gesture_manager import GestureManager
+
+app = QApplication.instance() or QApplication([])
+
+class DragGesture(BaseGesture):
+    """Takes presses, and the moves and release that follow them."""
+    def __init__(self, log, name):
+        self.log = log
+        self.name = name
+        self.dragging = False
+
+    def gesture_types(self):
+        return []
+
+    def event_types(self):
+        return [QEvent.Type.MouseButtonPress, QEvent.Type.MouseMove, QEvent.Type.MouseButtonRelease]
+
+    def claims(self):
+        return self.dragging
+
+    def handle_event(self, event, view):
+        self.log.append(self.name)
+        if event.type() == QEvent.Type.MouseButtonPress:
+            self.dragging = True
+        elif event.type() == QEvent.Type.MouseButtonRelease:
+            self.dragging = False
+        return self.dragging or event.type() == QEvent.Type.MouseButtonRelease
+
+class HoverGesture(DragGesture):
+    def event_types(self):
+        return [QEvent.Type.MouseMove]
+
+    def handle_event(self, event, view):
+        self.log.append(self.name)
+        return False
+
+class TestGestureManager(unittest.TestCase):
+    def setUp(self):
+        self.view = QGraphicsView()
+        self.log = []
+        self.manager = GestureManager(self.view)
+        self.manager.register_gesture(HoverGesture(self.log, "hover"))
+        self.manager.register_gesture(DragGesture(self.log, "drag"))
+        self.manager.freeze()
+
+    def _send(self, event_type):
+        return self.manager.dispatch_event(QEvent(event_type))
+
+    def test_claimed_interaction_goes_to_its_owner(self):
+        self.assertFalse(self._send(QEvent.Type.MouseMove))
+        self.assertEqual(self.log, ["hover", "drag"]) # Whole chain, in registration order
+
+        self.log.clear()
+        self.assertTrue(self._send(QEvent.Type.MouseButtonPress))
+        self.assertTrue(self._send(QEvent.Type.MouseMove))
+        self.assertTrue(self._send(QEvent.Type.MouseButtonRelease))
+        self.assertEqual(self.log, ["drag", "drag", "drag"]) # Hover skipped during the drag
+
+        # The claim ends with the release
+        self.log.clear()
+        self._send(QEvent.Type.MouseMove)
+        self.assertEqual(self.log, ["hover", "drag"])
+
+    def test_frozen_table(self):
+        self.assertFalse(self._send(QEvent.Type.KeyPress))
+        with self.assertRaises(RuntimeError):
+            self.manager.register_gesture(HoverGesture(self.log, "late"))
+
+if __name__ == '__main__':
+    unittest.main()
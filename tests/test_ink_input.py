@@ -0,0 +1,79 @@
+import unittest
+from PyQt6.QtCore import QPointF
+from PyQt6.QtTest import QTest
+from PyQt6.QtWidgets import QApplication, QGraphicsView
+from src.frontend.ink_canvas import InkCanvas
+from src.frontend.ink_input import TabletSampleBuffer
+
+app = QApplication.instance() or QApplication([])
+
+class TestTabletSampleBuffer(unittest.TestCase):
+    def setUp(self):
+        self.scene = InkCanvas()
+        self.view = QGraphicsView(self.scene)
+        self.view.resize(400, 400)
+        self.view.scale(2, 2)
+        self.flushes = []
+        self.buffer = TabletSampleBuffer(self.view, self.on_flush)
+
+    def on_flush(self, points, pressures, timestamps):
+        self.flushes.append(len(points))
+        self.scene.extend_stroke(points, pressures, timestamps)
+
+    def test_samples_reach_the_stroke_in_one_batch(self):
+        self.buffer.begin()
+        self.scene.is_drawing = True
+        self.scene.start_stroke(self.buffer.map_to_scene(QPointF(10, 10)), 0.5)
+        for i in range(1, 41):
+            self.buffer.add_sample(QPointF(10 + i * 0.5, 10), 0.5, i)
+        self.assertEqual(self.flushes, []) # Nothing until the frame ends
+        self.buffer.flush()
+        self.assertEqual(self.flushes, [40])
+        self.assertEqual(self.buffer.last_timestamp, 40)
+
+        captured = []
+        self.scene.strokeCreated.connect(captured.append)
+        self.scene.end_stroke(QPointF(), 0.5)
+        points = captured[0]["points"]
+        self.assertEqual(len(points), 41) # Every sample is kept
+        # Mapped through the view's zoom, without rounding to whole pixels
+        start = self.view.mapToScene(0, 0)
+        self.assertAlmostEqual(points[1][0] - start.x(), 10.5 / 2)
+
+    def test_prediction_is_drawn_but_never_committed(self):
+        self.scene.predictor.horizon_ms = 12
+        self.buffer.begin()
+        self.scene.is_drawing = True
+        self.scene.start_stroke(self.buffer.map_to_scene(QPointF(10, 10)), 0.5)
+        # Steady motion, one sample every 4 ms, flushed once per 16 ms frame
+        for i in range(1, 21):
+            self.buffer.add_sample(QPointF(10 + i * 2, 10), 0.5, i * 4)
+            if i % 4 == 0:
+                self.buffer.flush()
+
+        # Ahead of the last real sample, along the motion
+        last = self.buffer.map_to_scene(QPointF(50, 10))
+        predicted = self.scene._prediction_path.currentPosition()
+        self.assertAlmostEqual(predicted.x() - last.x(), 12 * 2 / 4 / 2, places=3) # 12 ms at 0.5 px/ms, in scene units
+        self.assertAlmostEqual(predicted.y(), last.y(), places=3)
+        # Real samples land where the previous predictions put them
+        error = self.scene.predictor.error.summary()
+        self.assertGreater(error["count"], 0)
+        self.assertLess(error["p95"], 0.01)
+
+        captured = []
+        self.scene.strokeCreated.connect(captured.append)
+        self.scene.end_stroke(QPointF(), 0.5)
+        self.assertIsNone(self.scene._prediction_path)
+        self.assertEqual(len(captured[0]["points"]), 21) # Real samples only
+        self.assertEqual(len(self.scene.get_strokes()), 1)
+
+    def test_flush_follows_the_frame_timer(self):
+        self.buffer.begin()
+        self.buffer.add_sample(QPointF(1, 1), 1.0, 1)
+        self.buffer.add_sample(QPointF(2, 2), 1.0, 2)
+        QTest.qWait(100)
+        self.assertEqual(self.flushes, [2])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QPointF
+from PyQt6.QtGui import QImage, QColor
+from src.frontend.ink_journal import InkJournal, journal_path_for
+
+app = QApplication.instance() or QApplication([])
+
+class TestInkJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.doc_path = os.path.join(self.tmp_dir.name, "doc.pdf")
+        with open(self.doc_path, "wb") as f:
+            f.write(b"%PDF-1.7 placeholder")
+        self.journal_path = os.path.join(self.tmp_dir.name, "doc.jsonl")
+        self.journal = InkJournal(self.doc_path, self.journal_path)
+
+    def tearDown(self):
+        self.journal.close()
+        self.tmp_dir.cleanup()
+
+    def _stroke(self, uid, x=0):
+        return {"points": [(x, 0), (x + 10, 10)], "color": "#ff000000", "width": 2, "id": uid}
+
+    def test_replay_strokes_moves_and_erases(self):
+        self.journal.record_stroke(0, self._stroke("a"))
+        self.journal.record_stroke(0, self._stroke("b", 50))
+        self.journal.record_stroke(3, self._stroke("c"))
+        self.journal.record_move(0, [{"id": "a", "offset": QPointF(5, 5)}])
+        self.journal.record_erase(0, ["b"])
+        self.journal.close()
+
+        cache = InkJournal.replay(self.doc_path, self.journal_path)
+        self.assertEqual(sorted(cache), [0, 3])
+        self.assertEqual([s["id"] for s in cache[0]["strokes"]], ["a"])
+        self.assertEqual(cache[0]["strokes"][0]["points"], [(5, 5), (15, 15)])
+        self.assertFalse(cache[0]["strokes"][0]["saved"])
+
+    def test_replay_images(self):
+        image = QImage(4, 4, QImage.Format.Format_ARGB32)
+        image.fill(QColor("blue"))
+        self.journal.record_image(1, {"image": image, "x": 1.0, "y": 2.0, "width": 4, "height": 4, "id": "img"})
+        self.journal.close()
+
+        cache = InkJournal.replay(self.doc_path, self.journal_path)
+        restored = cache[1]["images"][0]
+        self.assertEqual(restored["image"].size(), image.size())
+        self.assertEqual((restored["x"], restored["y"]), (1.0, 2.0))
+
+    def test_truncate_and_torn_tail(self):
+        self.journal.record_stroke(0, self._stroke("a"))
+        self.journal.truncate()
+        self.journal.record_stroke(0, self._stroke("b"))
+        self.journal.close()
+
+        with open(self.journal_path, "a") as f:
+            f.write('{"op": "stroke", "page": 0, "da') # Crash mid-write
+
+        cache = InkJournal.replay(self.doc_path, self.journal_path)
+        self.assertEqual([s["id"] for s in cache[0]["strokes"]], ["b"])
+
+    def test_truncate_to_checkpoint_keeps_later_records(self):
+        self.journal.record_stroke(0, self._stroke("saved"))
+        token = self.journal.checkpoint() # Snapshot taken by a background save
+        self.journal.record_stroke(0, self._stroke("drawn-during-save"))
+        self.journal.truncate(token)
+        self.journal.close()
+
+        cache = InkJournal.replay(self.doc_path, self.journal_path)
+        self.assertEqual([s["id"] for s in cache[0]["strokes"]], ["drawn-during-save"])
+
+    def test_journal_file_exists_only_while_it_has_records(self):
+        self.assertFalse(os.path.exists(self.journal_path))
+        token = self.journal.checkpoint() # Save started before anything was journaled
+        self.journal.record_stroke(0, self._stroke("drawn-during-save"))
+        self.journal.flush()
+        self.assertTrue(os.path.exists(self.journal_path))
+
+        self.journal.truncate(token)
+        self.journal.flush()
+        cache = InkJournal.replay(self.doc_path, self.journal_path)
+        self.assertEqual([s["id"] for s in cache[0]["strokes"]], ["drawn-during-save"])
+
+        # A save covering everything deletes the journal
+        self.journal.truncate(self.journal.checkpoint())
+        self.journal.flush()
+        self.assertFalse(os.path.exists(self.journal_path))
+        self.journal.close()
+        self.assertFalse(os.path.exists(self.journal_path))
+
+    def test_journals_dir_is_configurable(self):
+        with mock.patch("src.frontend.ink_journal.JOURNALS_DIR", self.tmp_dir.name):
+            path = journal_path_for(self.doc_path)
+        self.assertEqual(os.path.dirname(path), self.tmp_dir.name)
+        self.assertEqual(journal_path_for(self.doc_path, "elsewhere"), os.path.join("elsewhere", os.path.basename(path)))
+
+    def test_stale_journal_is_ignored(self):
+        self.journal.record_stroke(0, self._stroke("a"))
+        self.journal.close()
+
+        # Document saved (rewritten) after the journal was started
+        with open(self.doc_path, "wb") as f:
+            f.write(b"%PDF-1.7 saved with more bytes")
+
+        self.assertEqual(InkJournal.replay(self.doc_path, self.journal_path), {})
+
+    def test_replay_over_ink_in_file(self):
+        self.journal.record_erase(0, ["in-file-a"])
+        self.journal.record_move(0, [{"id": "in-file-b", "offset": QPointF(1, 1)}])
+        self.journal.close()
+
+        def load_page(page_num):
+            strokes = [dict(self._stroke(uid), saved=True) for uid in ("in-file-a", "in-file-b")]
+            return {"strokes": strokes, "images": [], "pdf_ids": ["in-file-a", "in-file-b"]}
+
+        cache = InkJournal.replay(self.doc_path, self.journal_path, load_page=load_page)
+        self.assertEqual([s["id"] for s in cache[0]["strokes"]], ["in-file-b"])
+        self.assertFalse(cache[0]["strokes"][0]["saved"])
+        self.assertEqual(cache[0]["pdf_ids"], ["in-file-a", "in-file-b"])
+
+if __name__ == '__main__':
+    unittest.main()
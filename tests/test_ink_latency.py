@@ -0,0 +1,56 @@
+import json
+import os
+import tempfile
+import unittest
+from PyQt6.QtCore import QPointF
+from PyQt6.QtWidgets import QApplication, QGraphicsView
+from src.frontend.ink_canvas import InkCanvas
+from src.frontend.ink_input import TabletSampleBuffer
+from src.frontend.ink_latency import InkLatencyTracker, LatencyHistogram
+
+app = QApplication.instance() or QApplication([])
+
+class TestInkLatency(unittest.TestCase):
+    def test_histogram_percentiles_over_a_rolling_window(self):
+        histogram = LatencyHistogram(window=100)
+        for value in range(1, 201):
+            histogram.add(float(value))
+        summary = histogram.summary()
+        self.assertEqual(summary["count"], 100) # Only the last 100 values
+        self.assertEqual((summary["p50"], summary["p95"], summary["p99"], summary["max"]), (151.0, 196.0, 200.0, 200.0))
+        self.assertEqual(histogram.count, 200)
+
+    def test_samples_are_timed_through_flush_and_paint(self):
+        tracker = InkLatencyTracker()
+        scene = InkCanvas()
+        buffer = TabletSampleBuffer(QGraphicsView(scene), lambda points, pressures, timestamps: None, tracker)
+
+        buffer.add_sample(QPointF(1, 1), 1.0, 100) # Disabled: not timed
+        buffer.flush()
+        tracker.on_painted()
+        self.assertEqual(tracker.to_paint.count, 0)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "logs", "latency.jsonl")
+            tracker.set_enabled(True)
+            tracker.start_recording(path)
+            for timestamp in (101, 102, 103):
+                buffer.add_sample(QPointF(1, 1), 1.0, timestamp)
+            buffer.flush()
+            self.assertEqual((tracker.to_flush.count, tracker.to_paint.count), (3, 0))
+            tracker.on_painted()
+            tracker.on_painted() # Nothing new to show
+            self.assertEqual(tracker.to_paint.count, 3)
+            with open(path, "r", encoding="utf-8") as f:
+                self.assertNotIn("event_ts", f.read()) # Buffered until the recording stops
+            self.assertEqual(tracker.stop_recording(), path)
+
+            with open(path, "r", encoding="utf-8") as f:
+                lines = [json.loads(line) for line in f]
+        self.assertIn("header", lines[0])
+        self.assertEqual([line["event_ts"] for line in lines[1:4]], [101, 102, 103])
+        self.assertLessEqual(lines[1]["to_flush_ms"], lines[1]["to_paint_ms"])
+        self.assertEqual(lines[4]["summary"]["to_paint"]["count"], 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+import fitz
+from PyQt6.QtCore import QEvent, QPointF, Qt
+from PyQt6.QtGui import QInputDevice, QPointingDevice, QTabletEvent
+from PyQt6.QtWidgets import QApplication
+from src.frontend.pdf_viewer import PDFViewer
+from src.frontend.input_recording import (InputRecorder, save_recording, load_recording, prepare_viewer,
+                                          replay_recording, scene_checksum)
+
+app = QApplication.instance() or QApplication([])
+
+PEN = QPointingDevice("test pen", 77, QInputDevice.DeviceType.Stylus, QPointingDevice.PointerType.Pen,
+                      QInputDevice.Capability.Position | QInputDevice.Capability.Pressure, 1, 3)
+
+def make_viewer():
+    doc = fitz.open()
+    doc.new_page(width=300, height=400)
+    viewer = PDFViewer()
+    viewer.set_document(doc, is_new_file=True)
+    viewer.resize(500, 600)
+    viewer.show()
+    return viewer
+
+class TestInputRecording(unittest.TestCase):
+    def setUp(self):
+        self.viewers = []
+
+    def tearDown(self):
+        for viewer in self.viewers:
+            viewer.close_journal()
+            viewer.doc.close()
+            viewer.close()
+
+    def _viewer(self):
+        viewer = make_viewer()
+        self.viewers.append(viewer)
+        return viewer
+
+    def _pen(self, viewer, event_type, x, y):
+        button = Qt.MouseButton.NoButton if event_type == QEvent.Type.TabletMove else Qt.MouseButton.LeftButton
+        event = QTabletEvent(event_type, PEN, QPointF(x, y), QPointF(x, y), 0.6, 0.0, 0.0, 0.0, 0.0, 0.0,
+                             Qt.KeyboardModifier.NoModifier, button, Qt.MouseButton.LeftButton)
+        QApplication.sendEvent(viewer.viewport(), event)
+
+    def test_recorded_session_replays_to_the_same_ink(self):
+        viewer = self._viewer()
+        recorder = InputRecorder(viewer)
+        recorder.start()
+        for stroke in range(2):
+            y = 100 + stroke * 50
+            self._pen(viewer, QEvent.Type.TabletPress, 50, y)
+            for i in range(1, 30):
+                self._pen(viewer, QEvent.Type.TabletMove, 50 + i * 3, y + i % 5)
+            self._pen(viewer, QEvent.Type.TabletRelease, 140, y)
+        recording = recorder.stop()
+        self.assertIsNone(viewer.gesture_manager.recorder)
+        self.assertEqual(len(recording["events"]), 62)
+        self.assertEqual(len(viewer.scene.get_strokes()), 2)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "session.inkrec")
+            save_recording(recording, path)
+            recording = load_recording(path)
+
+        replayed = self._viewer()
+        prepare_viewer(replayed, recording["header"])
+        result = replay_recording(replayed, recording)
+        self.assertEqual(result["events"], 62)
+        self.assertEqual(result["strokes"], 2)
+        self.assertEqual(result["checksum"], scene_checksum(viewer.scene))
+        self.assertEqual(result["event_cost_ms"]["TabletMove"]["count"], 58)
+        self.assertGreater(result["frame_ms"]["count"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
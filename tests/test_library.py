@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+import fitz
+from src.frontend.library import DocumentLibrary, render_thumbnail
+
+class TestDocumentLibrary(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.library = DocumentLibrary(os.path.join(self.tmp_dir.name, "study_data.db"))
+
+    def tearDown(self):
+        self.library.close()
+        self.tmp_dir.cleanup()
+
+    def _make_pdf(self, name, pages=3):
+        path = os.path.join(self.tmp_dir.name, name)
+        doc = fitz.open()
+        for _ in range(pages):
+            doc.new_page(width=200, height=300)
+        doc.save(path)
+        doc.close()
+        return path
+
+    def test_wal_mode(self):
+        mode = self.library._execute("PRAGMA journal_mode")[0][0]
+        self.assertEqual(mode, "wal")
+
+    def test_reading_state_persists(self):
+        path = self._make_pdf("a.pdf")
+        self.library.record_open(path, 3)
+        self.library.record_page(path, 2)
+        self.library.close()
+
+        self.library = DocumentLibrary(os.path.join(self.tmp_dir.name, "study_data.db"))
+        self.assertEqual(self.library.last_page(path), 2)
+        self.assertEqual(self.library.get_document(path)["TotalPages"], 3)
+        self.assertEqual(self.library.last_page(os.path.join(self.tmp_dir.name, "unknown.pdf")), 0)
+
+    def test_list_is_paged_most_recent_first(self):
+        paths = [self._make_pdf(f"{i}.pdf", 1) for i in range(5)]
+        for path in paths:
+            self.library.record_open(path, 1)
+        self.assertEqual(self.library.count(), 5)
+        first = [row["FilePath"] for row in self.library.list_documents(2)]
+        rest = [row["FilePath"] for row in self.library.list_documents(-1, 2)]
+        self.assertEqual(first + rest, list(reversed(paths)))
+
+    def test_thumbnail_follows_file_version(self):
+        path = self._make_pdf("a.pdf")
+        self.library.record_open(path, 3)
+        thumbnail = self.library.thumbnail_path(self.library.get_document(path))
+        render_thumbnail(path, thumbnail)
+        self.assertTrue(os.path.exists(thumbnail))
+
+        # Same version: same key, no re-render needed
+        self.library.record_saved(path)
+        self.assertEqual(self.library.thumbnail_path(self.library.get_document(path)), thumbnail)
+
+        # New version: new key, stale thumbnail removed
+        doc = fitz.open(path)
+        doc.new_page()
+        doc.saveIncr()
+        doc.close()
+        self.library.record_saved(path)
+        self.assertNotEqual(self.library.thumbnail_path(self.library.get_document(path)), thumbnail)
+        self.assertFalse(os.path.exists(thumbnail))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import fitz
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtGui import QColor
+from src.frontend.annotation_writer import take_snapshot, write_snapshot
+from src.frontend.cache_pool import CachePool
+from src.frontend.library import DocumentLibrary, render_page_thumbnails, PAGE_THUMBNAIL_WIDTH
+from src.frontend.text_index import TextIndex
+from src.frontend.pdf_viewer import PDFViewer
+from src.frontend.modules.thumbnail_sidebar_module import PageThumbnailModel, UNSAVED_MARK
+
+app = QApplication.instance() or QApplication([])
+
+class CollectPartial:
+    """Stands in for a BackgroundJob: keeps what the worker reports."""
+    cancelled = False
+
+    def __init__(self):
+        self.results = []
+
+    def report_partial(self, value):
+        self.results.append(value)
+
+class TestPageThumbnails(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(self.tmp_dir.name, "study_data.db")
+        self.index = TextIndex(db_path)
+        self.library = DocumentLibrary(db_path)
+        for patcher in (
+            mock.patch("src.frontend.ink_journal.JOURNALS_DIR", os.path.join(self.tmp_dir.name, "journals")),
+            mock.patch.object(TextIndex, "_shared", self.index),
+            mock.patch.object(DocumentLibrary, "_shared", self.library)
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.cache_dir = os.path.join(self.tmp_dir.name, "pages")
+        self.path = os.path.join(self.tmp_dir.name, "doc.pdf")
+        doc = fitz.open()
+        for _ in range(3):
+            doc.new_page(width=400, height=600)
+        doc.save(self.path)
+        doc.close()
+
+    def tearDown(self):
+        self.index.close()
+        self.library.close()
+        self.tmp_dir.cleanup()
+
+    def test_rendered_once_into_the_disk_cache(self):
+        job = CollectPartial()
+        digest = render_page_thumbnails(self.path, [2, 0, 7], self.cache_dir, job=job)
+        self.assertEqual([page_num for page_num, _ in job.results], [2, 0]) # Page 7 does not exist
+        self.assertEqual(job.results[0][1].width(), PAGE_THUMBNAIL_WIDTH)
+
+        png_path = os.path.join(self.cache_dir, digest, "2.png")
+        mtime = os.stat(png_path).st_mtime_ns
+        job = CollectPartial()
+        render_page_thumbnails(self.path, [2], self.cache_dir, job=job)
+        self.assertEqual(os.stat(png_path).st_mtime_ns, mtime)
+        self.assertFalse(job.results[0][1].isNull())
+
+    def test_saved_ink_is_shown(self):
+        job = CollectPartial()
+        digest = render_page_thumbnails(self.path, [0, 1], self.cache_dir, job=job)
+        blank = job.results[0][1]
+        stroke = {"points": [(0.0, 0.0), (800.0, 1200.0)], "color": "#ff0000ff", "width": 40, "id": "a"}
+        write_snapshot(take_snapshot({0: {"strokes": [stroke]}}, self.path, 2.0))
+
+        job = CollectPartial()
+        self.assertEqual(render_page_thumbnails(self.path, [0, 1], self.cache_dir, job=job), digest)
+        inked = job.results[0][1]
+        center = (inked.width() // 2, inked.height() // 2)
+        self.assertEqual(blank.pixelColor(*center), QColor("white"))
+        self.assertNotEqual(inked.pixelColor(*center), QColor("white"))
+        # Page 0 has its ink version only, page 1 is still the first render
+        self.assertEqual(len([name for name in os.listdir(os.path.join(self.cache_dir, digest)) if name.startswith("0")]), 1)
+        self.assertEqual(sorted(os.listdir(os.path.join(self.cache_dir, digest)))[-1], "1.png")
+
+    def test_saved_pages_are_rendered_again(self):
+        viewer = PDFViewer()
+        viewer.set_document(fitz.open(self.path))
+        viewer.cancel_indexing()
+        model = PageThumbnailModel(viewer)
+        for row in (0, 1):
+            model.cache_pool.put(model, row, "thumbnail", 1)
+        data = {"points": [(20.0, 40.0), (120.0, 140.0)], "color": "#ff0000ff", "width": 4, "id": "a"}
+        viewer.scene.load_strokes([data])
+        viewer.scene.strokeCreated.emit(data)
+        viewer.save_annotations()
+        viewer.flush_saves()
+        self.assertIsNone(CachePool.shared().get(model, 0))
+        self.assertEqual(CachePool.shared().get(model, 1), "thumbnail")
+        model.release()
+        viewer.close_journal()
+        viewer.doc.close()
+
+    def test_unsaved_marker(self):
+        viewer = PDFViewer()
+        viewer.set_document(fitz.open(self.path))
+        viewer.cancel_indexing()
+        model = PageThumbnailModel(viewer)
+        self.assertEqual(model.rowCount(), 3)
+        self.assertEqual(model.data(model.index(1)), "2")
+
+        viewer.set_page(1)
+        viewer.mark_dirty(["stroke"])
+        self.assertEqual(model.data(model.index(1)), "2" + UNSAVED_MARK)
+
+        viewer.add_new_page()
+        self.assertEqual(model.rowCount(), 4)
+        self.assertEqual(model.data(model.index(3)), "4" + UNSAVED_MARK)
+        model.release()
+        viewer.close_journal()
+        viewer.doc.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+import fitz
+import numpy as np
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtGui import QImage, QColor
+from src.frontend.page_transform import PageTransform
+from src.frontend.annotation_writer import (
+    AnnotationSnapshot, PageRecord, StrokeRecord, ImageRecord, apply_snapshot
+)
+
+app = QApplication.instance() or QApplication([])
+
+ZOOM = 2.0
+
+class TestPageTransform(unittest.TestCase):
+    def _page(self, rotation=0, cropbox=None):
+        doc = fitz.open()
+        page = doc.new_page(width=400, height=600)
+        if cropbox:
+            page.set_cropbox(fitz.Rect(*cropbox))
+        page.set_rotation(rotation)
+        return doc, page
+
+    def _cases(self):
+        for rotation in (0, 90, 180, 270):
+            for cropbox in (None, (50, 100, 350, 500)):
+                yield rotation, cropbox
+
+    def test_round_trip(self):
+        points = np.array([[0, 0], [120.5, 33.25], [400, 10]])
+        for rotation, cropbox in self._cases():
+            doc, page = self._page(rotation, cropbox)
+            transform = PageTransform.for_page(page, ZOOM)
+            back = transform.pdf_to_scene(transform.scene_to_pdf(points))
+            np.testing.assert_allclose(back, points, atol=1e-9)
+
+    def test_round_trip_at_every_zoom(self):
+        points = np.array([[0, 0], [77.125, 301.5], [399.75, 599.5]])
+        for zoom in (0.5, 1.0, 1.75, 3.0):
+            for rotation, cropbox in self._cases():
+                doc, page = self._page(rotation, cropbox)
+                transform = PageTransform.for_page(page, zoom)
+                context = f"zoom={zoom} rotation={rotation} crop={cropbox}"
+                np.testing.assert_allclose(
+                    transform.pdf_to_scene(transform.scene_to_pdf(points)), points, atol=1e-9, err_msg=context
+                )
+                rect = transform.pdf_rect_to_scene(transform.scene_rect_to_pdf(12.5, 40.0, 100.0, 33.0))
+                np.testing.assert_allclose(
+                    (rect.x(), rect.y(), rect.width(), rect.height()), (12.5, 40.0, 100.0, 33.0), atol=1e-9, err_msg=context
+                )
+
+    def test_matches_pymupdf_geometry(self):
+        for rotation, cropbox in self._cases():
+            doc, page = self._page(rotation, cropbox)
+            transform = PageTransform.for_page(page, ZOOM)
+            # Scene origin is the top-left of the displayed (rotated) page
+            expected = fitz.Point(0, 0) * page.derotation_matrix
+            np.testing.assert_allclose(transform.scene_to_pdf((0, 0))[0], (expected.x, expected.y), atol=1e-9)
+            # Page space -> user space agrees with PyMuPDF wherever it is correct
+            if not rotation:
+                np.testing.assert_allclose(
+                    transform.scene_to_user_space((10, 20))[0],
+                    tuple(fitz.Point(5, 10) * ~page.transformation_matrix), atol=1e-9
+                )
+
+    def test_ink_lands_on_rotated_cropped_page(self):
+        for rotation, cropbox in self._cases():
+            doc, page = self._page(rotation, cropbox)
+            stroke = StrokeRecord("s1", ((20.0, 40.0), (120.0, 140.0)), "#ff000000", 2)
+            apply_snapshot(doc, AnnotationSnapshot(path="", zoom_level=ZOOM, pages=(PageRecord(0, (stroke,)),)))
+
+            annot = doc[0].first_annot
+            scene = PageTransform.for_page(doc[0], ZOOM).pdf_to_scene(annot.vertices)
+            np.testing.assert_allclose(scene, stroke.points, atol=1e-3, err_msg=f"rotation={rotation} crop={cropbox}")
+
+    def test_image_lands_on_rotated_cropped_page(self):
+        image = QImage(10, 10, QImage.Format.Format_RGB32)
+        image.fill(QColor("red"))
+        for rotation, cropbox in self._cases():
+            doc, page = self._page(rotation, cropbox)
+            record = ImageRecord("i1", image, 60, 120, 40, 40)
+            apply_snapshot(doc, AnnotationSnapshot(path="", zoom_level=ZOOM, pages=(PageRecord(0, (), (record,)),)))
+
+            pix = doc[0].get_pixmap(matrix=fitz.Matrix(ZOOM, ZOOM))
+            # Centre of the placed image is red, a point outside it is white
+            self.assertEqual(pix.pixel(80, 140), (255, 0, 0), f"rotation={rotation} crop={cropbox}")
+            self.assertEqual(pix.pixel(20, 20), (255, 255, 255), f"rotation={rotation} crop={cropbox}")
+
+if __name__ == '__main__':
+    unittest.main()
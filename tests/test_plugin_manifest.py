@@ -0,0 +1,123 @@
+import os
+import sys
+import tempfile
+import textwrap
+import unittest
+from PyQt6.QtCore import QEvent
+from PyQt6.QtWidgets import QApplication, QMainWindow
+from src.frontend.plugin_manifest import PluginManifest, LazyModule, LazyGesture, scan_plugin_file
+
+app = QApplication.instance() or QApplication([])
+
+LAZY_MODULE = '''
+from PyQt6.QtGui import QAction
+from src.frontend.modules.base_module import BaseModule
+
+class HelloModule(BaseModule):
+    @property
+    def priority(self):
+        return 7
+
+    def get_actions(self):
+        hello_action = QAction("Hello", self.main_window)
+        hello_action.setToolTip("Say hello")
+        hello_action.triggered.connect(self.say_hello)
+        return [hello_action]
+
+    def say_hello(self):
+        self.main_window.greeted = True
+'''
+
+EAGER_MODULE = '''
+from src.frontend.modules.base_module import BaseModule
+
+class WidgetModule(BaseModule):
+    def get_actions(self):
+        return [self.build_widget()]
+
+class HookModule(BaseModule):
+    def get_actions(self):
+        return []
+
+    def init_ui(self):
+        pass
+'''
+
+GESTURE = '''
+from PyQt6.QtCore import QEvent, Qt
+from src.frontend.gestures.base_gesture import BaseGesture
+
+class TapGesture(BaseGesture):
+    def gesture_types(self):
+        return [Qt.GestureType.TapGesture]
+
+    def event_types(self):
+        return [QEvent.Type.MouseButtonPress]
+
+    def handle_event(self, event, view):
+        return True
+'''
+
+class TestPluginManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def _write(self, name, source):
+        path = os.path.join(self.tmp_dir.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(textwrap.dedent(source))
+        return path
+
+    def test_scan_modules(self):
+        entry, = scan_plugin_file(self._write("hello.py", LAZY_MODULE), "BaseModule")
+        self.assertEqual(entry["class"], "HelloModule")
+        self.assertEqual(entry["priority"], 7)
+        self.assertEqual(entry["actions"], [{"label": "Hello", "tooltip": "Say hello", "method": "say_hello"}])
+        self.assertTrue(entry["lazy"])
+
+        widget, hook = scan_plugin_file(self._write("eager.py", EAGER_MODULE), "BaseModule")
+        self.assertFalse(widget["lazy"]) # Builds widgets in get_actions
+        self.assertFalse(hook["lazy"]) # Has init_ui
+        self.assertEqual(widget["priority"], 100)
+
+    def test_cache_is_invalidated_by_mtime(self):
+        path = self._write("hello.py", LAZY_MODULE)
+        cache_path = os.path.join(self.tmp_dir.name, "manifest.json")
+        manifest = PluginManifest(cache_path)
+        manifest.entries(path, "BaseModule")
+        manifest.save()
+
+        cached = PluginManifest(cache_path)
+        self.assertEqual(cached.entries(path, "BaseModule")[0]["priority"], 7)
+        self.assertFalse(cached._changed) # Served from the cache
+
+        self._write("hello.py", LAZY_MODULE.replace("return 7", "return 8"))
+        os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 10**9))
+        self.assertEqual(cached.entries(path, "BaseModule")[0]["priority"], 8)
+
+    def test_lazy_proxies_load_on_first_use(self):
+        path = self._write("hello.py", LAZY_MODULE)
+        window = QMainWindow()
+        window.pdf_viewer = None
+        module = LazyModule(window, path, scan_plugin_file(path, "BaseModule")[0])
+        action, = module.get_actions()
+        self.assertEqual((action.text(), action.toolTip()), ("Hello", "Say hello"))
+        self.assertIsNone(module.instance)
+        action.trigger()
+        self.assertTrue(window.greeted)
+        self.assertEqual(type(module.instance).__name__, "HelloModule")
+
+        path = self._write("tap.py", GESTURE)
+        gesture = LazyGesture(path, scan_plugin_file(path, "BaseGesture")[0])
+        self.assertEqual(gesture.event_types(), [QEvent.Type.MouseButtonPress])
+        self.assertIsNone(gesture.gesture)
+        self.assertTrue(gesture.handle_event(None, None))
+        self.assertEqual(type(gesture.gesture).__name__, "TapGesture")
+
+    def tearDown(self):
+        for name in ("hello", "tap"):
+            sys.modules.pop(name, None)
+        self.tmp_dir.cleanup()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import tempfile
+import time
+import unittest
+from src.frontend.sampling_profiler import SamplingProfiler
+
+def busy_render(duration_s):
+    end = time.perf_counter() + duration_s
+    while time.perf_counter() < end:
+        sum(range(100))
+
+class TestSamplingProfiler(unittest.TestCase):
+    def test_samples_our_functions(self):
+        profiler = SamplingProfiler(interval_ms=2)
+        self.assertFalse(profiler.running)
+        profiler.start()
+        self.assertTrue(profiler.running)
+        busy_render(0.2)
+        profiler.stop()
+        self.assertFalse(profiler.running)
+
+        self.assertGreater(profiler.samples, 0)
+        label = "busy_render (tests/test_sampling_profiler.py)"
+        self.assertTrue(any(stack.endswith(label) or f"{label};" in stack for stack in profiler.stacks))
+        # Weights are the time between samples, so they add up to about the profiled time
+        self.assertLessEqual(sum(profiler.stacks.values()) / 1000, profiler.duration_ms + 1)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "profiles", "profile.folded")
+            profiler.write_folded(path)
+            with open(path, "r", encoding="utf-8") as f:
+                lines = f.read().splitlines()
+        self.assertTrue(lines)
+        for line in lines:
+            stack, weight = line.rsplit(" ", 1)
+            self.assertIn(";", stack)
+            self.assertGreater(int(weight), 0)
+
+    def test_hot_functions(self):
+        profiler = SamplingProfiler()
+        profiler.stacks.update({
+            "main (main_window.py);PDFViewer.render_page (src/frontend/pdf_viewer.py);get_pixmap (fitz.py)": 30000,
+            "main (main_window.py);InkCanvas.extend_stroke (src/frontend/ink_canvas.py)": 10000,
+            "main (main_window.py)": 60000
+        })
+        hot = profiler.hot_functions()
+        self.assertEqual(hot[0], ("PDFViewer.render_page (src/frontend/pdf_viewer.py)", 30.0, 30.0))
+        self.assertEqual([label for label, _, _ in hot][1], "InkCanvas.extend_stroke (src/frontend/ink_canvas.py)")
+        self.assertEqual(len(hot), 2) # Only our own code
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+import fitz
+from PyQt6.QtWidgets import QApplication
+from src.frontend.annotation_writer import take_snapshot, write_snapshot, compact_pdf, load_ink_strokes
+from src.frontend.pdf_viewer import PDFViewer
+from src.frontend.text_index import TextIndex, index_pool
+from src.frontend.background_jobs import fitz_lock
+
+app = QApplication.instance() or QApplication([])
+
+ZOOM = 2.0
+
+class TestSaveStrategies(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.index = TextIndex(os.path.join(self.tmp_dir.name, "study_data.db"))
+        for patcher in (
+            mock.patch("src.frontend.ink_journal.JOURNALS_DIR", os.path.join(self.tmp_dir.name, "journals")),
+            mock.patch.object(TextIndex, "_shared", self.index)
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.path = os.path.join(self.tmp_dir.name, "doc.pdf")
+        doc = fitz.open()
+        for _ in range(2):
+            doc.new_page(width=400, height=600)
+        doc.save(self.path)
+        doc.close()
+        self.viewer = None
+
+    def tearDown(self):
+        if self.viewer is not None:
+            self.viewer.cancel_indexing()
+            index_pool().waitForDone()
+            self.viewer.close_journal()
+            self.viewer.doc.close()
+        self.index.close()
+        self.tmp_dir.cleanup()
+
+    def _read(self, path):
+        with open(path, "rb") as f:
+            return f.read()
+
+    def _snapshot(self, uid, **kwargs):
+        stroke = {"points": [(20.0, 40.0), (120.0, 140.0)], "color": "#ff0000ff", "width": 4, "id": uid}
+        return take_snapshot({0: {"strokes": [stroke]}}, self.path, ZOOM, **kwargs)
+
+    def _open_viewer(self):
+        self.viewer = PDFViewer()
+        self.viewer.set_document(fitz.open(self.path))
+        self.viewer.cancel_indexing()
+        return self.viewer
+
+    def _draw(self, uid):
+        data = {"points": [(20.0, 40.0), (120.0, 140.0)], "color": "#ff0000ff", "width": 4, "id": uid}
+        self.viewer.scene.load_strokes([data])
+        self.viewer.scene.strokeCreated.emit(data)
+
+    def test_incremental_save_only_appends(self):
+        before = self._read(self.path)
+        report = write_snapshot(self._snapshot("a"))
+        self.assertEqual(report["strategy"], "incremental")
+        self.assertIsNone(report["temp_path"])
+        after = self._read(self.path)
+        self.assertGreater(len(after), len(before))
+        self.assertEqual(after[:len(before)], before)
+
+    def test_full_save_goes_to_temp_file_and_is_swapped_in(self):
+        before = self._read(self.path)
+        report = write_snapshot(self._snapshot("a", incremental=False))
+        self.assertEqual(report["strategy"], "full")
+        self.assertEqual(report["temp_path"], self.path + ".tmp")
+        self.assertEqual(self._read(self.path), before) # The viewer swaps it in
+        os.remove(report["temp_path"])
+
+        viewer = self._open_viewer()
+        self._draw("b")
+        reports = []
+        viewer.save_completed.connect(reports.append)
+        viewer.save_annotations(incremental=False)
+        viewer.flush_saves()
+        self.assertEqual(reports[0]["strategy"], "full")
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+        self.assertEqual(viewer.doc.name, self.path)
+        self.assertEqual([s["id"] for s in load_ink_strokes(viewer.doc, 0, viewer.zoom_level)], ["b"])
+
+    def test_falls_back_to_full_save_when_incremental_is_impossible(self):
+        # Bogus xref offset: MuPDF repairs the file on open and cannot append to it
+        data = self._read(self.path).replace(b"startxref", b"startxref\n0\n%%", 1)
+        with open(self.path, "wb") as f:
+            f.write(data)
+        doc = fitz.open(self.path)
+        self.assertFalse(doc.can_save_incrementally())
+        doc.close()
+
+        report = write_snapshot(self._snapshot("a"))
+        self.assertEqual(report["strategy"], "full")
+        self.assertEqual(self._read(self.path), data)
+        written = fitz.open(report["temp_path"])
+        self.assertEqual([s["id"] for s in load_ink_strokes(written, 0, ZOOM)], ["a"])
+        written.close()
+
+    def test_compaction_is_swapped_in_unless_the_file_changed(self):
+        viewer = self._open_viewer()
+        reports = []
+        viewer.save_completed.connect(reports.append)
+
+        # Saved again while compacting: the result is stale
+        result = compact_pdf(self.path)
+        self._draw("a")
+        viewer.save_annotations()
+        viewer.flush_saves()
+        saved = self._read(self.path)
+        viewer._apply_compaction(result)
+        self.assertFalse(os.path.exists(result[0]))
+        self.assertEqual(self._read(self.path), saved)
+        self.assertEqual([r["strategy"] for r in reports], ["incremental"])
+
+        # Untouched meanwhile: the compacted file replaces it
+        result = compact_pdf(self.path)
+        viewer._apply_compaction(result)
+        self.assertFalse(os.path.exists(result[0]))
+        self.assertEqual([r["strategy"] for r in reports], ["incremental", "compaction"])
+        self.assertEqual(viewer._incremental_saves, 0)
+        self.assertEqual([s["id"] for s in load_ink_strokes(viewer.doc, 0, viewer.zoom_level)], ["a"])
+
+    def test_save_waits_for_fitz_on_other_threads(self):
+        before = self._read(self.path)
+        reports = []
+        worker = threading.Thread(target=lambda: reports.append(write_snapshot(self._snapshot("a"))))
+        with fitz_lock: # As if the GUI thread were rendering
+            worker.start()
+            worker.join(0.2)
+            self.assertTrue(worker.is_alive())
+            self.assertEqual(self._read(self.path), before)
+        worker.join(5)
+        self.assertEqual(reports[0]["strategy"], "incremental")
+
+    def test_page_flips_do_not_wait_for_the_write(self):
+        viewer = self._open_viewer()
+        viewer.set_page(1)
+        viewer.set_page(0)
+        self._draw("a")
+
+        writing = threading.Event()
+        original_save = fitz.Document.save
+        def slow_save(doc, *args, **kwargs):
+            writing.set()
+            time.sleep(1.0) # A big file
+            return original_save(doc, *args, **kwargs)
+
+        with mock.patch.object(fitz.Document, "save", slow_save):
+            viewer.save_annotations(incremental=False)
+            self.assertTrue(writing.wait(5))
+            start = time.perf_counter()
+            viewer.set_page(1) # Cached raster
+            viewer.add_new_page() # New page: loads and renders under the lock
+            viewer.set_page(0)
+            elapsed = time.perf_counter() - start
+            self.assertTrue(viewer.is_saving())
+            self.assertLess(elapsed, 0.5)
+            viewer.flush_saves()
+        self.assertEqual([s["id"] for s in load_ink_strokes(viewer.doc, 0, viewer.zoom_level)], ["a"])
+        self.assertEqual(viewer.page_count(), 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import fitz
+from PyQt6.QtWidgets import QApplication
+from src.frontend.pdf_viewer import PDFViewer
+from src.frontend.text_index import TextIndex
+
+app = QApplication.instance() or QApplication([])
+
+class CollectPartials:
+    """Stands in for a BackgroundJob: keeps what search_file() reports."""
+    cancelled = False
+
+    def __init__(self):
+        self.partials = []
+
+    def report_partial(self, result):
+        self.partials.append(result)
+
+class TestSearchHits(unittest.TestCase):
+    def setUp(self):
+        # Keep the search index out of the working directory's study_data.db
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.index = TextIndex(os.path.join(self.tmp_dir.name, "study_data.db"))
+        patcher = mock.patch.object(TextIndex, "_shared", self.index)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        doc = fitz.open()
+        for i in range(2):
+            page = doc.new_page(width=300, height=400)
+            page.insert_text((50, 100), f"needle on page {i}, another needle")
+        self.viewer = PDFViewer()
+        self.viewer.set_document(doc, is_new_file=True)
+
+    def tearDown(self):
+        self.viewer.close_journal()
+        self.viewer.doc.close()
+        self.index.close()
+        self.tmp_dir.cleanup()
+
+    def _brushes(self):
+        return [item.brush().color() for item in self.viewer._hit_items]
+
+    def test_hits_are_overlay_items(self):
+        for page in self.viewer.doc:
+            self.viewer.add_search_hits(page.number, page.search_for("needle"))
+        self.assertEqual(len(self.viewer._hit_items), 2)
+        self.assertEqual(self.viewer.scene.get_strokes(), [])
+
+        # Stepping on the page only recolors
+        items = list(self.viewer._hit_items)
+        self.viewer.set_current_hit(0, 1)
+        self.assertEqual(self.viewer._hit_items, items)
+        self.assertEqual(self._brushes(), [PDFViewer.HIT_COLOR, PDFViewer.CURRENT_HIT_COLOR])
+
+        # Another page: turned to, and its hits are drawn
+        self.viewer.set_current_hit(1, 0)
+        self.assertEqual(self.viewer.get_page(), 1)
+        self.assertEqual(self._brushes(), [PDFViewer.CURRENT_HIT_COLOR, PDFViewer.HIT_COLOR])
+
+        # Hits survive a re-render and go away when cleared
+        self.viewer.render_page()
+        self.assertEqual(len(self.viewer._hit_items), 2)
+        self.viewer.clear_search_hits()
+        self.assertEqual(self.viewer._hit_items, [])
+
+    def _overlay_rects(self, path, query):
+        job = CollectPartials()
+        self.index.search_file(path, query, job=job)
+        self.viewer.clear_search_hits()
+        for page_num, rects in job.partials:
+            self.viewer.add_search_hits(page_num, rects)
+        return sorted(self.viewer.search_hits), [item.rect() for item in self.viewer._hit_items]
+
+    def test_mid_word_hits_survive_indexing(self):
+        path = os.path.join(self.tmp_dir.name, "needles.pdf")
+        self.viewer.doc.save(path)
+        before = self._overlay_rects(path, "EEDL")
+        self.assertEqual(before[0], [0, 1])
+        self.assertEqual(len(before[1]), 2)
+
+        self.index.index_document(path)
+        self.assertEqual(self._overlay_rects(path, "EEDL"), before)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+from src.frontend.startup_profiler import StartupProfiler, check_budget
+
+class TestStartupProfiler(unittest.TestCase):
+    def test_phases_and_milestones(self):
+        profiler = StartupProfiler()
+        reached = []
+        profiler.on_milestone = reached.append
+        with profiler.phase("load modules"):
+            with profiler.phase("module a.py", category="plugin"):
+                pass
+        for _ in range(2):
+            with profiler.phase("first render_page", category="render", once=True):
+                pass
+        self.assertEqual([p["name"] for p in profiler.phases], ["module a.py", "load modules", "first render_page"])
+
+        profiler.mark("first paint")
+        profiler.mark("first paint") # Only the first time counts
+        profiler.mark("ready")
+        self.assertFalse(profiler.done)
+        profiler.mark("first pen event")
+        self.assertTrue(profiler.done)
+        self.assertEqual(reached, ["first paint", "ready", "first pen event"])
+
+        # Nothing is recorded once every milestone is in
+        with profiler.phase("later tab"):
+            pass
+        self.assertEqual(len(profiler.phases), 3)
+
+    def test_budget(self):
+        report = {
+            "milestones": {"first paint": 320.0},
+            "phases": [
+                {"name": "load modules", "category": "setup", "start_ms": 100.0, "duration_ms": 80.0},
+                {"name": "module slow.py", "category": "plugin", "start_ms": 100.0, "duration_ms": 60.0},
+                {"name": "module fast.py", "category": "plugin", "start_ms": 160.0, "duration_ms": 5.0}
+            ]
+        }
+        self.assertEqual(check_budget(report, {"milestones": {"first paint": 400, "first pen event": 10}}), [])
+        violations = check_budget(report, {
+            "milestones": {"first paint": 300},
+            "phases": {"load modules": 50, "QScroller setup": 1},
+            "plugin_ms_max": 50
+        })
+        self.assertEqual(len(violations), 3)
+        self.assertIn("module slow.py", violations[2])
+
+if __name__ == '__main__':
+    unittest.main()
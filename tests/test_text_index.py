@@ -0,0 +1,125 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+import fitz
+from src.frontend.text_index import TextIndex, search_key
+
+class CancelAfter:
+    """Stands in for a BackgroundJob: cancels itself after a number of progress reports."""
+    def __init__(self, reports):
+        self.reports = reports
+        self.progress = []
+
+    @property
+    def cancelled(self):
+        return len(self.progress) >= self.reports
+
+    def report_progress(self, done, total):
+        self.progress.append((done, total))
+
+class TestTextIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.index = TextIndex(os.path.join(self.tmp_dir.name, "study_data.db"))
+        self.index.BATCH_PAGES = 4
+        self.path = os.path.join(self.tmp_dir.name, "book.pdf")
+        doc = fitz.open()
+        for i in range(10):
+            page = doc.new_page(width=300, height=400)
+            page.insert_text((50, 100), f"Chapter {i}")
+            if i in (3, 8):
+                page.insert_text((50, 200), "Photosynthesis converts light")
+        doc.save(self.path)
+        doc.close()
+
+    def tearDown(self):
+        self.index.close()
+        self.tmp_dir.cleanup()
+
+    def test_search_returns_pages_and_rects(self):
+        digest = self.index.index_document(self.path)
+        self.assertEqual(self.index.progress(digest), (10, 10))
+        self.assertEqual(self.index.search_pages(digest, "photosynth"), [3, 8])
+
+        doc = fitz.open(self.path)
+        hits = list(self.index.search(doc, digest, "converts light"))
+        doc.close()
+        self.assertEqual([page_num for page_num, _ in hits], [3, 8])
+        self.assertTrue(all(rects and rects[0].y0 > 150 for _, rects in hits))
+
+    def test_indexing_resumes_and_search_is_complete_meanwhile(self):
+        job = CancelAfter(2) # Initial report and the first batch
+        self.assertIsNone(self.index.index_document(self.path, job=job))
+        digest = self.index.hash_for(self.path)
+        self.assertEqual(self.index.progress(digest), (4, 10))
+
+        # Page 8 is not indexed yet but is still found
+        doc = fitz.open(self.path)
+        self.assertEqual([num for num, _ in self.index.search(doc, digest, "photosynthesis")], [3, 8])
+        doc.close()
+
+        job = CancelAfter(100)
+        self.index.index_document(self.path, job=job)
+        self.assertEqual(job.progress, [(4, 10), (8, 10), (10, 10)])
+
+    def test_ink_saves_keep_the_content_hash(self):
+        digest = self.index.index_document(self.path)
+        doc = fitz.open(self.path)
+        doc[0].add_ink_annot([[(10, 10), (50, 50)]])
+        doc.saveIncr()
+        doc.close()
+        self.assertEqual(self.index.hash_for(self.path), digest)
+        self.assertEqual(self.index.page_text(digest, 3).split("\n")[0], "Chapter 3")
+
+    def _search(self, digest, query):
+        doc = fitz.open(self.path)
+        try:
+            return [num for num, _ in self.index.search(doc, digest, query)]
+        finally:
+            doc.close()
+
+    def test_indexing_does_not_change_results(self):
+        queries = ["otosynth", "HAPTER 1", "converts   light", "s light", "chapter"]
+        digest = self.index.hash_for(self.path)
+        before = {query: self._search(digest, query) for query in queries}
+        self.assertEqual(before["otosynth"], [3, 8])
+        self.assertEqual(before["chapter"], list(range(10)))
+
+        self.index.index_document(self.path)
+        self.assertEqual({query: self._search(digest, query) for query in queries}, before)
+        self.assertEqual(self.index.search_pages(digest, "otosynth"), [3, 8])
+
+    def test_candidates_come_from_the_trigram_index(self):
+        digest = self.index.index_document(self.path)
+        plan = self.index._execute(
+            "EXPLAIN QUERY PLAN SELECT PageNum FROM PageText WHERE SearchKey MATCH ? AND ContentHash = ?",
+            ('"otosynth"', digest)
+        )
+        self.assertIn("VIRTUAL TABLE INDEX", plan[0][-1])
+        self.assertEqual(self.index.search_pages(digest, "r 3"), [3]) # Shorter than a trigram: scanned
+        self.assertEqual(self.index.search_pages(digest, "Chapter 3"), [3])
+        self.assertEqual(self.index.search_pages(digest, 'say "light"'), [])
+
+    def test_old_index_is_rebuilt(self):
+        self.index.close()
+        db_path = os.path.join(self.tmp_dir.name, "old.db")
+        conn = sqlite3.connect(db_path)
+        conn.executescript("""
+            CREATE TABLE TextIndexDocs (ContentHash TEXT PRIMARY KEY, PageCount INTEGER NOT NULL, PagesIndexed INTEGER NOT NULL DEFAULT 0);
+            CREATE VIRTUAL TABLE PageText USING fts5(Text, ContentHash UNINDEXED, PageNum UNINDEXED);
+            INSERT INTO TextIndexDocs VALUES ('abc', 10, 10);
+            INSERT INTO PageText VALUES ('Chapter 0', 'abc', 0);
+        """)
+        conn.close()
+        self.index = TextIndex(db_path)
+        self.assertIsNone(self.index.progress("abc"))
+        digest = self.index.index_document(self.path)
+        self.assertEqual(self.index.search_pages(digest, "photosynthesis"), [3, 8])
+
+    def test_search_key(self):
+        self.assertEqual(search_key("Photo-\nSynthesis  converts"), "photosynthesisconverts")
+        self.assertEqual(search_key("   "), "")
+
+if __name__ == '__main__':
+    unittest.main()
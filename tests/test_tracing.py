@@ -0,0 +1,50 @@
+import json
+import os
+import tempfile
+import unittest
+from src.frontend.tracing import Tracer, _NULL_SPAN
+
+class TestTracing(unittest.TestCase):
+    def test_disabled_records_nothing(self):
+        tracer = Tracer()
+        self.assertIs(tracer.span("render_page", "render"), _NULL_SPAN)
+        with tracer.span("render_page", "render"):
+            pass
+        tracer.instant("save started", "save")
+        tracer.count("raster cache hit")
+        tracer.count("raster cache hit")
+        self.assertEqual(len(tracer.events), 0)
+        # Totals are kept either way
+        self.assertEqual(tracer.counters, {"raster cache hit": 2})
+
+    def test_chrome_trace(self):
+        tracer = Tracer()
+        tracer.start()
+        with tracer.span("render_page", "render", page=3):
+            with tracer.span("rasterize", "render"):
+                pass
+        tracer.instant("save started", "save", pages=1)
+        tracer.count("raster cache miss")
+        tracer.stop()
+        with tracer.span("after stop"):
+            pass
+
+        self.assertEqual([e["ph"] for e in tracer.events], ["X", "X", "i", "C"])
+        inner, outer = tracer.events[0], tracer.events[1]
+        self.assertEqual((inner["name"], outer["name"]), ("rasterize", "render_page"))
+        self.assertEqual(outer["args"], {"page": 3})
+        # The outer span encloses the inner one
+        self.assertLessEqual(outer["ts"], inner["ts"])
+        self.assertGreaterEqual(outer["ts"] + outer["dur"], inner["ts"] + inner["dur"])
+        self.assertEqual(tracer.events[3]["args"], {"value": 1})
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "traces", "trace.json")
+            tracer.write_chrome_trace(path)
+            with open(path, "r", encoding="utf-8") as f:
+                trace = json.load(f)
+        self.assertEqual(len(trace["traceEvents"]), 4)
+        self.assertEqual(trace["otherData"]["counters"], {"raster cache miss": 1})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,7 +2,7 @@ import unittest
 from PyQt6.QtWidgets import QApplication
 from PyQt6.QtCore import QPointF
 from src.frontend.ink_canvas import InkCanvas
-from src.frontend.undo_manager import UndoManager, AddStrokeCommand, RemoveStrokeCommand
+from src.frontend.undo_manager import UndoManager, AddStrokeCommand, RemoveStrokeCommand, CompoundCommand
 
 # Hack to allow QApp in tests
 app = QApplication([])
@@ -14,7 +14,9 @@ class TestUndoRedo(unittest.TestCase):
         
         # Connect signals for manual testing simulation
         self.scene.strokeCreated.connect(lambda data: self.manager.push(AddStrokeCommand(self.scene, data)))
-        self.scene.strokeErased.connect(lambda data: self.manager.push(RemoveStrokeCommand(self.scene, data)))
+        self.scene.strokesErased.connect(
+            lambda data_list: [self.manager.push(RemoveStrokeCommand(self.scene, data)) for data in data_list]
+        )
 
     def test_add_undo_redo_stroke(self):
         # Simulator adding a stroke
@@ -129,5 +131,91 @@ class TestUndoRedo(unittest.TestCase):
         self.manager.undo()
         self.assertEqual(len(self.scene.items()), 0)
 
+    def test_transaction_is_single_step(self):
+        for i in range(3):
+            stroke_data = {"points": [(0, i), (10, i)], "color": "#000", "width": 1, "id": f"tx-{i}"}
+            cmd = AddStrokeCommand(self.scene, stroke_data)
+            cmd.redo()
+            self.manager.push(cmd) # Base history: 3 separate steps
+
+        with self.manager.transaction("Erase"):
+            for i in range(3):
+                stroke_data = {"points": [(0, i), (10, i)], "color": "#000", "width": 1, "id": f"tx-{i}"}
+                cmd = RemoveStrokeCommand(self.scene, stroke_data)
+                cmd.redo()
+                self.manager.push(cmd)
+
+        self.assertEqual(len(self.manager.undo_stack), 4)
+        self.assertIsInstance(self.manager.undo_stack[-1], CompoundCommand)
+        self.assertEqual(len(self.scene.items()), 0)
+
+        # One undo restores the whole sweep
+        self.manager.undo()
+        self.assertEqual(len(self.scene.items()), 3)
+
+        self.manager.redo()
+        self.assertEqual(len(self.scene.items()), 0)
+
+    def test_eraser_sweep_emits_once(self):
+        received = []
+        self.scene.strokesErased.connect(received.append)
+
+        for i in range(3):
+            self.scene.tool = "pencil"
+            self.scene.start_stroke(QPointF(0, i * 10), 1.0)
+            self.scene.move_stroke(QPointF(50, i * 10), 1.0)
+            self.scene.end_stroke(QPointF(50, i * 10), 1.0)
+
+        self.scene.tool = "eraser"
+        self.scene.start_stroke(QPointF(25, 0), 1.0)
+        self.scene.move_stroke(QPointF(25, 10), 1.0)
+        self.scene.move_stroke(QPointF(25, 20), 1.0)
+        self.scene.end_stroke(QPointF(25, 20), 1.0)
+
+        self.assertEqual(len(received), 1)
+        self.assertEqual(len(received[0]), 3)
+
+    def test_multi_step_undo_emits_history_once(self):
+        for i in range(5):
+            cmd = AddStrokeCommand(self.scene, {"points": [(0, 0), (1, 1)], "color": "#000", "width": 1, "id": f"h-{i}"})
+            cmd.redo()
+            self.manager.push(cmd)
+
+        emissions = []
+        self.manager.historyChanged.connect(lambda curr, total: emissions.append((curr, total)))
+        self.manager.scene = self.scene # Exercise the suspended-update path
+        self.manager.undo(5)
+
+        self.assertEqual(emissions, [(0, 5)])
+        self.assertEqual(len(self.scene.items()), 0)
+
+    def test_only_batches_suspend_scene_updates(self):
+        for i in range(3):
+            cmd = AddStrokeCommand(self.scene, {"points": [(0, 0), (1, 1)], "color": "#000", "width": 1, "id": f"s-{i}"})
+            cmd.redo()
+            self.manager.push(cmd)
+        with self.manager.transaction("pair"):
+            for i in range(2):
+                cmd = AddStrokeCommand(self.scene, {"points": [(0, 0), (1, 1)], "color": "#000", "width": 1, "id": f"t-{i}"})
+                cmd.redo()
+                self.manager.push(cmd)
+        self.manager.scene = self.scene
+
+        suspended = []
+        suspend_updates = self.scene.suspend_updates
+        def counting_suspend():
+            suspended.append(True)
+            return suspend_updates()
+        self.scene.suspend_updates = counting_suspend
+
+        self.manager.undo() # The transaction
+        self.assertEqual(len(suspended), 1)
+        self.manager.undo() # One stroke
+        self.assertEqual(len(suspended), 1)
+        self.manager.undo(2)
+        self.manager.redo()
+        self.assertEqual(len(suspended), 2)
+        self.assertEqual(len(self.scene.items()), 1)
+
 if __name__ == '__main__':
     unittest.main()